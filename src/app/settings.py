@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -38,24 +39,38 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'rest_framework',
     'rest_framework.authtoken',
     'drf_spectacular',
     'user',
     'contest',
+    'batch',
+    'platforms',
+    'problem',
+    'team',
+    'standings',
 ]
 
+# The session, CSRF, authentication and message middleware are Django's,
+# except that they let API_PATH_PREFIXES through untouched: the API
+# authenticates with tokens and never uses them. See core.middleware.
 MIDDLEWARE = [
+    'core.middleware.HealthCheckMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'core.middleware.CsrfViewMiddleware',
+    'core.middleware.AuthenticationMiddleware',
+    'core.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
+    'core.activity.ActivityMiddleware',
 ]
 
+API_PATH_PREFIXES = ['/api/']
+
 ROOT_URLCONF = 'app.urls'
 
 TEMPLATES = [
@@ -90,6 +105,26 @@ DATABASES = {
     }
 }
 
+# Optional read replicas, as a comma separated list of hosts sharing the
+# primary's name and credentials. Under test they mirror the primary.
+DATABASE_REPLICAS = []
+
+for index, host in enumerate(
+    filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(','))
+):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.db_routers.PrimaryReplicaRouter']
+
+# Seconds a client keeps reading from the primary after a write.
+REPLICA_STICKY_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -127,6 +162,9 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Turns off activity tracking while tests run.
+TEST_RUNNER = 'core.test_runner.TestRunner'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -134,6 +172,159 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'core.User'
 
+# Seconds a /readyz result is reused before the checks run again.
+HEALTH_CHECK_CACHE_SECONDS = 5
+
+# Processes the import_users command and imports uploaded through the API
+# hash passwords with (None: all cores). API imports run on the task queue.
+USER_IMPORT_HASH_WORKERS = None
+
+USER_IMPORT_MAX_ROWS = 5000
+
+# Recent contest events kept per process for Last-Event-ID resumes, and the
+# keep-alive interval of the event stream. CONTEST_EVENTS_NOTIFY=None sends
+# events through PostgreSQL NOTIFY whenever the database is PostgreSQL.
+CONTEST_EVENTS_BUFFER_SIZE = 1000
+CONTEST_EVENTS_HEARTBEAT_SECONDS = 15
+CONTEST_EVENTS_NOTIFY = None
+# Seconds a stream token from /api/contest/events/token/ opens streams for.
+CONTEST_EVENTS_TOKEN_SECONDS = 300
+
+# Delta sync: how long deleted contests are remembered, and how far
+# synced_at trails the request time to cover in-flight transactions.
+CONTEST_TOMBSTONE_RETENTION_DAYS = 30
+CONTEST_SYNC_OVERLAP_SECONDS = 5
+
+# iCalendar feeds list contests starting from CONTEST_CALENDAR_PAST_DAYS
+# days ago, render CONTEST_CALENDAR_CHUNK_SIZE contests per query, and ask
+# calendar apps to refresh every CONTEST_CALENDAR_REFRESH_MINUTES. Polls
+# within CONTEST_CALENDAR_MAX_AGE seconds may be answered by their cache.
+CONTEST_CALENDAR_PAST_DAYS = 7
+CONTEST_CALENDAR_CHUNK_SIZE = 500
+CONTEST_CALENDAR_REFRESH_MINUTES = 60
+CONTEST_CALENDAR_MAX_AGE = 300
+
+# Largest number of contests one batch retrieve may ask for.
+CONTEST_BATCH_MAX_IDS = 100
+
+# Size of a /api/batch/ request and the threads used for parallel GETs.
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 4
+
+# HTTP client for the contest platforms, see platforms.client. Timeouts are
+# (connect, read) seconds; retries back off exponentially from
+# PLATFORM_HTTP_BACKOFF seconds and honor Retry-After.
+PLATFORM_API_URLS = {
+    'C': 'https://codeforces.com/api/',
+    'O': 'https://omegaup.com/api/',
+    'K': 'https://open.kattis.com/',
+    'V': 'https://vjudge.net/',
+}
+PLATFORM_HTTP_TIMEOUT = (3.05, 30)
+PLATFORM_HTTP_RETRIES = 3
+PLATFORM_HTTP_BACKOFF = 0.5
+PLATFORM_HTTP_MAX_PER_HOST = 4
+PLATFORM_HTTP_USER_AGENT = 'club-algoritmia-uaslp-api'
+
+# On-disk cache of platform responses, revalidated with ETag/Last-Modified
+# once PLATFORM_HTTP_CACHE_TTL seconds (or the upstream max-age) pass.
+PLATFORM_HTTP_CACHE_DIR = os.environ.get(
+    'PLATFORM_HTTP_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'platform_http_cache')
+)
+PLATFORM_HTTP_CACHE_TTL = 300
+
+# Member handles synced in parallel by ingest_submissions.
+SUBMISSION_INGEST_WORKERS = 4
+
+# Periodic jobs in core.scheduler. Each job runs on one node at a time,
+# elected with PostgreSQL advisory locks (or flocks in SCHEDULER_LOCK_DIR on
+# other databases, which only covers a single host). Set
+# SCHEDULER_AUTOSTART to run the scheduler inside the web processes instead
+# of a separate `manage.py run_scheduler`.
+SCHEDULER_AUTOSTART = os.environ.get('SCHEDULER_AUTOSTART') == '1'
+SCHEDULER_POLL_SECONDS = 5
+SCHEDULER_LOCK_DIR = os.path.join(tempfile.gettempdir(), 'scheduler_locks')
+
+# Background task queue in core.tasks, served by `manage.py run_worker`.
+# Failed tasks are retried after TASK_RETRY_BACKOFF seconds, doubling up to
+# TASK_RETRY_BACKOFF_MAX, and dead-lettered after TASK_MAX_ATTEMPTS. Tasks
+# running longer than TASK_LOCK_TIMEOUT seconds are assumed lost with their
+# worker and requeued.
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_BACKOFF = 10
+TASK_RETRY_BACKOFF_MAX = 3600
+TASK_LOCK_TIMEOUT = 3600
+TASK_BATCH_SIZE = 10
+TASK_POLL_SECONDS = 1
+TASK_RETENTION_DAYS = 7
+
+# Team formation: members without a stored rating count as
+# TEAM_UNRATED_RATING, and the optimizer stops after
+# TEAM_FORMATION_TIME_LIMIT seconds at the latest.
+TEAM_UNRATED_RATING = 1200
+TEAM_FORMATION_TIME_LIMIT = 0.5
+
+# Club contest standings. New scoreboards freeze STANDINGS_FREEZE_MINUTES
+# before the end and charge STANDINGS_PENALTY_MINUTES per rejected run.
+# Each process keeps the standings of up to STANDINGS_CACHE_SIZE contests
+# with their last STANDINGS_DELTA_LOG_SIZE changes for cursor clients.
+STANDINGS_FREEZE_MINUTES = 60
+STANDINGS_PENALTY_MINUTES = 20
+STANDINGS_CACHE_SIZE = 16
+STANDINGS_DELTA_LOG_SIZE = 1000
+STANDINGS_PAGE_SIZE = 200
+STANDINGS_MAX_RUNS = 5000
+
+# Member activity (last seen, requests per endpoint) is buffered per process
+# and written at most every ACTIVITY_FLUSH_SECONDS, or once
+# ACTIVITY_MAX_PENDING entries wait. A crashed process loses up to that much
+# activity; 0 writes every request through. Flushes slower than
+# ACTIVITY_SLOW_FLUSH_SECONDS are logged as warnings. Set ACTIVITY_TRACKING=0
+# in the environment to turn tracking off; the test runner turns it off too.
+ACTIVITY_TRACKING = os.environ.get('ACTIVITY_TRACKING', '1') == '1'
+ACTIVITY_FLUSH_SECONDS = 30
+ACTIVITY_MAX_PENDING = 10000
+ACTIVITY_FLUSH_BATCH_SIZE = 500
+ACTIVITY_SLOW_FLUSH_SECONDS = 0.5
+
+# Admin changelists on PostgreSQL show the planner's row estimate instead
+# of counting results above ADMIN_EXACT_COUNT_LIMIT. CSV exports read
+# ADMIN_EXPORT_CHUNK_SIZE rows per query.
+ADMIN_EXACT_COUNT_LIMIT = 10000
+ADMIN_EXPORT_CHUNK_SIZE = 2000
+
+# Member handles are checked against their platforms in the background,
+# HANDLE_CHECK_DELAY seconds after they change so that signups arriving
+# together are checked in batches of HANDLE_CHECK_BATCH_SIZE. Results are
+# cached for HANDLE_VERIFIED_TTL seconds, or HANDLE_NOT_FOUND_TTL seconds
+# for handles that do not exist, in the HANDLE_CACHE_ALIAS cache; signups
+# only see the results of worker processes if that cache is shared.
+HANDLE_CHECK_DELAY = 10
+HANDLE_CHECK_BATCH_SIZE = 100
+HANDLE_VERIFIED_TTL = 7 * 24 * 60 * 60
+HANDLE_NOT_FOUND_TTL = 60 * 60
+HANDLE_CACHE_ALIAS = 'default'
+
+# Token bucket store for the throttles in core.throttling. Use
+# 'core.throttling.CacheTokenBucketStore' to share buckets between processes
+# through the THROTTLE_CACHE_ALIAS cache.
+THROTTLE_STORE = 'core.throttling.LocMemTokenBucketStore'
+THROTTLE_CACHE_ALIAS = 'default'
+
+# NUM_PROXIES is the number of reverse proxies in front of the app, whose
+# X-Forwarded-For entries the IP throttles trust. The API only takes
+# tokens: Basic authentication would check a password on every request,
+# ahead of any throttle.
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'core.authentication.TokenAuthentication',
+    ],
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '0')),
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '30/min',
+        'login_email': '10/min',
+        'signup_ip': '20/hour',
+    },
 }
\ No newline at end of file
@@ -39,4 +39,8 @@ urlpatterns = [
     ),
     path('api/user/', include('user.urls')),
     path('api/contest/', include('contest.urls')),
+    path('api/problem/', include('problem.urls')),
+    path('api/batch/', include('batch.urls')),
+    path('api/team/', include('team.urls')),
+    path('api/standings/', include('standings.urls')),
 ]
@@ -7,6 +7,7 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
 """
 
+import atexit
 import os
 
 from django.core.wsgi import get_wsgi_application
@@ -14,3 +15,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+from core.activity import tracker  # noqa: E402
+
+atexit.register(tracker.flush)
+
+if settings.SCHEDULER_AUTOSTART:
+    from core.scheduler import scheduler
+
+    scheduler.start()
@@ -0,0 +1,45 @@
+"""
+Serializers for the batch API View.
+"""
+
+from django.conf import settings
+
+from rest_framework import serializers
+
+
+class SubRequestSerializer(serializers.Serializer):
+    """
+    Serializer for one request inside a batch.
+    """
+    method = serializers.ChoiceField(
+        choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+    )
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False)
+
+    def validate_path(self, value):
+        """
+        Require an absolute path such as `/api/user/me/`.
+        """
+        if not value.startswith('/'):
+            raise serializers.ValidationError('Enter an absolute path.')
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    """
+    Serializer for a batch of requests.
+    """
+    requests = SubRequestSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        """
+        Cap the number of requests in one batch.
+        """
+        max_requests = getattr(settings, 'BATCH_MAX_REQUESTS', 20)
+        if len(value) > max_requests:
+            raise serializers.ValidationError(
+                f'Send at most {max_requests} requests per batch.'
+            )
+        return value
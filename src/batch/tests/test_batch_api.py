@@ -0,0 +1,225 @@
+"""
+Tests for the batch API.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.authentication import TokenAuthentication
+from core.models import Contest
+
+
+BATCH_URL = reverse('batch:batch')
+ME_URL = reverse('user:me')
+CONTEST_URL = reverse('contest:contest-list')
+
+
+def detail_url(contest_id):
+    """
+    Create and return a contest detail URL.
+    """
+    return reverse('contest:contest-detail', args=[contest_id])
+
+
+def create_contest(platform_id, **params):
+    """
+    Helper function to create a sample contest.
+    """
+    defaults = {
+        'name': f'Contest {platform_id}',
+        'url': f'https://example.com/contest/{platform_id}',
+        'platform': 'C',
+        'platform_id': platform_id,
+    }
+    defaults.update(params)
+    return Contest.objects.create(**defaults)
+
+
+class PublicBatchApiTests(TestCase):
+    """
+    Test the batch API without authentication.
+    """
+
+    def test_auth_required(self):
+        """
+        Test that authentication is required.
+        """
+        res = APIClient().post(
+            BATCH_URL,
+            {'requests': [{'method': 'GET', 'path': ME_URL}]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateBatchApiTests(TestCase):
+    """
+    Test the batch API (authenticated).
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'batch@example.com',
+            'testpass1234',
+            name='Batch User'
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def post_batch(self, *requests, **params):
+        return self.client.post(
+            BATCH_URL,
+            {'requests': list(requests), **params},
+            format='json'
+        )
+
+    def test_batch_reads(self):
+        """
+        Test running several reads in one request.
+        """
+        contest = create_contest('1')
+
+        res = self.post_batch(
+            {'method': 'GET', 'path': ME_URL},
+            {'method': 'GET', 'path': CONTEST_URL},
+            {'method': 'GET', 'path': detail_url(contest.id)},
+            {'method': 'GET', 'path': detail_url(contest.id + 1)},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        responses = res.data['responses']
+        self.assertEqual(
+            [response['status'] for response in responses],
+            [200, 200, 200, 404]
+        )
+        self.assertEqual(responses[0]['body']['email'], self.user.email)
+        self.assertEqual(responses[1]['body'][0]['id'], contest.id)
+        self.assertEqual(responses[2]['body']['name'], contest.name)
+
+    def test_batch_write_then_read(self):
+        """
+        Test that sub-requests run in order as the batch user.
+        """
+        res = self.post_batch(
+            {'method': 'PATCH', 'path': ME_URL, 'body': {'name': 'New'}},
+            {'method': 'GET', 'path': ME_URL},
+        )
+
+        responses = res.data['responses']
+        self.assertEqual(responses[0]['status'], 200)
+        self.assertEqual(responses[1]['body']['name'], 'New')
+
+    def test_batch_authenticates_once(self):
+        """
+        Test that sub-requests reuse the batch's credentials.
+        """
+        with patch.object(
+            TokenAuthentication,
+            'authenticate_credentials',
+            autospec=True,
+            side_effect=TokenAuthentication.authenticate_credentials
+        ) as authenticate:
+            res = self.post_batch(
+                {'method': 'GET', 'path': ME_URL},
+                {'method': 'GET', 'path': CONTEST_URL},
+            )
+
+        self.assertEqual(
+            [response['status'] for response in res.data['responses']],
+            [200, 200]
+        )
+        self.assertEqual(authenticate.call_count, 1)
+
+    def test_batch_permissions_apply(self):
+        """
+        Test that each sub-request is permission checked.
+        """
+        res = self.post_batch({
+            'method': 'POST',
+            'path': CONTEST_URL,
+            'body': {
+                'name': 'Contest',
+                'url': 'https://example.com/contest/1',
+                'platform': 'C',
+                'platform_id': '1',
+            },
+        })
+
+        self.assertEqual(res.data['responses'][0]['status'], 403)
+        self.assertFalse(Contest.objects.exists())
+
+    def test_batch_rejects_other_paths(self):
+        """
+        Test that only user and contest routes can be batched.
+        """
+        res = self.post_batch(
+            {'method': 'GET', 'path': BATCH_URL},
+            {'method': 'GET', 'path': reverse('contest:contest-events')},
+            {'method': 'GET', 'path': '/api/missing/'},
+        )
+
+        self.assertEqual(
+            [response['status'] for response in res.data['responses']],
+            [400, 400, 404]
+        )
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_batch_size_limit(self):
+        """
+        Test that the number of sub-requests is capped.
+        """
+        res = self.post_batch(*[{'method': 'GET', 'path': ME_URL}] * 3)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ParallelBatchApiTests(TransactionTestCase):
+    """
+    Test running batched reads concurrently.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'batch@example.com',
+            'testpass1234'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_parallel_reads(self):
+        """
+        Test that parallel reads keep their order and see earlier writes.
+        """
+        contests = [create_contest(str(i)) for i in range(5)]
+
+        res = self.client.post(
+            BATCH_URL,
+            {
+                'parallel': True,
+                'requests': [
+                    {'method': 'PATCH', 'path': ME_URL,
+                     'body': {'name': 'Parallel'}},
+                    {'method': 'GET', 'path': ME_URL},
+                ] + [
+                    {'method': 'GET', 'path': detail_url(contest.id)}
+                    for contest in contests
+                ],
+            },
+            format='json'
+        )
+
+        responses = res.data['responses']
+        self.assertEqual(responses[1]['body']['name'], 'Parallel')
+        self.assertEqual(
+            [response['body']['id'] for response in responses[2:]],
+            [contest.id for contest in contests]
+        )
@@ -0,0 +1,177 @@
+"""
+Views for the batch API.
+"""
+
+import contextvars
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from drf_spectacular.utils import extend_schema
+
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from batch.serializers import BatchSerializer
+from core import authentication
+
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_NAMESPACES = ('user', 'contest')
+
+# Routes that cannot be answered in-process: the event stream never ends.
+EXCLUDED_VIEWS = ('contest:contest-events',)
+
+# Headers from the batch request that sub-requests inherit.
+INHERITED_META = (
+    'REMOTE_ADDR',
+    'SERVER_NAME',
+    'SERVER_PORT',
+    'HTTP_HOST',
+    'HTTP_USER_AGENT',
+    'HTTP_X_FORWARDED_FOR',
+)
+
+
+class BatchView(APIView):
+    """
+    Run several user and contest API requests in one round trip.
+
+    Sub-requests go straight to their views: the middleware stack and
+    authentication run once for the batch, and every sub-request acts as the
+    batch's user. They run in order; with `parallel`, consecutive GETs run
+    concurrently. Each sub-request is still throttled and permission
+    checked by its own view.
+    """
+    authentication_classes = [authentication.TokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(request=BatchSerializer)
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        subrequests = serializer.validated_data['requests']
+
+        if serializer.validated_data['parallel']:
+            responses = []
+            for is_get, group in groupby(
+                subrequests,
+                key=lambda sub: sub['method'] == 'GET'
+            ):
+                group = list(group)
+                if is_get and len(group) > 1:
+                    responses.extend(run_parallel(request, group))
+                else:
+                    responses.extend(
+                        dispatch(request, sub) for sub in group
+                    )
+        else:
+            responses = [dispatch(request, sub) for sub in subrequests]
+
+        return Response({'responses': responses})
+
+
+def run_parallel(request, subrequests):
+    """
+    Dispatch sub-requests on a thread pool, keeping their order.
+    """
+    workers = min(
+        len(subrequests),
+        getattr(settings, 'BATCH_MAX_WORKERS', 4)
+    )
+
+    def run(sub):
+        try:
+            return dispatch(request, sub)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, run, sub)
+            for sub in subrequests
+        ]
+        return [future.result() for future in futures]
+
+
+def dispatch(request, sub):
+    """
+    Run one sub-request and return its status and body.
+    """
+    path, _, query = sub['path'].partition('?')
+
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return error(404, 'Not found.')
+
+    if (
+        match.namespace not in ALLOWED_NAMESPACES
+        or match.view_name in EXCLUDED_VIEWS
+        or not hasattr(match.func, 'cls')
+    ):
+        return error(400, 'This path cannot be batched.')
+
+    subrequest = build_request(
+        request,
+        sub['method'],
+        path,
+        query,
+        sub.get('body')
+    )
+
+    try:
+        response = match.func(subrequest, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception('Batched request to %s failed.', sub['path'])
+        return error(500, 'Server error.')
+
+    return {
+        'status': response.status_code,
+        'body': getattr(response, 'data', None),
+    }
+
+
+def build_request(request, method, path, query, body):
+    """
+    Build a sub-request that reuses the batch request's authentication.
+    """
+    content = b''
+    if body is not None:
+        content = json.dumps(body, cls=DjangoJSONEncoder).encode()
+
+    environ = {
+        key: request.META[key]
+        for key in INHERITED_META
+        if key in request.META
+    }
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': io.BytesIO(content),
+        'wsgi.url_scheme': request.scheme,
+    })
+
+    subrequest = WSGIRequest(environ)
+    # Read by core.authentication.TokenAuthentication.
+    subrequest.batch_credentials = (request.user, request.auth)
+    return subrequest
+
+
+def error(status, detail):
+    return {'status': status, 'body': {'detail': detail}}
@@ -1,6 +1,26 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
 
 
 class ContestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'contest'
+
+    def ready(self):
+        from contest import signals  # noqa: F401
+
+        # Sent per app with models; the contest table belongs to core.
+        post_migrate.connect(
+            restore_search_triggers,
+            sender=self.apps.get_app_config('core')
+        )
+
+
+def restore_search_triggers(sender, using, **kwargs):
+    """
+    Put back the SQLite search triggers once migrations have run.
+    """
+    from contest import search
+
+    search.restore_sqlite_triggers(connections[using])
@@ -0,0 +1,195 @@
+"""
+iCalendar feeds of upcoming contests.
+
+A feed lists the contests of one platform, or of all of them, that start
+from CONTEST_CALENDAR_PAST_DAYS days before today on. Calendar apps poll
+feeds unattended and often, so each poll starts with `feed_state()`: one
+query that checks the feed token and reads the feed's validators, the
+newest `last_updated` and deletion and the number of contests. When the
+client already has that version it gets 304 Not Modified; otherwise the
+feed is rendered from CONTEST_CALENDAR_CHUNK_SIZE contests at a time and
+streamed.
+
+The window starts at midnight UTC, so a feed only changes when a contest
+in it does, a contest is deleted, or the day changes. Like delta sync,
+changes made with QuerySet.update() leave `last_updated` alone and reach
+feeds with the next change that does not.
+"""
+
+import hashlib
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import F, Func, IntegerField, Subquery
+from django.utils import timezone
+
+from core.models import CalendarToken, Contest, ContestTombstone
+
+
+PRODID = '-//Club de Algoritmia UASLP//Contest calendar//EN'
+UID_DOMAIN = 'club-algoritmia-uaslp'
+
+# Bump when the rendering changes, so clients drop feeds cached before.
+FEED_VERSION = 1
+
+
+def window_start(now=None):
+    """
+    Return the earliest start time of the contests in feeds.
+    """
+    today = (now or timezone.now()).astimezone(dt_timezone.utc).date()
+    days = getattr(settings, 'CONTEST_CALENDAR_PAST_DAYS', 7)
+    return datetime.combine(
+        today - timedelta(days=days),
+        time.min,
+        tzinfo=dt_timezone.utc
+    )
+
+
+def feed_contests(platform=None, start=None):
+    """
+    Return the contests of a feed, by start time.
+    """
+    contests = Contest.objects.filter(start_time__gte=start or window_start())
+    if platform is not None:
+        contests = contests.filter(platform=platform)
+    return contests.order_by('start_time', 'id')
+
+
+def scalar(queryset, function, field, **kwargs):
+    """
+    Return a subquery computing an aggregate over the whole queryset.
+    """
+    return Subquery(
+        queryset.order_by().annotate(
+            value=Func(F(field), function=function, **kwargs)
+        ).values('value')
+    )
+
+
+def feed_state(key, platform=None, start=None):
+    """
+    Return the validators of a feed, or None when the token is unknown or
+    its member is inactive.
+    """
+    start = start or window_start()
+    contests = feed_contests(platform, start)
+    row = CalendarToken.objects.filter(
+        key=key,
+        user__is_active=True
+    ).annotate(
+        updated=scalar(contests, 'MAX', 'last_updated'),
+        deleted=scalar(ContestTombstone.objects.all(), 'MAX', 'deleted_at'),
+        count=scalar(contests, 'COUNT', 'id', output_field=IntegerField()),
+    ).values_list('updated', 'deleted', 'count').first()
+    if row is None:
+        return None
+
+    updated, deleted, count = row
+    last_modified = max(t for t in (updated, deleted, start) if t)
+    tag = f'{FEED_VERSION}:{platform}:{start:%Y%m%d}:{last_modified}:{count}'
+    return {
+        'etag': hashlib.sha1(tag.encode()).hexdigest(),
+        'last_modified': last_modified,
+    }
+
+
+def escape(text):
+    """
+    Escape a TEXT property value.
+    """
+    return (
+        text.replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\n')
+        .replace('\r', '\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """
+    Terminate a content line, folded into lines of at most 75 octets
+    without splitting UTF-8 characters.
+    """
+    encoded = line.encode()
+    parts = []
+    start = 0
+    limit = 75
+    while len(encoded) - start > limit:
+        end = start + limit
+        while encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start = end
+        # Continuation lines begin with a space.
+        limit = 74
+    parts.append(encoded[start:].decode())
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def format_time(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def render_event(contest):
+    """
+    Return the VEVENT of a contest.
+    """
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:contest-{contest.id}@{UID_DOMAIN}',
+        f'DTSTAMP:{format_time(contest.last_updated)}',
+        f'DTSTART:{format_time(contest.start_time)}',
+    ]
+    if contest.end_time and contest.end_time > contest.start_time:
+        lines.append(f'DTEND:{format_time(contest.end_time)}')
+    lines += [
+        f'SUMMARY:{escape(contest.name)}',
+        f'CATEGORIES:{escape(Contest.PLATFORMS[contest.platform])}',
+        f'URL:{contest.url}',
+    ]
+    if contest.description:
+        lines.append(f'DESCRIPTION:{escape(contest.description)}')
+    lines.append('END:VEVENT')
+    return ''.join(fold(line) for line in lines)
+
+
+def render_feed(platform=None, start=None):
+    """
+    Yield the feed a chunk of contests at a time.
+    """
+    name = Contest.PLATFORMS[platform] if platform else 'All'
+    refresh = getattr(settings, 'CONTEST_CALENDAR_REFRESH_MINUTES', 60)
+    yield ''.join(fold(line) for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape(name)} contests',
+        f'REFRESH-INTERVAL;VALUE=DURATION:PT{refresh}M',
+        f'X-PUBLISHED-TTL:PT{refresh}M',
+    ))
+
+    size = getattr(settings, 'CONTEST_CALENDAR_CHUNK_SIZE', 500)
+    contests = feed_contests(platform, start).only(
+        'id',
+        'name',
+        'description',
+        'url',
+        'platform',
+        'start_time',
+        'end_time',
+        'last_updated',
+    )
+    chunk = []
+    for contest in contests.iterator(chunk_size=size):
+        chunk.append(render_event(contest))
+        if len(chunk) == size:
+            yield ''.join(chunk)
+            chunk = []
+
+    chunk.append(fold('END:VCALENDAR'))
+    yield ''.join(chunk)
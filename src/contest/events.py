@@ -0,0 +1,259 @@
+"""
+Contest change events for the server-sent events feed.
+
+Every process keeps the most recent events in a bounded ring buffer so that
+clients can resume with `Last-Event-ID`. Event ids carry a per-process epoch:
+a client resuming against another process, or from further back than the
+buffer reaches, is told to reset instead of silently missing events.
+
+On PostgreSQL, events are sent with NOTIFY after the transaction commits and
+every process serving the feed LISTENs, so a change made by any worker
+reaches every subscriber. Other backends publish in-process only. NOTIFY
+payloads are limited to 8000 bytes, so notifications only carry the event
+type and contest id, and each listener reads the contest itself.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import secrets
+import threading
+from collections import deque, namedtuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection, connections
+
+import psycopg
+
+from core.models import Contest
+from contest.serializers import ContestSerializer
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'contest_events'
+
+Event = namedtuple('Event', ['id', 'seq', 'type', 'data'])
+
+
+class ContestEventBroker:
+    """
+    Ring buffer of recent events with cheap fan-out to async subscribers.
+
+    Subscribers on one event loop all wait on a single asyncio.Event, so a
+    publish costs one wake-up per loop rather than one per connection.
+    """
+
+    def __init__(self, size=1000):
+        self.epoch = secrets.token_hex(4)
+        self._events = deque(maxlen=size)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._wakeups = {}
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def publish(self, event_type, data):
+        """
+        Append an event to the buffer and wake every subscriber.
+        """
+        with self._lock:
+            self._seq += 1
+            self._events.append(Event(
+                f'{self.epoch}-{self._seq}',
+                self._seq,
+                event_type,
+                json.dumps(data, cls=DjangoJSONEncoder)
+            ))
+            loops = list(self._wakeups)
+
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._wake, loop)
+            except RuntimeError:
+                with self._lock:
+                    self._wakeups.pop(loop, None)
+
+    def parse_id(self, event_id):
+        """
+        Return the sequence number of an id issued by this broker, or None.
+        """
+        epoch, _, seq = (event_id or '').partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def since(self, seq):
+        """
+        Return the buffered events after seq.
+
+        Returns None when seq is unknown or older than the buffer, in which
+        case the caller has to resynchronize.
+        """
+        with self._lock:
+            if seq is None or seq > self._seq:
+                return None
+            if not self._events or seq == self._seq:
+                return []
+
+            first = self._events[0].seq
+            if seq < first - 1:
+                return None
+
+            start = seq - first + 1
+            return list(itertools.islice(self._events, start, None))
+
+    async def wait(self, seq):
+        """
+        Wait until an event newer than seq is published.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._seq > seq:
+                return
+            wakeup = self._wakeups.get(loop)
+            if wakeup is None:
+                wakeup = self._wakeups[loop] = asyncio.Event()
+
+        await wakeup.wait()
+
+    def _wake(self, loop):
+        with self._lock:
+            wakeup = self._wakeups.pop(loop, None)
+        if wakeup is not None:
+            wakeup.set()
+
+
+broker = ContestEventBroker(
+    size=getattr(settings, 'CONTEST_EVENTS_BUFFER_SIZE', 1000)
+)
+
+
+def use_notify():
+    """
+    Check whether events travel through PostgreSQL NOTIFY.
+    """
+    enabled = getattr(settings, 'CONTEST_EVENTS_NOTIFY', None)
+    if enabled is None:
+        return connection.vendor == 'postgresql'
+    return enabled
+
+
+def contest_data(contest):
+    """
+    Return the data of a created or updated event.
+    """
+    data = dict(ContestSerializer(contest).data)
+    data['last_updated'] = contest.last_updated
+    return data
+
+
+def publish(event_type, data):
+    """
+    Publish an event about the contest with data['id'] to every process
+    serving the feed.
+    """
+    if not use_notify():
+        broker.publish(event_type, data)
+        return
+
+    payload = json.dumps({'type': event_type, 'id': data['id']})
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+
+
+def publish_updated(contest_id):
+    """
+    Publish an updated event for a contest changed by QuerySet.update(),
+    which sends no post_save signal.
+    """
+    if use_notify():
+        publish('updated', {'id': contest_id})
+        return
+    contest = Contest.objects.filter(pk=contest_id).first()
+    if contest is not None:
+        publish('updated', contest_data(contest))
+
+
+def read_event(message):
+    """
+    Return the data of a notified event, or None for a contest deleted
+    since, whose deleted event follows.
+    """
+    if message['type'] == 'deleted':
+        return {'id': message['id']}
+    contest = Contest.objects.filter(pk=message['id']).first()
+    return None if contest is None else contest_data(contest)
+
+
+_listener = None
+_listener_lock = threading.Lock()
+_stop_listening = threading.Event()
+
+
+def ensure_listener():
+    """
+    Start the NOTIFY listener thread for this process, once.
+    """
+    global _listener
+
+    if not use_notify():
+        return
+
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _stop_listening.clear()
+            _listener = threading.Thread(
+                target=listen,
+                name='contest-events-listener',
+                daemon=True
+            )
+            _listener.start()
+
+
+def stop_listener():
+    """
+    Stop the listener thread and close its connection.
+    """
+    with _listener_lock:
+        _stop_listening.set()
+        if _listener is not None:
+            _listener.join()
+
+
+def listen():
+    """
+    Forward NOTIFY messages into the local broker, reconnecting on errors.
+
+    Notifications sent while disconnected are lost, so subscribers are told
+    to reset after every reconnect. Contests are read through the thread's
+    own Django connection, closed on errors and on exit.
+    """
+    reconnecting = False
+
+    while not _stop_listening.is_set():
+        try:
+            params = connections['default'].get_connection_params()
+            with psycopg.connect(**params, autocommit=True) as conn:
+                conn.execute(f'LISTEN {CHANNEL}')
+                if reconnecting:
+                    broker.publish('reset', {})
+                reconnecting = True
+
+                while not _stop_listening.is_set():
+                    for notify in conn.notifies(timeout=1.0):
+                        message = json.loads(notify.payload)
+                        data = read_event(message)
+                        if data is not None:
+                            broker.publish(message['type'], data)
+        except (psycopg.Error, DatabaseError):
+            logger.exception('Contest event listener lost its connection.')
+            connection.close()
+            reconnecting = True
+            _stop_listening.wait(1)
+
+    connection.close()
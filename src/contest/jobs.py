@@ -0,0 +1,13 @@
+"""
+Periodic maintenance of contest registrations, see core.scheduler.
+"""
+
+from datetime import timedelta
+
+from core.scheduler import scheduler
+from contest import participation
+
+
+@scheduler.job('recount-participations', interval=timedelta(days=1))
+def recount_participations():
+    participation.recount()
@@ -0,0 +1,27 @@
+"""
+Pagination for the contest API.
+"""
+
+from rest_framework.pagination import PageNumberPagination
+
+
+class ContestPagination(PageNumberPagination):
+    """
+    Page number pagination that only applies when it is asked for.
+
+    Plain list requests keep returning every contest; `page`, `page_size` or
+    `search` switch to paginated responses.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    trigger_query_params = ('page', 'page_size', 'search')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not any(
+            param in request.query_params
+            for param in self.trigger_query_params
+        ):
+            return None
+
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,130 @@
+"""
+Contest registration with denormalized participant counts.
+
+`Contest.participant_count` and `User.participation_count` move with every
+registration in the same transaction, by relative `F()` updates, so lists
+show them without counting. Registrations for a contest are serialized by
+a lock on its row, which the counter update takes anyway. Each change of
+`participant_count` bumps the contest's `last_updated` and publishes an
+updated event, so delta sync and event stream clients see it.
+
+Cascading deletes of users or contests remove participations without
+going through here; `recount` puts the counters right again and runs
+daily from contest.jobs.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Now
+
+from core.models import Contest, Participation
+from contest import events
+
+
+def register(contest, user_ids):
+    """
+    Register users for a contest, skipping ones already registered.
+
+    Returns the ids of the users newly registered.
+    """
+    with transaction.atomic():
+        Contest.objects.select_for_update().filter(pk=contest.pk).get()
+
+        registered = set(Participation.objects.filter(
+            contest=contest,
+            user_id__in=user_ids
+        ).values_list('user_id', flat=True))
+        new = sorted(set(user_ids) - registered)
+        if not new:
+            return []
+
+        Participation.objects.bulk_create(
+            [Participation(contest=contest, user_id=i) for i in new],
+            batch_size=1000
+        )
+        adjust(contest, new, len(new))
+    return new
+
+
+def unregister(contest, user_ids):
+    """
+    Remove users' registrations for a contest.
+
+    Returns the ids of the users that were registered.
+    """
+    with transaction.atomic():
+        Contest.objects.select_for_update().filter(pk=contest.pk).get()
+
+        removed = sorted(Participation.objects.filter(
+            contest=contest,
+            user_id__in=user_ids
+        ).values_list('user_id', flat=True))
+        if not removed:
+            return []
+
+        Participation.objects.filter(
+            contest=contest,
+            user_id__in=removed
+        ).delete()
+        adjust(contest, removed, -len(removed))
+    return removed
+
+
+def adjust(contest, user_ids, change):
+    """
+    Move the counters of a contest and its changed participants.
+
+    User rows are locked in id order first, so concurrent registrations
+    for different contests sharing members cannot deadlock.
+    """
+    step = 1 if change > 0 else -1
+    Contest.objects.filter(pk=contest.pk).update(
+        participant_count=F('participant_count') + change,
+        last_updated=Now()
+    )
+    transaction.on_commit(lambda: events.publish_updated(contest.pk))
+    users = get_user_model().objects.filter(id__in=user_ids)
+    list(users.select_for_update().order_by('id').values_list('id'))
+    users.update(participation_count=F('participation_count') + step)
+
+
+def recount():
+    """
+    Rewrite the counters that differ from the registrations stored.
+
+    Each counter that looks wrong is counted again under its row lock, so
+    a registration committing meanwhile is not undone. Returns the number
+    of contests and users corrected.
+    """
+    fixed = 0
+    for model, field, related in (
+        (Contest, 'participant_count', 'contest'),
+        (get_user_model(), 'participation_count', 'user'),
+    ):
+        actual = dict(
+            Participation.objects.values_list(related)
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        stored = dict(
+            model.objects.filter(**{f'{field}__gt': 0})
+            .values_list('id', field)
+        )
+        for pk in stored.keys() | actual.keys():
+            if stored.get(pk, 0) == actual.get(pk, 0):
+                continue
+            with transaction.atomic():
+                rows = model.objects.select_for_update().filter(pk=pk)
+                list(rows.values_list('id'))
+                changes = {field: Participation.objects.filter(
+                    **{related: pk}
+                ).count()}
+                if model is Contest:
+                    changes['last_updated'] = Now()
+                    transaction.on_commit(
+                        lambda pk=pk: events.publish_updated(pk)
+                    )
+                rows.update(**changes)
+            fixed += 1
+    return fixed
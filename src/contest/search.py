@@ -0,0 +1,134 @@
+"""
+Full-text search over contests.
+"""
+
+import re
+from importlib import import_module
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+
+FTS_TABLE = 'core_contest_fts'
+
+FTS_TRIGGERS = {
+    'core_contest_fts_insert',
+    'core_contest_fts_delete',
+    'core_contest_fts_update',
+}
+
+
+def search_contests(queryset, text):
+    """
+    Filter the queryset by a search string and order it by relevance.
+
+    PostgreSQL matches against the trigger-maintained `search_vector` through
+    its GIN index. SQLite uses the FTS5 table created by the same migration,
+    and anything else falls back to substring matching.
+    """
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return queryset.none()
+
+    connection = connections[queryset.db]
+
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(queryset, text)
+
+    if connection.vendor == 'sqlite' and _fts_available(connection):
+        return _search_sqlite(queryset, terms)
+
+    return _search_fallback(queryset, terms)
+
+
+def _search_postgresql(queryset, text):
+    query = SearchQuery(text, config='simple', search_type='websearch')
+    return queryset.filter(search_vector=query).annotate(
+        rank=SearchRank(F('search_vector'), query)
+    ).order_by('-rank', 'id')
+
+
+def _search_sqlite(queryset, terms):
+    match = ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+    table = queryset.model._meta.db_table
+    # bm25() is lower for better matches; name hits weigh more.
+    rank = RawSQL(
+        f'SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{table}"."id"',
+        (match,)
+    )
+    matches = RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (match,)
+    )
+    return queryset.filter(id__in=matches).annotate(
+        rank=rank
+    ).order_by('-rank', 'id')
+
+
+def _search_fallback(queryset, terms):
+    condition = Q()
+    for term in terms:
+        condition &= Q(name__icontains=term) | Q(description__icontains=term)
+
+    name_hits = Q()
+    for term in terms:
+        name_hits &= Q(name__icontains=term)
+
+    return queryset.filter(condition).annotate(
+        rank=Case(When(name_hits, then=Value(1.0)), default=Value(0.0))
+    ).order_by('-rank', 'id')
+
+
+def _fts_available(connection):
+    """
+    Check that the FTS5 table and its triggers exist.
+
+    SQLite drops triggers when a migration rebuilds the contest table, in
+    which case searching the stale index would miss rows.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE name = %s OR (type = 'trigger' AND tbl_name = %s)",
+            (FTS_TABLE, 'core_contest')
+        )
+        names = {row[0] for row in cursor.fetchall()}
+
+    return FTS_TABLE in names and FTS_TRIGGERS <= names
+
+
+def restore_sqlite_triggers(connection):
+    """
+    Recreate FTS5 triggers dropped by a rebuild of the contest table.
+
+    Migrations that alter `core_contest` on SQLite copy it into a new table,
+    which drops its triggers. The index is rebuilt as well, since rows
+    written while the triggers were missing never reached it. Returns
+    whether anything was restored.
+    """
+    if connection.vendor != 'sqlite':
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE name = %s OR (type = 'trigger' AND tbl_name = %s)",
+            (FTS_TABLE, 'core_contest')
+        )
+        names = {row[0] for row in cursor.fetchall()}
+        missing = FTS_TRIGGERS - names
+        if FTS_TABLE not in names or not missing:
+            return False
+
+        migration = import_module('core.migrations.0011_contest_search_vector')
+        *triggers, rebuild = migration.SQLITE_FORWARD[1:]
+        for statement in triggers:
+            # CREATE TRIGGER <name> ...
+            if statement.split()[2] in missing:
+                cursor.execute(statement)
+        cursor.execute(rebuild)
+
+    return True
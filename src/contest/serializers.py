@@ -4,7 +4,12 @@ Serializers for the contest API View.
 
 from rest_framework import serializers
 
-from core.models import Contest
+from core.models import Contest, Participation
+
+
+# Largest contest and user ids; larger numbers overflow database parameters.
+MAX_CONTEST_ID = 2 ** 31 - 1
+MAX_USER_ID = 2 ** 63 - 1
 
 
 class ContestSerializer(serializers.ModelSerializer):
@@ -19,9 +24,10 @@ class ContestSerializer(serializers.ModelSerializer):
             'name',
             'url',
             'platform',
-            'platform_id'
+            'platform_id',
+            'participant_count'
         ]
-        read_only_fields = ['id']
+        read_only_fields = ['id', 'participant_count']
 
 
 class ContestDetailSerializer(ContestSerializer):
@@ -36,4 +42,41 @@ class ContestDetailSerializer(ContestSerializer):
             'end_time',
             'last_updated'
         ]
-        read_only_fields = ['id', 'last_updated']
+        read_only_fields = ['id', 'participant_count', 'last_updated']
+
+
+class ParticipantSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a member registered for a contest.
+    """
+    id = serializers.IntegerField(source='user.id')
+    name = serializers.CharField(source='user.name')
+    joined_at = serializers.DateTimeField(source='created_at')
+
+    class Meta:
+        model = Participation
+        fields = ['id', 'name', 'joined_at']
+
+
+class RegistrationSerializer(serializers.Serializer):
+    """
+    Serializer for registering members for a contest in bulk.
+    """
+    users = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_USER_ID),
+        allow_empty=False,
+        max_length=5000
+    )
+
+
+class BatchSerializer(serializers.Serializer):
+    """
+    Serializer for the ids of a batch of contests.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(
+            min_value=1,
+            max_value=MAX_CONTEST_ID
+        ),
+        allow_empty=False
+    )
@@ -0,0 +1,32 @@
+"""
+Signal handlers for the contest app.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.models import Contest, ContestTombstone
+from contest import events
+
+
+@receiver(post_save, sender=Contest)
+def contest_saved(sender, instance, created, **kwargs):
+    """
+    Publish a created/updated event once the change is committed.
+    """
+    event_type = 'created' if created else 'updated'
+    data = events.contest_data(instance)
+
+    transaction.on_commit(lambda: events.publish(event_type, data))
+
+
+@receiver(post_delete, sender=Contest)
+def contest_deleted(sender, instance, **kwargs):
+    """
+    Record a tombstone and publish a deleted event once committed.
+    """
+    data = {'id': instance.id}
+    ContestTombstone.objects.create(contest_id=instance.id)
+
+    transaction.on_commit(lambda: events.publish('deleted', data))
@@ -0,0 +1,281 @@
+"""
+Tests for the contest calendar feeds.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import CalendarToken, Contest
+from contest.calendar import fold
+
+
+CALENDAR_URL = reverse('contest:contest-calendar')
+TOKEN_URL = reverse('user:calendar')
+
+
+def platform_url(platform):
+    return reverse('contest:contest-calendar-platform', args=[platform])
+
+
+def create_contest(**params):
+    """
+    Helper function to create a sample contest.
+    """
+    defaults = {
+        'name': 'Test Contest',
+        'url': 'https://example.com/contest/1',
+        'platform': 'C',
+        'platform_id': '1',
+        'start_time': timezone.now() + timedelta(days=1),
+    }
+    defaults.update(params)
+    if 'end_time' not in params:
+        defaults['end_time'] = defaults['start_time'] + timedelta(hours=2)
+    return Contest.objects.create(**defaults)
+
+
+def unfold(body):
+    return body.replace('\r\n ', '').split('\r\n')
+
+
+class ContestCalendarTests(TestCase):
+    """
+    Test serving contests as iCalendar feeds.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        self.token = CalendarToken.objects.create(user=self.user)
+
+    def get(self, url, **headers):
+        return self.client.get(url, {'token': self.token.key}, **headers)
+
+    def body(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode()
+
+    def test_requires_token(self):
+        """
+        Test feeds are refused without a valid token of an active member.
+        """
+        self.assertEqual(
+            self.client.get(CALENDAR_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+        self.assertEqual(
+            self.client.get(CALENDAR_URL, {'token': 'wrong'}).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(
+            self.get(CALENDAR_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+
+    def test_feed_lists_upcoming_contests(self):
+        """
+        Test the feed has an event per contest in its window, in order.
+        """
+        now = timezone.now()
+        later = create_contest(name='Later', start_time=now + timedelta(3))
+        sooner = create_contest(name='Sooner', start_time=now + timedelta(1))
+        create_contest(name='Old', start_time=now - timedelta(days=30))
+
+        res = self.get(CALENDAR_URL)
+
+        self.assertEqual(res['Content-Type'], 'text/calendar; charset=utf-8')
+        lines = unfold(self.body(res))
+        self.assertEqual(lines[0], 'BEGIN:VCALENDAR')
+        self.assertEqual(lines[-2:], ['END:VCALENDAR', ''])
+        self.assertEqual(
+            [line for line in lines if line.startswith('UID:')],
+            [
+                f'UID:contest-{sooner.id}@club-algoritmia-uaslp',
+                f'UID:contest-{later.id}@club-algoritmia-uaslp',
+            ]
+        )
+        self.assertIn(
+            'DTSTART:' + sooner.start_time.strftime('%Y%m%dT%H%M%SZ'),
+            lines
+        )
+        self.assertIn('CATEGORIES:Codeforces', lines)
+
+    def test_platform_feed(self):
+        """
+        Test a platform's feed only lists its contests.
+        """
+        create_contest(name='Codeforces Round')
+        create_contest(name='Kattis Contest', platform='K')
+
+        body = self.body(self.get(platform_url('K')))
+
+        self.assertIn('SUMMARY:Kattis Contest', body)
+        self.assertNotIn('Codeforces Round', body)
+        self.assertEqual(
+            self.get(platform_url('X')).status_code,
+            status.HTTP_404_NOT_FOUND
+        )
+
+    def test_text_is_escaped_and_folded(self):
+        """
+        Test property values are escaped and long lines folded.
+        """
+        create_contest(
+            name='Round; Div. 1, Div. 2',
+            description='Rules:\nbe nice \\ ' + 'á' * 60
+        )
+
+        body = self.body(self.get(CALENDAR_URL))
+
+        self.assertTrue(all(
+            len(line.encode()) <= 75 for line in body.split('\r\n')
+        ))
+        lines = unfold(body)
+        self.assertIn('SUMMARY:Round\\; Div. 1\\, Div. 2', lines)
+        self.assertIn(
+            'DESCRIPTION:Rules:\\nbe nice \\\\ ' + 'á' * 60,
+            lines
+        )
+
+    def test_fold_keeps_characters_whole(self):
+        """
+        Test folding never splits a multi-byte character.
+        """
+        line = 'SUMMARY:' + '€' * 40
+
+        folded = fold(line)
+
+        self.assertEqual(folded.replace('\r\n ', ''), line + '\r\n')
+        for part in folded.split('\r\n')[:-1]:
+            self.assertLessEqual(len(part.encode()), 75)
+
+    @override_settings(CONTEST_CALENDAR_CHUNK_SIZE=2)
+    def test_feed_is_streamed_in_chunks(self):
+        """
+        Test the feed is rendered a few contests at a time.
+        """
+        for number in range(5):
+            create_contest(name=f'Round {number}')
+
+        res = self.get(CALENDAR_URL)
+
+        chunks = list(res.streaming_content)
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(b''.join(chunks).count(b'BEGIN:VEVENT'), 5)
+
+    def test_unchanged_feed_is_not_modified(self):
+        """
+        Test a repeat poll costs one query and gets 304 Not Modified.
+        """
+        create_contest()
+        res = self.get(CALENDAR_URL)
+        self.body(res)
+
+        with self.assertNumQueries(1):
+            again = self.get(CALENDAR_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(again['ETag'], res['ETag'])
+
+        since = self.get(
+            CALENDAR_URL,
+            HTTP_IF_MODIFIED_SINCE=res['Last-Modified']
+        )
+        self.assertEqual(since.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_changes_invalidate_the_feed(self):
+        """
+        Test updating, adding and deleting contests change the ETag.
+        """
+        contest = create_contest()
+        etags = [self.get(CALENDAR_URL)['ETag']]
+
+        contest.name = 'Renamed'
+        contest.save()
+        etags.append(self.get(CALENDAR_URL)['ETag'])
+
+        other = create_contest(name='Other', platform='K')
+        etags.append(self.get(CALENDAR_URL)['ETag'])
+        etags.append(self.get(platform_url('C'))['ETag'])
+
+        other.delete()
+        res = self.get(CALENDAR_URL, HTTP_IF_NONE_MATCH=etags[2])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        etags.append(res['ETag'])
+
+        self.assertEqual(len(set(etags)), len(etags))
+
+
+class CalendarTokenApiTests(TestCase):
+    """
+    Test managing calendar feed tokens.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_get_creates_token_once(self):
+        """
+        Test the token is created on first use and then kept.
+        """
+        res = self.client.get(TOKEN_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        key = CalendarToken.objects.get(user=self.user).key
+        self.assertEqual(res.data['token'], key)
+        self.assertEqual(
+            res.data['url'],
+            f'http://testserver{CALENDAR_URL}?token={key}'
+        )
+        self.assertEqual(
+            res.data['platforms']['K'],
+            f'http://testserver{platform_url("K")}?token={key}'
+        )
+        self.assertEqual(self.client.get(TOKEN_URL).data['token'], key)
+
+    def test_rotate_and_revoke(self):
+        """
+        Test replacing and revoking the token disables the old feed URLs.
+        """
+        old = self.client.get(TOKEN_URL).data['token']
+
+        new = self.client.post(TOKEN_URL).data['token']
+
+        self.assertNotEqual(new, old)
+        self.assertEqual(
+            self.client.get(CALENDAR_URL, {'token': old}).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+        self.assertEqual(
+            self.client.get(CALENDAR_URL, {'token': new}).status_code,
+            status.HTTP_200_OK
+        )
+
+        res = self.client.delete(TOKEN_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(CalendarToken.objects.exists())
+
+    def test_requires_authentication(self):
+        """
+        Test anonymous users cannot get a token.
+        """
+        res = APIClient().get(TOKEN_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -2,15 +2,22 @@
 Tests for contest API.
 """
 
-from django.test import TestCase
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Contest
+from core.models import Contest, ContestTombstone
 
+from contest import search
 from contest.serializers import (
     ContestSerializer,
     ContestDetailSerializer
@@ -18,6 +25,7 @@ from contest.serializers import (
 
 
 CONTEST_URL = reverse('contest:contest-list')
+BATCH_URL = reverse('contest:contest-batch')
 
 
 def detail_url(contest_id):
@@ -100,6 +108,221 @@ class PrivateContestApiTests(TestCase):
 
         self.assertEqual(res.data, serializer.data)
 
+    def test_search_contests(self):
+        """
+        Test searching contests ranks name matches first.
+        """
+        in_description = create_contest(
+            '1',
+            name='Weekly Practice',
+            description='Graph problems: shortest paths and flows'
+        )
+        in_name = create_contest(
+            '2',
+            name='Graph Marathon',
+            description='Long contest'
+        )
+        create_contest('3', name='Dynamic Programming Cup')
+
+        res = self.client.get(CONTEST_URL, {'search': 'graph'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 2)
+        self.assertEqual(
+            [contest['id'] for contest in res.data['results']],
+            [in_name.id, in_description.id]
+        )
+
+    def test_search_contests_all_terms(self):
+        """
+        Test that every search term has to match.
+        """
+        contest = create_contest('1', name='Graph Marathon')
+        create_contest('2', name='Graph Sprint')
+
+        res = self.client.get(CONTEST_URL, {'search': 'graph marathon'})
+
+        self.assertEqual(
+            [c['id'] for c in res.data['results']],
+            [contest.id]
+        )
+
+    def test_search_sees_updates(self):
+        """
+        Test that the search index follows contest updates.
+        """
+        contest = create_contest('1', name='Old Name')
+        contest.name = 'Renamed Contest'
+        contest.save()
+
+        res = self.client.get(CONTEST_URL, {'search': 'renamed'})
+        self.assertEqual(res.data['count'], 1)
+
+        res = self.client.get(CONTEST_URL, {'search': 'old'})
+        self.assertEqual(res.data['count'], 0)
+
+    def test_search_fallback(self):
+        """
+        Test the substring fallback used without a full-text index.
+        """
+        contest = create_contest('1', name='Graph Marathon')
+        create_contest('2', name='Other', description='a marathon')
+        create_contest('3', name='Unrelated')
+
+        results = search._search_fallback(
+            Contest.objects.all(),
+            ['marathon']
+        )
+
+        self.assertEqual(results[0], contest)
+        self.assertEqual(len(results), 2)
+
+    def test_search_paginated(self):
+        """
+        Test that search results are paginated.
+        """
+        for i in range(3):
+            create_contest(str(i), name=f'Graph Round {i}')
+
+        res = self.client.get(
+            CONTEST_URL,
+            {'search': 'graph', 'page_size': 2, 'page': 2}
+        )
+
+        self.assertEqual(res.data['count'], 3)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertIsNotNone(res.data['previous'])
+
+    def test_delta_sync(self):
+        """
+        Test that updated_since returns changed and deleted contests.
+        """
+        unchanged = create_contest('1')
+        changed = create_contest('2')
+        deleted = create_contest('3')
+        since = timezone.now()
+        Contest.objects.filter(id=unchanged.id).update(
+            last_updated=since - timedelta(minutes=1)
+        )
+
+        changed.name = 'Changed'
+        changed.save()
+        deleted_id = deleted.id
+        deleted.delete()
+
+        res = self.client.get(
+            CONTEST_URL,
+            {'updated_since': since.isoformat()}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [contest['id'] for contest in res.data['results']],
+            [changed.id]
+        )
+        self.assertEqual(res.data['results'][0]['name'], 'Changed')
+        self.assertEqual(res.data['deleted'], [deleted_id])
+        self.assertLess(res.data['synced_at'], timezone.now())
+
+    def test_delta_sync_invalid_timestamp(self):
+        """
+        Test that an unparseable updated_since is rejected.
+        """
+        for value in ('yesterday', '2024-13-45T00:00:00'):
+            res = self.client.get(CONTEST_URL, {'updated_since': value})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_delta_sync_expired(self):
+        """
+        Test that updated_since older than the tombstones is refused.
+        """
+        since = timezone.now() - timedelta(days=31)
+
+        res = self.client.get(
+            CONTEST_URL,
+            {'updated_since': since.isoformat()}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+
+    def test_tombstone_on_delete(self):
+        """
+        Test that deleting a contest records a tombstone.
+        """
+        contest = create_contest('1')
+        contest_id = contest.id
+
+        contest.delete()
+
+        self.assertTrue(
+            ContestTombstone.objects.filter(contest_id=contest_id).exists()
+        )
+
+    def test_batch_retrieve(self):
+        """
+        Test retrieving several contests by id in one request.
+        """
+        first = create_contest('1')
+        second = create_contest('2')
+        missing_id = second.id + 100
+
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                BATCH_URL,
+                {'ids': f'{second.id},{missing_id},{first.id},{second.id}'}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'],
+            ContestDetailSerializer([second, first], many=True).data
+        )
+        self.assertEqual(res.data['missing'], [missing_id])
+
+    def test_batch_retrieve_post(self):
+        """
+        Test posting the ids of the contests to retrieve.
+        """
+        contest = create_contest('1')
+
+        res = self.client.post(
+            BATCH_URL,
+            {'ids': [contest.id]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['id'], contest.id)
+        self.assertEqual(res.data['missing'], [])
+
+    def test_batch_retrieve_invalid_ids(self):
+        """
+        Test that missing or malformed ids are rejected.
+        """
+        for params in [
+            {},
+            {'ids': ''},
+            {'ids': '1,abc'},
+            {'ids': '0'},
+            {'ids': '99999999999999999999'},
+        ]:
+            res = self.client.get(BATCH_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        for ids in ['12', [2 ** 31]]:
+            res = self.client.post(BATCH_URL, {'ids': ids}, format='json')
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(CONTEST_BATCH_MAX_IDS=2)
+    def test_batch_retrieve_limit(self):
+        """
+        Test that the batch size is capped.
+        """
+        res = self.client.get(BATCH_URL, {'ids': '1,2,3'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_create_contest_as_basic_user_fails(self):
         """
         Test creating a contest as a basic user.
@@ -217,3 +440,39 @@ class StaffContestApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
 
         self.assertFalse(Contest.objects.filter(id=contest.id).exists())
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Requires SQLite.')
+class SQLiteSearchTests(TestCase):
+    """
+    Test the SQLite full-text index survives the migration history.
+    """
+
+    def test_search_after_full_migrate(self):
+        """
+        Test a contest created after migrating is found through FTS5.
+        """
+        contest = create_contest('1', name='Graph Marathon')
+
+        results = search.search_contests(Contest.objects.all(), 'graph')
+
+        self.assertTrue(search._fts_available(connection))
+        self.assertEqual(list(results), [contest])
+
+    def test_post_migrate_restores_triggers(self):
+        """
+        Test dropped triggers are recreated and the index rebuilt.
+        """
+        with connection.cursor() as cursor:
+            for trigger in search.FTS_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER {trigger}')
+        missed = create_contest('1', name='Graph Marathon')
+        self.assertFalse(search._fts_available(connection))
+
+        emit_post_migrate_signal(verbosity=0, interactive=False, db='default')
+        contest = create_contest('2', name='Graph Sprint')
+
+        results = search.search_contests(Contest.objects.all(), 'graph')
+
+        self.assertTrue(search._fts_available(connection))
+        self.assertEqual(set(results), {missed, contest})
@@ -0,0 +1,333 @@
+"""
+Tests for the contest event stream.
+"""
+
+import asyncio
+import json
+import time
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+
+from core.models import Contest
+from contest import events
+from contest.events import ContestEventBroker
+
+
+EVENTS_URL = reverse('contest:contest-events')
+EVENT_TOKEN_URL = reverse('contest:contest-events-token')
+
+
+def create_contest(**params):
+    """
+    Helper function to create a sample contest.
+    """
+    defaults = {
+        'name': 'Test Contest',
+        'url': 'https://example.com/contest/1',
+        'platform': 'C',
+        'platform_id': '1',
+    }
+    defaults.update(params)
+    return Contest.objects.create(**defaults)
+
+
+class ContestEventBrokerTests(SimpleTestCase):
+    """
+    Test the in-memory event ring buffer.
+    """
+
+    def setUp(self):
+        self.broker = ContestEventBroker(size=3)
+
+    def test_since(self):
+        """
+        Test resuming from a buffered event.
+        """
+        for i in range(3):
+            self.broker.publish('created', {'id': i})
+
+        resumed = self.broker.since(1)
+
+        self.assertEqual([event.seq for event in resumed], [2, 3])
+        self.assertEqual(resumed[0].data, '{"id": 1}')
+        self.assertEqual(self.broker.since(3), [])
+
+    def test_since_overrun(self):
+        """
+        Test that resuming from before the buffer asks for a reset.
+        """
+        for i in range(5):
+            self.broker.publish('created', {'id': i})
+
+        self.assertIsNone(self.broker.since(1))
+        self.assertEqual(
+            [event.seq for event in self.broker.since(2)],
+            [3, 4, 5]
+        )
+
+    def test_parse_id(self):
+        """
+        Test that only ids from this broker are accepted.
+        """
+        self.broker.publish('created', {})
+
+        self.assertEqual(self.broker.parse_id(f'{self.broker.epoch}-1'), 1)
+        self.assertIsNone(self.broker.parse_id('other-1'))
+        self.assertIsNone(self.broker.parse_id(None))
+
+    def test_wait_wakes_all_subscribers(self):
+        """
+        Test that one publish wakes every waiting subscriber.
+        """
+        async def scenario():
+            waiters = [
+                asyncio.create_task(self.broker.wait(0)) for _ in range(100)
+            ]
+            await asyncio.sleep(0)
+            self.assertFalse(any(waiter.done() for waiter in waiters))
+
+            self.broker.publish('created', {})
+            await asyncio.wait_for(asyncio.gather(*waiters), 1)
+
+        asyncio.run(scenario())
+
+
+@override_settings(CONTEST_EVENTS_NOTIFY=False)
+class ContestEventSignalTests(TestCase):
+    """
+    Test that contest changes publish events after commit.
+    """
+
+    def test_events_on_change(self):
+        """
+        Test created, updated and deleted events.
+        """
+        start = events.broker.last_seq
+
+        with self.captureOnCommitCallbacks(execute=True):
+            contest = create_contest()
+        with self.captureOnCommitCallbacks(execute=True):
+            contest.name = 'Renamed'
+            contest.save()
+        contest_id = contest.id
+        with self.captureOnCommitCallbacks(execute=True):
+            contest.delete()
+
+        published = events.broker.since(start)
+        self.assertEqual(
+            [event.type for event in published],
+            ['created', 'updated', 'deleted']
+        )
+        self.assertIn('"name": "Renamed"', published[1].data)
+        self.assertEqual(published[2].data, f'{{"id": {contest_id}}}')
+
+    def test_no_event_without_commit(self):
+        """
+        Test that rolled back changes publish nothing.
+        """
+        start = events.broker.last_seq
+
+        with self.captureOnCommitCallbacks(execute=False):
+            create_contest()
+
+        self.assertEqual(events.broker.last_seq, start)
+
+
+@override_settings(
+    CONTEST_EVENTS_NOTIFY=False,
+    CONTEST_EVENTS_HEARTBEAT_SECONDS=0.05
+)
+class ContestEventStreamTests(TestCase):
+    """
+    Test the server-sent events endpoint.
+    """
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            'events@example.com',
+            'testpass1234'
+        )
+        self.token = Token.objects.create(user=user)
+
+    async def open_stream(self, **headers):
+        res = await self.async_client.get(
+            EVENTS_URL,
+            headers={'Authorization': f'Token {self.token.key}', **headers}
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['Content-Type'], 'text/event-stream')
+        return res.streaming_content
+
+    async def test_auth_required(self):
+        """
+        Test that a valid token is required.
+        """
+        res = await self.async_client.get(EVENTS_URL)
+
+        self.assertEqual(res.status_code, 401)
+
+    async def test_stream_token_query_parameter(self):
+        """
+        Test authenticating with a stream token in the query string.
+        """
+        res = await self.async_client.post(
+            EVENT_TOKEN_URL,
+            headers={'Authorization': f'Token {self.token.key}'}
+        )
+        self.assertEqual(res.status_code, 200)
+
+        res = await self.async_client.get(
+            EVENTS_URL,
+            {'token': res.json()['token']}
+        )
+
+        self.assertEqual(res.status_code, 200)
+        await res.streaming_content.aclose()
+
+    async def test_query_parameter_refuses_api_tokens(self):
+        """
+        Test that API tokens are not accepted in the query string.
+        """
+        res = await self.async_client.get(
+            EVENTS_URL,
+            {'token': self.token.key}
+        )
+
+        self.assertEqual(res.status_code, 401)
+
+    async def test_stream_token_expires(self):
+        """
+        Test that a stream token stops opening streams after a while.
+        """
+        res = await self.async_client.post(
+            EVENT_TOKEN_URL,
+            headers={'Authorization': f'Token {self.token.key}'}
+        )
+
+        with patch(
+            'django.core.signing.time.time',
+            return_value=time.time() + 400
+        ):
+            res = await self.async_client.get(
+                EVENTS_URL,
+                {'token': res.json()['token']}
+            )
+
+        self.assertEqual(res.status_code, 401)
+
+    async def test_stream_new_events(self):
+        """
+        Test that published events are pushed to the client.
+        """
+        stream = await self.open_stream()
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+
+        events.broker.publish('created', {'id': 7})
+        chunk = await anext(stream)
+
+        self.assertIn(b'event: created\n', chunk)
+        self.assertIn(b'data: {"id": 7}\n', chunk)
+        await stream.aclose()
+
+    async def test_keep_alive(self):
+        """
+        Test that idle streams send keep-alive comments.
+        """
+        stream = await self.open_stream()
+        await anext(stream)
+
+        self.assertEqual(await anext(stream), b': keep-alive\n\n')
+        await stream.aclose()
+
+    async def test_resume(self):
+        """
+        Test resuming with Last-Event-ID replays missed events.
+        """
+        events.broker.publish('created', {'id': 1})
+        last_id = f'{events.broker.epoch}-{events.broker.last_seq}'
+        events.broker.publish('updated', {'id': 1})
+
+        stream = await self.open_stream(**{'Last-Event-ID': last_id})
+        await anext(stream)
+        chunk = await anext(stream)
+
+        self.assertIn(b'event: updated\n', chunk)
+        await stream.aclose()
+
+    async def test_resume_unknown_id(self):
+        """
+        Test that an unknown Last-Event-ID gets a reset event.
+        """
+        stream = await self.open_stream(**{'Last-Event-ID': 'stale-1'})
+        await anext(stream)
+        chunk = await anext(stream)
+
+        self.assertIn(b'event: reset\n', chunk)
+        await stream.aclose()
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Requires PostgreSQL.')
+@override_settings(CONTEST_EVENTS_NOTIFY=True)
+class ContestEventNotifyTests(TransactionTestCase):
+    """
+    Test that events travel between processes through NOTIFY.
+    """
+
+    def tearDown(self):
+        events.stop_listener()
+
+    def test_notify_reaches_broker(self):
+        """
+        Test that a committed change arrives through the listener.
+        """
+        events.ensure_listener()
+        time.sleep(0.5)
+        start = events.broker.last_seq
+
+        create_contest()
+
+        deadline = time.monotonic() + 5
+        while events.broker.last_seq == start and \
+                time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        published = events.broker.since(start)
+        self.assertEqual([event.type for event in published], ['created'])
+
+    def test_notify_reads_contest(self):
+        """
+        Test that the listener reads the notified contest's data.
+        """
+        events.ensure_listener()
+        time.sleep(0.5)
+        start = events.broker.last_seq
+
+        contest = create_contest(name='ü' * 255)
+
+        deadline = time.monotonic() + 5
+        while events.broker.last_seq == start and \
+                time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        published = events.broker.since(start)
+        self.assertEqual([event.type for event in published], ['created'])
+        self.assertEqual(
+            json.loads(published[0].data),
+            json.loads(json.dumps(
+                events.contest_data(contest),
+                cls=DjangoJSONEncoder
+            ))
+        )
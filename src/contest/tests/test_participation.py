@@ -0,0 +1,215 @@
+"""
+Tests for contest registration and its counters.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Contest, Participation
+from contest import participation
+
+
+CONTEST_URL = reverse('contest:contest-list')
+
+
+def join_url(contest_id):
+    return reverse('contest:contest-join', args=[contest_id])
+
+
+def participants_url(contest_id):
+    return reverse('contest:contest-participants', args=[contest_id])
+
+
+def create_contest(platform_id, **params):
+    defaults = {
+        'name': 'Test Contest',
+        'url': 'https://example.com/contest/1',
+        'platform': 'C',
+        'platform_id': platform_id
+    }
+    defaults.update(params)
+    return Contest.objects.create(**defaults)
+
+
+def create_user(email, **params):
+    return get_user_model().objects.create_user(
+        email=email,
+        password='testpass123',
+        name=email.split('@')[0],
+        **params
+    )
+
+
+class ParticipationApiTests(TestCase):
+    """
+    Test joining contests and listing participants.
+    """
+
+    def setUp(self):
+        self.user = create_user('member@example.com')
+        self.staff = create_user('staff@example.com', is_staff=True)
+        self.contest = create_contest('1')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.staff_client = APIClient()
+        self.staff_client.force_authenticate(self.staff)
+
+    def test_join_and_leave(self):
+        """Test joining and leaving move both counters."""
+        res = self.client.post(join_url(self.contest.id))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['participant_count'], 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.participation_count, 1)
+
+        res = self.client.post(join_url(self.contest.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['participant_count'], 1)
+
+        res = self.client.delete(join_url(self.contest.id))
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.contest.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(self.contest.participant_count, 0)
+        self.assertEqual(self.user.participation_count, 0)
+        self.assertFalse(Participation.objects.exists())
+
+    def test_list_participants(self):
+        """Test members see who is registered, in order of joining."""
+        other = create_user('other@example.com')
+        participation.register(self.contest, [self.user.id])
+        participation.register(self.contest, [other.id])
+
+        res = self.client.get(participants_url(self.contest.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['id'], row['name']) for row in res.data],
+            [(self.user.id, 'member'), (other.id, 'other')]
+        )
+
+    def test_join_reaches_delta_sync_and_events(self):
+        """Test a join shows in the next delta and is published."""
+        since = timezone.now()
+
+        with patch('contest.events.publish') as publish, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.client.post(join_url(self.contest.id))
+
+        res = self.client.get(CONTEST_URL, {'updated_since': since})
+        self.assertEqual(
+            [(c['id'], c['participant_count']) for c in res.data['results']],
+            [(self.contest.id, 1)]
+        )
+        event_type, data = publish.call_args.args
+        self.assertEqual(event_type, 'updated')
+        self.assertEqual(data['id'], self.contest.id)
+
+    def test_bulk_registration(self):
+        """Test staff register many members in one request."""
+        members = [create_user(f'm{i}@example.com') for i in range(3)]
+        inactive = create_user('gone@example.com', is_active=False)
+        participation.register(self.contest, [members[0].id])
+        ids = [member.id for member in members] + [inactive.id, 99999]
+
+        res = self.staff_client.post(
+            participants_url(self.contest.id),
+            {'users': ids},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            res.data['registered'],
+            [members[1].id, members[2].id]
+        )
+        self.assertEqual(res.data['missing'], [inactive.id, 99999])
+        self.contest.refresh_from_db()
+        self.assertEqual(self.contest.participant_count, 3)
+        self.assertEqual(
+            sorted(get_user_model().objects.filter(
+                id__in=ids
+            ).values_list('participation_count', flat=True)),
+            [0, 1, 1, 1]
+        )
+
+    def test_bulk_registration_rejects_out_of_range_ids(self):
+        """Test ids past the key range are refused, not sent to the db."""
+        res = self.staff_client.post(
+            participants_url(self.contest.id),
+            {'users': [99999999999999999999]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_registration_requires_staff(self):
+        """Test members cannot register others."""
+        res = self.client.post(
+            participants_url(self.contest.id),
+            {'users': [self.staff.id]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Participation.objects.exists())
+
+    def test_contest_list_queries(self):
+        """Test counts in the contest list cost no extra queries."""
+        members = [create_user(f'm{i}@example.com') for i in range(4)]
+        for i in range(2, 6):
+            contest = create_contest(str(i))
+            participation.register(
+                contest,
+                [member.id for member in members[:i - 1]]
+            )
+
+        with self.assertNumQueries(1):
+            res = self.client.get(CONTEST_URL)
+        self.assertEqual(
+            [contest['participant_count'] for contest in res.data],
+            [0, 1, 2, 3, 4]
+        )
+
+        with self.assertNumQueries(2):
+            res = self.client.get(CONTEST_URL, {'page': 1})
+        self.assertEqual(res.data['count'], 5)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(reverse('user:list'))
+        self.assertEqual(
+            sorted(user['participation_count'] for user in res.data),
+            [0, 0, 1, 2, 3, 4]
+        )
+
+
+class RecountTests(TestCase):
+    """
+    Test correcting counters that drifted.
+    """
+
+    def test_recount_after_cascade(self):
+        """Test counters are right again after deleting a member."""
+        contest = create_contest('1')
+        users = [create_user(f'm{i}@example.com') for i in range(3)]
+        participation.register(contest, [user.id for user in users])
+        users[0].delete()
+        get_user_model().objects.filter(id=users[1].id).update(
+            participation_count=7
+        )
+
+        self.assertEqual(participation.recount(), 2)
+
+        contest.refresh_from_db()
+        users[1].refresh_from_db()
+        self.assertEqual(contest.participant_count, 2)
+        self.assertEqual(users[1].participation_count, 1)
+        self.assertEqual(participation.recount(), 0)
@@ -15,5 +15,17 @@ router.register('contest', views.ContestViewSet)
 app_name = 'contest'
 
 urlpatterns = [
-    path('', include(router.urls))
+    path('events/', views.contest_events, name='contest-events'),
+    path(
+        'events/token/',
+        views.EventStreamTokenView.as_view(),
+        name='contest-events-token'
+    ),
+    path('calendar.ics', views.contest_calendar, name='contest-calendar'),
+    path(
+        'calendar/<str:platform>.ics',
+        views.contest_calendar,
+        name='contest-calendar-platform'
+    ),
+    path('', include(router.urls)),
 ]
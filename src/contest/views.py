@@ -2,14 +2,75 @@
 Views for the contest API.
 """
 
-from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+import asyncio
+from datetime import timedelta, timezone as dt_timezone
 
-from core.models import Contest
-from contest import serializers
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
 
+from drf_spectacular.utils import (
+    extend_schema_view,
+    extend_schema,
+    OpenApiParameter,
+    OpenApiTypes,
+)
 
+from rest_framework import status, viewsets
+from rest_framework.authtoken.models import Token
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.authentication import TokenAuthentication
+from core.models import Contest, ContestTombstone, Participation
+from contest import calendar, events, participation, serializers
+from contest.pagination import ContestPagination
+from contest.search import search_contests
+
+
+@extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'search',
+                OpenApiTypes.STR,
+                description='Full-text search over name and description. '
+                            'Results are ranked and paginated.',
+            ),
+            OpenApiParameter(
+                'updated_since',
+                OpenApiTypes.DATETIME,
+                description='Only return contests changed after this time, '
+                            'plus the ids of contests deleted since then. '
+                            'Pass the returned synced_at on the next call.',
+            ),
+        ]
+    ),
+    batch=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'ids',
+                OpenApiTypes.STR,
+                description='Comma separated contest ids. POST a JSON body '
+                            '`{"ids": [...]}` instead for long lists.',
+            ),
+        ]
+    ),
+    join=extend_schema(request=None),
+    participants=extend_schema(
+        request=serializers.RegistrationSerializer,
+        responses=serializers.ParticipantSerializer(many=True)
+    ),
+)
 class ContestViewSet(viewsets.ModelViewSet):
     """
     Manage contests in the database.
@@ -18,10 +79,184 @@ class ContestViewSet(viewsets.ModelViewSet):
     queryset = Contest.objects.all()
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = ContestPagination
+    replica_reads = ('list', 'retrieve', 'batch', 'participants')
 
     def get_queryset(self):
+        """
+        Retrieve contests, ranked by relevance when searching.
+        """
+        search = self.request.query_params.get('search')
+
+        if self.action == 'list' and search:
+            return search_contests(self.queryset, search)
+
         return self.queryset.order_by('id')
 
+    def list(self, request, *args, **kwargs):
+        """
+        List contests, or the changes since `updated_since`.
+        """
+        if 'updated_since' in request.query_params:
+            return self.delta(request.query_params['updated_since'])
+
+        return super().list(request, *args, **kwargs)
+
+    def delta(self, value):
+        """
+        Return contests updated and deleted since the given timestamp.
+
+        `synced_at` trails the request time by CONTEST_SYNC_OVERLAP_SECONDS so
+        rows committed late by concurrent transactions are picked up by the
+        next call; clients should apply changes idempotently. Changes made
+        with QuerySet.update() do not touch last_updated and are not seen.
+        """
+        try:
+            since = parse_datetime(value)
+        except ValueError:
+            # Well formed, but not a date, like 2024-13-45T00:00:00.
+            since = None
+        if since is None:
+            return Response(
+                {'updated_since': 'Enter a valid ISO 8601 timestamp.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since, dt_timezone.utc)
+
+        now = timezone.now()
+        retention = timedelta(
+            days=getattr(settings, 'CONTEST_TOMBSTONE_RETENTION_DAYS', 30)
+        )
+        if since < now - retention:
+            return Response(
+                {'detail': 'updated_since is older than the deletion log; '
+                           'fetch the full list instead.'},
+                status=status.HTTP_410_GONE
+            )
+
+        overlap = timedelta(
+            seconds=getattr(settings, 'CONTEST_SYNC_OVERLAP_SECONDS', 5)
+        )
+        updated = self.queryset.filter(
+            last_updated__gt=since
+        ).order_by('last_updated', 'id')
+        deleted = ContestTombstone.objects.filter(
+            deleted_at__gt=since
+        ).values_list('contest_id', flat=True).distinct()
+
+        return Response({
+            'results': serializers.ContestDetailSerializer(
+                updated,
+                many=True
+            ).data,
+            'deleted': sorted(deleted),
+            'synced_at': now - overlap,
+        })
+
+    @action(detail=False, methods=['get', 'post'])
+    def batch(self, request):
+        """
+        Retrieve several contests by id in a single query.
+
+        Results follow the order of the requested ids; ids without a contest
+        are listed under `missing`.
+        """
+        if request.method == 'POST':
+            data = request.data
+        else:
+            data = {'ids': [
+                i for i in request.query_params.get('ids', '').split(',')
+                if i.strip()
+            ]}
+        serializer = serializers.BatchSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+
+        max_ids = getattr(settings, 'CONTEST_BATCH_MAX_IDS', 100)
+        if len(ids) > max_ids:
+            return Response(
+                {'ids': f'Ask for at most {max_ids} contests at a time.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        contests = self.queryset.in_bulk(ids)
+
+        return Response({
+            'results': serializers.ContestDetailSerializer(
+                [contests[i] for i in ids if i in contests],
+                many=True
+            ).data,
+            'missing': [i for i in ids if i not in contests],
+        })
+
+    @action(detail=True, methods=['post', 'delete'])
+    def join(self, request, pk=None):
+        """
+        Register the authenticated member for the contest, or withdraw
+        their registration.
+        """
+        contest = self.get_object()
+        if request.method == 'DELETE':
+            participation.unregister(contest, [request.user.id])
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        joined = participation.register(contest, [request.user.id])
+        contest.refresh_from_db(fields=['participant_count'])
+        return Response(
+            {'participant_count': contest.participant_count},
+            status=status.HTTP_201_CREATED if joined else status.HTTP_200_OK
+        )
+
+    @action(detail=True, methods=['get', 'post'])
+    def participants(self, request, pk=None):
+        """
+        List the members registered for the contest, or register members
+        in bulk (staff only).
+        """
+        contest = self.get_object()
+        if request.method == 'POST':
+            return self.register_members(request, contest)
+
+        queryset = Participation.objects.filter(
+            contest=contest
+        ).select_related('user').order_by('created_at', 'id')
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                serializers.ParticipantSerializer(page, many=True).data
+            )
+        return Response(
+            serializers.ParticipantSerializer(queryset, many=True).data
+        )
+
+    def register_members(self, request, contest):
+        """
+        Register the active members among the given ids.
+        """
+        if not IsAdminUser().has_permission(request, self):
+            self.permission_denied(
+                request,
+                message='You do not have permission to register members.'
+            )
+        serializer = serializers.RegistrationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['users']))
+
+        active = set(get_user_model().objects.filter(
+            id__in=ids,
+            is_active=True
+        ).values_list('id', flat=True))
+        registered = participation.register(contest, sorted(active))
+
+        return Response(
+            {
+                'registered': registered,
+                'missing': [i for i in ids if i not in active],
+            },
+            status=status.HTTP_201_CREATED
+        )
+
     def get_serializer_class(self):
         """
         Return appropriate serializer class.
@@ -63,3 +298,181 @@ class ContestViewSet(viewsets.ModelViewSet):
                 message='You do not have permission to delete contests.'
             )
         instance.delete()
+
+
+# Salt scoping signed tokens to the event stream.
+STREAM_TOKEN_SALT = 'contest.events.stream'
+
+
+class EventStreamTokenView(APIView):
+    """
+    Issue a short-lived token for the event stream's query string.
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """
+        Sign a token that opens streams for CONTEST_EVENTS_TOKEN_SECONDS.
+        """
+        ttl = getattr(settings, 'CONTEST_EVENTS_TOKEN_SECONDS', 300)
+        return Response({
+            'token': signing.dumps(request.user.pk, salt=STREAM_TOKEN_SALT),
+            'expires_in': ttl,
+        })
+
+
+async def contest_events(request):
+    """
+    Stream contest changes as server-sent events.
+
+    Authenticate with an `Authorization: Token ...` header or, for browser
+    EventSource clients that cannot set headers, a stream token from
+    /api/contest/events/token/ in the `token` query parameter. Query
+    strings end up in logs, so API tokens are not accepted there, and a
+    stream token only opens streams for a few minutes; clients reconnect
+    with a new one once it is refused. Resume with `Last-Event-ID`; a
+    `reset` event means the events since then are no longer available and
+    the contest list has to be fetched again. Requires an ASGI server.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'detail': 'The event stream requires an ASGI server.'},
+            status=501
+        )
+
+    user = await authenticate_token(request)
+    if user is None:
+        return JsonResponse(
+            {'detail': 'Invalid or missing token.'},
+            status=401
+        )
+
+    events.ensure_listener()
+
+    last_event_id = (
+        request.headers.get('Last-Event-ID')
+        or request.GET.get('last_event_id')
+    )
+    response = StreamingHttpResponse(
+        stream_events(
+            last_event_id,
+            getattr(settings, 'CONTEST_EVENTS_HEARTBEAT_SECONDS', 15)
+        ),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def authenticate_token(request):
+    """
+    Return the active user owning the request's API or stream token, or
+    None.
+    """
+    header = request.headers.get('Authorization', '').split()
+    if len(header) == 2 and header[0] == 'Token':
+        token = await Token.objects.select_related('user').filter(
+            key=header[1]
+        ).afirst()
+        user = token and token.user
+    else:
+        try:
+            user_id = signing.loads(
+                request.GET.get('token', ''),
+                salt=STREAM_TOKEN_SALT,
+                max_age=getattr(settings, 'CONTEST_EVENTS_TOKEN_SECONDS', 300)
+            )
+        except signing.BadSignature:
+            return None
+        user = await get_user_model().objects.filter(pk=user_id).afirst()
+
+    if user is None or not user.is_active:
+        return None
+
+    return user
+
+
+def format_event(event_id, event_type, data):
+    """
+    Format one server-sent event.
+    """
+    return f'id: {event_id}\nevent: {event_type}\ndata: {data}\n\n'
+
+
+async def stream_events(last_event_id, heartbeat):
+    """
+    Yield buffered events after last_event_id, then new ones as they come.
+    """
+    broker = events.broker
+
+    if last_event_id:
+        seq = broker.parse_id(last_event_id)
+        backlog = broker.since(seq)
+    else:
+        seq = broker.last_seq
+        backlog = []
+
+    yield 'retry: 3000\n\n'
+
+    while True:
+        if backlog is None:
+            seq = broker.last_seq
+            backlog = []
+            yield format_event(f'{broker.epoch}-{seq}', 'reset', '{}')
+
+        for event in backlog:
+            seq = event.seq
+            yield format_event(event.id, event.type, event.data)
+
+        try:
+            await asyncio.wait_for(broker.wait(seq), heartbeat)
+        except asyncio.TimeoutError:
+            backlog = []
+            yield ': keep-alive\n\n'
+            continue
+
+        backlog = broker.since(seq)
+
+
+@require_safe
+def contest_calendar(request, platform=None):
+    """
+    Serve an iCalendar feed of upcoming contests, of one platform or all.
+
+    Authenticate with the member's calendar token in the `token` query
+    parameter, see /api/user/me/calendar/. A feed unchanged since the
+    client's copy, by If-None-Match or If-Modified-Since, is answered with
+    304 Not Modified after a single query.
+    """
+    if platform is not None and platform not in Contest.PLATFORMS:
+        return JsonResponse({'detail': 'Unknown platform.'}, status=404)
+
+    key = request.GET.get('token')
+    start = calendar.window_start()
+    state = calendar.feed_state(key, platform, start) if key else None
+    if state is None:
+        return JsonResponse(
+            {'detail': 'Invalid or missing token.'},
+            status=401
+        )
+
+    etag = quote_etag(state['etag'])
+    last_modified = int(state['last_modified'].timestamp())
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified
+    )
+    if response is None:
+        response = StreamingHttpResponse(
+            calendar.render_feed(platform, start),
+            content_type='text/calendar; charset=utf-8'
+        )
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    max_age = getattr(settings, 'CONTEST_CALENDAR_MAX_AGE', 300)
+    response['Cache-Control'] = f'private, max-age={max_age}'
+    return response
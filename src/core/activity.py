@@ -0,0 +1,277 @@
+"""
+Write-behind tracking of when members were last seen and which endpoints
+they use.
+
+ActivityMiddleware records each authenticated request in a per-process
+buffer: a member's latest request time, and a count per member and
+endpoint. Repeated requests only bump in-memory counters. The buffer is
+written out when ACTIVITY_FLUSH_SECONDS have passed since the last flush,
+or once it holds ACTIVITY_MAX_PENDING entries. Each flush is one bulk
+UPDATE of `User.last_seen_at` and one upsert of EndpointUsage rows (per
+ACTIVITY_FLUSH_BATCH_SIZE entries), in SQL that PostgreSQL and SQLite
+3.33+ both run.
+
+Flushes run from the `request_finished` signal, after the response has
+been sent, so no client waits for them. Server processes started from
+app.wsgi or app.asgi flush once more when they exit. A process that dies
+without exiting cleanly loses what it buffered since its last flush: up
+to ACTIVITY_FLUSH_SECONDS of activity. Set it to 0 to write every
+request through.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject, empty
+
+from core.models import EndpointUsage
+
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """
+    Buffer of member activity awaiting a flush.
+
+    `stats` accumulates the flushes of this process: how many ran and
+    failed, the rows they wrote and the time they took.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._seen = {}
+        self._counts = Counter()
+        self._last_used = {}
+        self._flushed_at = time.monotonic()
+        self.stats = {
+            'flushes': 0,
+            'errors': 0,
+            'users': 0,
+            'endpoints': 0,
+            'seconds': 0.0,
+            'last_seconds': 0.0,
+        }
+
+    @property
+    def pending(self):
+        return len(self._seen) + len(self._counts)
+
+    def touch(self, user_id, endpoint, now=None):
+        """
+        Record a request by a member.
+        """
+        now = now or timezone.now()
+        key = (user_id, endpoint)
+        with self._lock:
+            self._counts[key] += 1
+            self.merge(self._seen, user_id, now)
+            self.merge(self._last_used, key, now)
+
+    @staticmethod
+    def merge(latest, key, when):
+        if latest.get(key, when) <= when:
+            latest[key] = when
+
+    def due(self):
+        """
+        Check whether the buffer should be written out.
+        """
+        if not self.pending:
+            return False
+        interval = getattr(settings, 'ACTIVITY_FLUSH_SECONDS', 30)
+        limit = getattr(settings, 'ACTIVITY_MAX_PENDING', 10000)
+        return (
+            time.monotonic() - self._flushed_at >= interval
+            or self.pending >= limit
+        )
+
+    def flush(self):
+        """
+        Write the buffer out. Returns the number of rows written.
+
+        Only one thread flushes at a time; others return at once. If the
+        database fails, the entries go back into the buffer for the next
+        flush.
+        """
+        if not self._flush_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                seen, self._seen = self._seen, {}
+                counts, self._counts = self._counts, Counter()
+                last_used, self._last_used = self._last_used, {}
+                self._flushed_at = time.monotonic()
+            if not seen and not counts:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    # Members deleted since their request are dropped.
+                    existing = set(get_user_model().objects.filter(
+                        id__in=list(seen)
+                    ).values_list('id', flat=True))
+                    write_last_seen(seen)
+                    write_usage(
+                        {
+                            key: count for key, count in counts.items()
+                            if key[0] in existing
+                        },
+                        last_used
+                    )
+            except DatabaseError:
+                logger.exception('Flushing member activity failed.')
+                self.stats['errors'] += 1
+                self.restore(seen, counts, last_used)
+                return 0
+            elapsed = time.perf_counter() - started
+        finally:
+            self._flush_lock.release()
+
+        self.stats['flushes'] += 1
+        self.stats['users'] += len(seen)
+        self.stats['endpoints'] += len(counts)
+        self.stats['seconds'] += elapsed
+        self.stats['last_seconds'] = elapsed
+
+        slow = getattr(settings, 'ACTIVITY_SLOW_FLUSH_SECONDS', 0.5)
+        logger.log(
+            logging.WARNING if elapsed >= slow else logging.DEBUG,
+            'Flushed activity of %d members on %d endpoints in %.1f ms.',
+            len(seen),
+            len(counts),
+            elapsed * 1000
+        )
+        return len(seen) + len(counts)
+
+    def restore(self, seen, counts, last_used):
+        """
+        Merge entries of a failed flush back into the buffer.
+        """
+        with self._lock:
+            self._counts.update(counts)
+            for user_id, when in seen.items():
+                self.merge(self._seen, user_id, when)
+            for key, when in last_used.items():
+                self.merge(self._last_used, key, when)
+
+    def clear(self):
+        with self._lock:
+            self._seen = {}
+            self._counts = Counter()
+            self._last_used = {}
+
+
+def batches(items):
+    items = list(items)
+    size = getattr(settings, 'ACTIVITY_FLUSH_BATCH_SIZE', 500)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def write_last_seen(seen):
+    """
+    Move members' last_seen_at forward, never back, in one UPDATE per
+    batch, joined to the batch's VALUES list.
+    """
+    table = connection.ops.quote_name(get_user_model()._meta.db_table)
+    latest = 'GREATEST' if connection.vendor == 'postgresql' else 'MAX'
+    adapt = connection.ops.adapt_datetimefield_value
+    for batch in batches(seen.items()):
+        params = []
+        for user_id, when in batch:
+            params += [user_id, adapt(when)]
+        rows = ', '.join(['(%s, %s)'] * len(batch))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {table} SET last_seen_at = '
+                f'{latest}(COALESCE(last_seen_at, v.column2), v.column2) '
+                f'FROM (VALUES {rows}) AS v WHERE {table}.id = v.column1',
+                params
+            )
+
+
+def write_usage(counts, last_used):
+    """
+    Add the counts to the members' EndpointUsage rows in one upsert per
+    batch.
+    """
+    table = connection.ops.quote_name(EndpointUsage._meta.db_table)
+    adapt = connection.ops.adapt_datetimefield_value
+    for batch in batches(counts.items()):
+        params = []
+        for (user_id, endpoint), count in batch:
+            params += [
+                user_id,
+                endpoint,
+                count,
+                adapt(last_used[user_id, endpoint]),
+            ]
+        rows = ', '.join(['(%s, %s, %s, %s)'] * len(batch))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} '
+                f'(user_id, endpoint, count, last_used_at) VALUES {rows} '
+                f'ON CONFLICT (user_id, endpoint) DO UPDATE SET '
+                f'count = {table}.count + EXCLUDED.count, '
+                f'last_used_at = CASE '
+                f'WHEN EXCLUDED.last_used_at > {table}.last_used_at '
+                f'THEN EXCLUDED.last_used_at '
+                f'ELSE {table}.last_used_at END',
+                params
+            )
+
+
+tracker = ActivityTracker()
+
+
+def flush_if_due(**kwargs):
+    if tracker.due():
+        tracker.flush()
+
+
+request_finished.connect(flush_if_due, dispatch_uid='core.activity.flush')
+
+
+class ActivityMiddleware:
+    """
+    Record the authenticated member and endpoint of each request.
+
+    Place it last, so the user set by DRF's token authentication is seen.
+    A session user that nothing resolved is skipped rather than loaded
+    just for tracking.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if getattr(settings, 'ACTIVITY_TRACKING', True):
+            user = request.__dict__.get('user')
+            match = request.resolver_match
+            if (
+                match is not None
+                and user is not None
+                and not (
+                    isinstance(user, SimpleLazyObject)
+                    and user._wrapped is empty
+                )
+                and user.is_authenticated
+            ):
+                tracker.touch(
+                    user.pk,
+                    f'{request.method} {match.view_name}'[:100]
+                )
+
+        return response
@@ -1,20 +1,165 @@
 """
 Django admin customization.
+
+Contest and user tables grow to millions of rows, so their pages avoid
+anything that reads whole tables: results are counted by estimate, lists
+are filtered and ordered by indexed columns only, searches go through
+indexes, foreign keys are picked by autocomplete rather than listed in a
+select, and exports stream in keyset chunks.
 """
 
+import csv
+import io
+import json
+
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
+from contest.search import search_contests
 from core import models
+from user import verification
+
+
+def estimate_count(queryset):
+    """
+    Return the planner's estimate of the rows of a queryset, or None on
+    databases other than PostgreSQL.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator taking the planner's estimate of large result counts.
+
+    Results estimated above ADMIN_EXACT_COUNT_LIMIT rows are not counted,
+    since COUNT(*) reads every one of them. The estimate can be off, so the
+    last pages of such a result may be short or empty, or miss rows that
+    narrower filters still find.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        limit = getattr(settings, 'ADMIN_EXACT_COUNT_LIMIT', 10000)
+        if estimate is not None and estimate > limit:
+            return estimate
+        return super().count
+
+    def page(self, number):
+        """
+        Return a page, looking up its primary keys before its rows.
+
+        A deep page skips past many rows; skipping them in an index-only
+        scan of the ordering index is much cheaper than fetching each from
+        the table.
+        """
+        page = super().page(number)
+        if isinstance(page.object_list, QuerySet):
+            keys = list(page.object_list.values_list('pk', flat=True))
+            page.object_list = self.object_list.filter(pk__in=keys)
+        return page
+
+
+def stream_csv(queryset, fields):
+    """
+    Yield the queryset's fields as CSV, ADMIN_EXPORT_CHUNK_SIZE rows at a
+    time.
+
+    Each chunk is one query for the rows after the last primary key sent,
+    so no cursor or transaction stays open while the client downloads.
+    """
+    size = getattr(settings, 'ADMIN_EXPORT_CHUNK_SIZE', 2000)
+    rows = queryset.order_by('pk').values_list('pk', *fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+
+    last = None
+    while True:
+        chunk = rows if last is None else rows.filter(pk__gt=last)
+        chunk = list(chunk[:size])
+        writer.writerows(row[1:] for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        if len(chunk) < size:
+            return
+        last = chunk[-1][0]
+
+
+def export_csv_action(fields):
+    """
+    Return an admin action downloading the selected rows' fields as CSV.
+    """
+    @admin.action(description=_('Export selected %(verbose_name_plural)s'))
+    def export_csv(modeladmin, request, queryset):
+        response = StreamingHttpResponse(
+            stream_csv(queryset, fields),
+            content_type='text/csv'
+        )
+        name = modeladmin.model._meta.model_name
+        response['Content-Disposition'] = f'attachment; filename="{name}.csv"'
+        return response
+
+    return export_csv
+
+
+class LargeTableMixin:
+    """
+    Changelist options for tables too large to count.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(LargeTableMixin, BaseUserAdmin):
     """
     Define the admin pages for users.
+
+    Searches match the start of emails, names and handles, through the
+    prefix indexes of the user table.
     """
     ordering = ['id']
-    list_display = ['email', 'name']
+    list_display = [
+        'email',
+        'name',
+        'is_staff',
+        'participation_count',
+        'last_seen_at',
+    ]
+    list_filter = ['is_staff', 'is_active']
+    search_fields = [f'^{field}' for field in models.USER_SEARCH_INDEXES]
+    actions = [export_csv_action([
+        'id',
+        'email',
+        'name',
+        'is_active',
+        'is_staff',
+        'codeforces_handle',
+        'omegaup_handle',
+        'kattis_handle',
+        'participation_count',
+        'last_login',
+        'last_seen_at',
+    ])]
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
         (
@@ -27,19 +172,31 @@ class UserAdmin(BaseUserAdmin):
                 )
             }
         ),
-        (_('Important dates'), {'fields': ('last_login',)}),
+        (
+            _('Important dates'),
+            {'fields': ('last_login', 'last_seen_at')}
+        ),
         (
             _('Handles'),
             {
                 'fields': (
                     'codeforces_handle',
+                    'codeforces_handle_status',
                     'omegaup_handle',
+                    'omegaup_handle_status',
                     'kattis_handle',
+                    'kattis_handle_status',
                 )
             }
         )
     )
-    readonly_fields = ['last_login']
+    readonly_fields = [
+        'last_login',
+        'last_seen_at',
+        'codeforces_handle_status',
+        'omegaup_handle_status',
+        'kattis_handle_status',
+    ]
     add_fieldsets = (
         (None, {
             'classes': ('wide',),
@@ -58,6 +215,116 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        """
+        Save the user, queueing checks of the handles that changed.
+        """
+        statuses = verification.handle_statuses({
+            field: getattr(obj, field)
+            for field in verification.HANDLE_FIELDS.values()
+            if field in form.changed_data
+        })
+        for field, status in statuses.items():
+            setattr(obj, field, status)
+        super().save_model(request, obj, form, change)
+        verification.queue_pending(statuses)
+
+
+class ContestAdmin(LargeTableMixin, admin.ModelAdmin):
+    """
+    Define the admin pages for contests.
+
+    Searches use the contests' full-text index.
+    """
+    ordering = ['-start_time', '-id']
+    list_display = [
+        'name',
+        'platform',
+        'start_time',
+        'end_time',
+        'participant_count',
+    ]
+    list_filter = ['platform', 'start_time']
+    search_fields = ['name']
+    readonly_fields = ['last_updated', 'participant_count']
+    actions = [export_csv_action([
+        'id',
+        'name',
+        'platform',
+        'platform_id',
+        'url',
+        'start_time',
+        'end_time',
+        'participant_count',
+    ])]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('search_vector')
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        results = search_contests(queryset, search_term)
+        # Ordering by relevance would rank every match before paginating.
+        if queryset.query.order_by:
+            results = results.order_by(*queryset.query.order_by)
+        return results, False
+
+
+class ParticipationAdmin(LargeTableMixin, admin.ModelAdmin):
+    """
+    Define the admin pages for contest registrations.
+    """
+    ordering = ['-id']
+    list_display = ['user', 'contest', 'created_at']
+    list_select_related = ['user', 'contest']
+    autocomplete_fields = ['user', 'contest']
+
+
+class MemberAdmin(LargeTableMixin, admin.ModelAdmin):
+    """
+    Define the admin pages for rows belonging to a member.
+    """
+    list_display = ['__str__', 'user']
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
+
+
+class ContestRunAdmin(LargeTableMixin, admin.ModelAdmin):
+    """
+    Define the admin pages for runs of club contests.
+    """
+    ordering = ['-id']
+    list_display = ['contest', 'team', 'problem', 'verdict', 'time']
+    list_select_related = ['contest']
+    autocomplete_fields = ['contest']
+
+
+class ScoreboardAdmin(admin.ModelAdmin):
+    """
+    Define the admin pages for club contest scoreboards.
+    """
+    list_select_related = ['contest']
+    autocomplete_fields = ['contest']
+
+
+class SubmissionAdmin(MemberAdmin):
+    """
+    Define the admin pages for submissions.
+    """
+    raw_id_fields = ['problem']
+
 
 admin.site.register(models.User, UserAdmin)
-admin.site.register(models.Contest)
+admin.site.register(models.Contest, ContestAdmin)
+admin.site.register(models.Participation, ParticipationAdmin)
+admin.site.register(models.Problem)
+admin.site.register(models.Tag)
+admin.site.register(models.Submission, SubmissionAdmin)
+admin.site.register(models.SubmissionCursor, MemberAdmin)
+admin.site.register(models.MemberRating, MemberAdmin)
+admin.site.register(models.ScheduledJob)
+admin.site.register(models.Task)
+admin.site.register(models.EndpointUsage, MemberAdmin)
+admin.site.register(models.Scoreboard, ScoreboardAdmin)
+admin.site.register(models.ContestRun, ContestRunAdmin)
@@ -0,0 +1,36 @@
+"""
+Authentication for the API.
+"""
+
+from rest_framework import authentication
+
+from core import db_routers
+
+
+class TokenAuthentication(authentication.TokenAuthentication):
+    """
+    Token authentication that keeps members who just wrote on the primary.
+
+    ReplicaRoutingMiddleware decides on replica reads before the view runs
+    and only knows the token then, which keeps the token lookup itself on
+    the primary while the token is pinned. A member pinned through another
+    token or a session is only known once the token is looked up.
+
+    Sub-requests of a batch carry the batch's credentials in
+    `batch_credentials` and act as its user without a second lookup.
+    """
+
+    def authenticate(self, request):
+        credentials = getattr(request, 'batch_credentials', None)
+        if credentials is not None:
+            return credentials
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        user, token = super().authenticate_credentials(key)
+        if (
+            db_routers.replica_reads_enabled()
+            and db_routers.primary_pinned(db_routers.user_identity(user.pk))
+        ):
+            db_routers.enable_replica_reads(False)
+        return user, token
@@ -0,0 +1,125 @@
+"""
+Database routers.
+"""
+
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replicas():
+    """
+    Return the aliases of the configured read replicas.
+    """
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def replica_reads_enabled():
+    """
+    Return whether reads in the current context may use a replica.
+    """
+    return _replica_reads.get()
+
+
+def enable_replica_reads(enabled=True):
+    """
+    Allow or forbid replica reads in the current context.
+
+    Returns a token to pass to `reset_replica_reads`.
+    """
+    return _replica_reads.set(enabled)
+
+
+def reset_replica_reads(token):
+    """
+    Restore the replica read setting from before `enable_replica_reads`.
+    """
+    _replica_reads.reset(token)
+
+
+@contextmanager
+def use_replicas(enabled=True):
+    """
+    Route reads inside the block to a replica.
+    """
+    token = enable_replica_reads(enabled)
+    try:
+        yield
+    finally:
+        reset_replica_reads(token)
+
+
+def user_identity(user_id):
+    return f'user:{user_id}'
+
+
+def token_identity(key):
+    return f'token:{key}'
+
+
+def pin_key(identity):
+    digest = hashlib.sha256(identity.encode()).hexdigest()
+    return f'replica-pin:{digest}'
+
+
+def pin_primary(*identities):
+    """
+    Keep the clients with these identities reading from the primary for
+    REPLICA_STICKY_SECONDS, so they see their own writes.
+
+    Pins live in the default cache, which has to be shared between
+    processes for a pin to follow the client across workers.
+    """
+    if not replicas():
+        return
+    cache.set_many(
+        {pin_key(identity): True for identity in identities},
+        timeout=getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+    )
+
+
+def primary_pinned(*identities):
+    """
+    Check whether any of the identities is pinned to the primary.
+    """
+    return bool(cache.get_many([pin_key(i) for i in identities]))
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads to a random replica when the current request allows it.
+
+    Reads stay on the primary unless replica reads were enabled for the
+    context, which ReplicaRoutingMiddleware only does for safe requests to
+    views that opt in. Writes always go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if aliases and replica_reads_enabled():
+            return random.choice(aliases)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """
+        Replicas hold the same data, so relations across them are fine.
+        """
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """
+        Only migrate the primary; replicas follow through replication.
+        """
+        if db in replicas():
+            return False
+        return None
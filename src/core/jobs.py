@@ -0,0 +1,20 @@
+"""
+Periodic maintenance of the contest and task tables, see core.scheduler.
+"""
+
+from datetime import timedelta
+
+from django.core.management import call_command
+
+from core import tasks
+from core.scheduler import scheduler
+
+
+@scheduler.job('prune-contest-tombstones', interval=timedelta(days=1))
+def prune_contest_tombstones():
+    call_command('prune_contest_tombstones')
+
+
+@scheduler.job('purge-tasks', interval=timedelta(days=1))
+def purge_tasks():
+    tasks.purge()
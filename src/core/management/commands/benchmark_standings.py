@@ -0,0 +1,181 @@
+"""
+Django command to benchmark the standings engine on a recorded contest
+"""
+
+import json
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from standings.engine import Board, Run, Standings
+
+
+REJECTED = ['WA', 'WA', 'WA', 'TLE', 'RE', 'CE']
+
+
+class Command(BaseCommand):
+    """
+    Django command to replay runs from a JSON lines file through the engine
+
+    Each line holds a run's team, problem, verdict and time in seconds. With
+    --record, a synthetic contest with a burst of runs in its last minutes
+    is written to the file first.
+    """
+    help = (
+        'Replay a recorded contest through the standings engine and time '
+        'it against re-sorting the board after every run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('file')
+        parser.add_argument(
+            '--record',
+            action='store_true',
+            help='Write a synthetic contest to the file before replaying.'
+        )
+        parser.add_argument('--teams', type=int, default=500)
+        parser.add_argument('--problems', type=int, default=12)
+        parser.add_argument('--runs', type=int, default=50000)
+        parser.add_argument('--duration', type=int, default=5 * 3600)
+        parser.add_argument(
+            '--burst',
+            type=float,
+            default=0.4,
+            help='Share of the recorded runs made in the last 10 minutes.'
+        )
+        parser.add_argument(
+            '--freeze',
+            type=int,
+            default=3600,
+            help='Seconds before the end the scoreboard freezes (0: never).'
+        )
+        parser.add_argument(
+            '--baseline',
+            type=int,
+            default=5000,
+            help='Runs to replay while re-sorting every time (0 to skip).'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['record']:
+            self.record(options)
+
+        try:
+            with open(options['file']) as handle:
+                runs = [
+                    Run(
+                        i,
+                        event['team'],
+                        event['problem'],
+                        event['verdict'],
+                        event['time'],
+                    )
+                    for i, event in enumerate(map(json.loads, handle), 1)
+                ]
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'Cannot read {options["file"]}: {error}')
+        if not runs:
+            raise CommandError('No runs to replay.')
+
+        end = max(run.time for run in runs)
+        freeze = options['freeze']
+        standings = Standings(freeze_after=end - freeze if freeze else None)
+
+        latencies = []
+        began = time.perf_counter()
+        for run in runs:
+            start = time.perf_counter()
+            standings.apply(run)
+            latencies.append(time.perf_counter() - start)
+        elapsed = time.perf_counter() - began
+
+        burst = sorted(
+            latency
+            for run, latency in zip(runs, latencies)
+            if run.time >= end - 600
+        )
+        latencies.sort()
+        self.stdout.write(
+            f'{len(runs)} runs, {len(standings.judges)} teams, '
+            f'{len(burst)} in the last 10 minutes'
+        )
+        self.stdout.write(
+            f'{"incremental":<24}{len(runs) / elapsed:>10.0f} runs/s  '
+            f'p50 {self.micros(latencies, 0.5)}  '
+            f'p99 {self.micros(latencies, 0.99)}  '
+            f'burst p99 {self.micros(burst, 0.99)}  '
+            f'max {latencies[-1] * 1e6:.0f}us'
+        )
+
+        board = standings.judges
+        expected = sorted(row.key for row in board.teams.values())
+        if list(board.tree) != expected:
+            raise CommandError('The incremental ranking is out of order.')
+
+        began = time.perf_counter()
+        board.rows(0, 100)
+        board.deltas_since(board.log_floor)
+        self.stdout.write(
+            f'{"first page + deltas":<24}'
+            f'{(time.perf_counter() - began) * 1e3:>10.2f} ms'
+        )
+
+        if options['baseline']:
+            self.baseline(runs[:options['baseline']])
+
+    def baseline(self, runs):
+        """
+        Time scoring runs and then sorting every team, as a board without
+        a rank tree would.
+        """
+        board = Board()
+        began = time.perf_counter()
+        for run in runs:
+            board.score(run)
+            sorted(row.key for row in board.teams.values())
+        elapsed = time.perf_counter() - began
+        self.stdout.write(
+            f'{"re-sort per run":<24}{len(runs) / elapsed:>10.0f} runs/s  '
+            f'(first {len(runs)} runs)'
+        )
+
+    def record(self, options):
+        """
+        Write a synthetic contest to the file.
+        """
+        rng = random.Random(options['seed'])
+        duration = options['duration']
+        problems = string.ascii_uppercase[:options['problems']]
+        skill = [rng.random() for _ in range(options['teams'])]
+
+        events = []
+        for _ in range(options['runs']):
+            team = rng.randrange(options['teams'])
+            if rng.random() < options['burst']:
+                at = rng.randrange(max(0, duration - 600), duration)
+            else:
+                at = rng.randrange(duration)
+            events.append({
+                'team': f'team-{team:04d}',
+                'problem': rng.choice(problems),
+                'verdict': (
+                    'AC' if rng.random() < skill[team] / 2
+                    else rng.choice(REJECTED)
+                ),
+                'time': at,
+            })
+        events.sort(key=lambda event: event['time'])
+
+        with open(options['file'], 'w') as handle:
+            for event in events:
+                handle.write(json.dumps(event) + '\n')
+        self.stdout.write(f'Recorded {len(events)} runs to {options["file"]}')
+
+    def micros(self, latencies, quantile):
+        if not latencies:
+            return '-'
+        index = min(len(latencies) - 1, int(len(latencies) * quantile))
+        return f'{latencies[index] * 1e6:.0f}us'
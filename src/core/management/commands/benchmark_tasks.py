@@ -0,0 +1,127 @@
+"""
+Django command to benchmark task queue throughput
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from core import tasks
+from core.models import Task
+
+
+NAME = 'benchmark.noop'
+
+
+class Command(BaseCommand):
+    """
+    Django command to time enqueue and dequeue of no-op tasks
+
+    The single connection measurements run inside a transaction that is
+    rolled back. The concurrent dequeue has to commit its tasks so other
+    connections see them; they are deleted afterwards.
+    """
+    help = (
+        'Time enqueueing and dequeueing no-op tasks, one by one, in bulk '
+        'and from concurrent workers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=5000)
+        parser.add_argument(
+            '--batch-sizes',
+            default='1,10,100',
+            help='Comma separated dequeue batch sizes to measure.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Concurrent dequeuing connections (0 to skip).'
+        )
+
+    def handle(self, *args, **options):
+        count = options['tasks']
+        calls = [{'n': i} for i in range(count)]
+
+        with transaction.atomic():
+            self.report('enqueue (one by one)', count, lambda: [
+                tasks.enqueue(NAME, call) for call in calls
+            ])
+            Task.objects.filter(name=NAME).delete()
+
+            self.report('enqueue_many', count, lambda: tasks.enqueue_many(
+                NAME,
+                calls
+            ))
+
+            for size in options['batch_sizes'].split(','):
+                size = int(size)
+                Task.objects.filter(name=NAME).update(status=Task.QUEUED)
+                self.report(
+                    f'dequeue + complete (batch {size})',
+                    count,
+                    lambda: self.drain('benchmark', size)
+                )
+
+            transaction.set_rollback(True)
+
+        workers = options['workers']
+        if workers and connection.vendor == 'postgresql':
+            self.concurrent(calls, workers, max(
+                int(size) for size in options['batch_sizes'].split(',')
+            ))
+
+    def drain(self, worker, size):
+        """
+        Claim and complete tasks until none are left, returning how many.
+        """
+        done = 0
+        while True:
+            claimed = tasks.dequeue(worker, size)
+            if not claimed:
+                return done
+            Task.objects.filter(id__in=[task.id for task in claimed]).update(
+                status=Task.DONE,
+                finished_at=timezone.now()
+            )
+            done += len(claimed)
+
+    def concurrent(self, calls, workers, size):
+        """
+        Time workers draining the queue at once, each on its own connection.
+        """
+        tasks.enqueue_many(NAME, calls)
+        start = threading.Barrier(workers)
+
+        def drain(i):
+            start.wait()
+            try:
+                return self.drain(f'benchmark-{i}', size)
+            finally:
+                connections.close_all()
+
+        try:
+            began = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                drained = list(pool.map(drain, range(workers)))
+            elapsed = time.perf_counter() - began
+        finally:
+            Task.objects.filter(name=NAME).delete()
+
+        self.stdout.write(
+            f'{f"dequeue + complete ({workers} workers, batch {size})":<44}'
+            f'{sum(drained) / elapsed:>10.0f} tasks/s  '
+            f'({sum(drained)} of {len(calls)} claimed, per worker: '
+            f'{", ".join(map(str, drained))})'
+        )
+
+    def report(self, label, count, action):
+        began = time.perf_counter()
+        action()
+        elapsed = time.perf_counter() - began
+        self.stdout.write(f'{label:<44}{count / elapsed:>10.0f} tasks/s')
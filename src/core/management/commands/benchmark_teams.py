@@ -0,0 +1,99 @@
+"""
+Django command to benchmark team formation speed and quality
+"""
+
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from team.formation import form_teams, optimal_teams
+
+
+class Command(BaseCommand):
+    """
+    Django command to time the team optimizer and compare it to brute force
+
+    Ratings are random, drawn like a club's Codeforces ratings; nothing is
+    read from or written to the database.
+    """
+    help = (
+        'Time team formation on growing rosters and report the optimality '
+        'gap against brute force on small ones.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--members',
+            default='100,1000,3000,6000',
+            help='Comma separated roster sizes to time.'
+        )
+        parser.add_argument(
+            '--gap-members',
+            default='6,7,8,9,10,11,12',
+            help='Comma separated roster sizes to compare with brute force '
+                 '(12 at most).'
+        )
+        parser.add_argument('--trials', type=int, default=10)
+        parser.add_argument('--team-size', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        team_size = options['team_size']
+        time_limit = getattr(settings, 'TEAM_FORMATION_TIME_LIMIT', 0.5)
+
+        self.stdout.write(
+            f'{"members":>8} {"seconds":>8} {"spread":>8} {"start":>8}  '
+            f'(spread: std. dev. of team strength)'
+        )
+        for count in self.sizes(options['members']):
+            ratings = self.ratings(rng, count)
+            started = time.perf_counter()
+            formation = form_teams(
+                ratings,
+                team_size,
+                seed=options['seed'],
+                time_limit=time_limit
+            )
+            elapsed = time.perf_counter() - started
+            greedy = form_teams(ratings, team_size, time_limit=0)
+            self.stdout.write(
+                f'{count:>8} {elapsed:>8.3f} '
+                f'{math.sqrt(formation.variance):>8.2f} '
+                f'{math.sqrt(greedy.variance):>8.2f}'
+            )
+
+        self.stdout.write(
+            f'\n{"members":>8} {"optimal":>8} {"mean gap":>9} '
+            f'{"max gap":>8}  (gap: extra spread over brute force)'
+        )
+        for count in self.sizes(options['gap_members']):
+            optimal, gaps = 0, []
+            for trial in range(options['trials']):
+                ratings = self.ratings(rng, count)
+                found = form_teams(
+                    ratings,
+                    team_size,
+                    seed=trial,
+                    time_limit=time_limit
+                )
+                best = optimal_teams(ratings, team_size)
+                gap = math.sqrt(found.variance) - math.sqrt(best.variance)
+                optimal += gap < 1e-6
+                gaps.append(max(0.0, gap))
+            self.stdout.write(
+                f'{count:>8} {optimal:>4}/{options["trials"]:<3} '
+                f'{sum(gaps) / len(gaps):>9.2f} {max(gaps):>8.2f}'
+            )
+
+    def sizes(self, value):
+        return [int(size) for size in value.split(',') if size]
+
+    def ratings(self, rng, count):
+        return {
+            member: max(0, round(rng.gauss(1500, 350)))
+            for member in range(count)
+        }
@@ -0,0 +1,35 @@
+"""
+Django command to import a platform problemset into the problem catalog
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from platforms.client import PlatformError
+from problem.importer import ProblemImporter, fetch_codeforces_problems
+from problem.parser import ParseError
+
+
+class Command(BaseCommand):
+    """
+    Django command to sync the Codeforces problemset
+    """
+    help = (
+        'Fetch the Codeforces problemset and upsert it into the problem '
+        'catalog. Unchanged problems are not written.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        importer = ProblemImporter('C', batch_size=options['batch_size'])
+
+        try:
+            stats = importer.run(fetch_codeforces_problems())
+        except (PlatformError, ParseError) as error:
+            raise CommandError(f'Problemset import failed: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            'Imported problems: {created} created, {updated} updated, '
+            '{unchanged} unchanged.'.format(**stats)
+        ))
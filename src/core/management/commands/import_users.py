@@ -0,0 +1,54 @@
+"""
+Django command to import club members from a CSV or JSON file
+"""
+
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from user.importer import import_users, read_csv
+
+
+class Command(BaseCommand):
+    """
+    Django command to create users in bulk
+    """
+    help = 'Create users from a CSV file with a header row or a JSON list.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Processes used to hash passwords (default: '
+                 'USER_IMPORT_HASH_WORKERS, or all cores).'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist.')
+
+        if path.suffix.lower() == '.json':
+            with path.open(encoding='utf-8') as file:
+                rows = json.load(file)
+        else:
+            rows = read_csv(path)
+
+        workers = (
+            options['workers']
+            or getattr(settings, 'USER_IMPORT_HASH_WORKERS', None)
+            or os.cpu_count()
+        )
+        created, errors = import_users(rows, workers=workers)
+
+        for error in errors:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(created)} users, rejected {len(errors)} rows.'
+        ))
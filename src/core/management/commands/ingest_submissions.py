@@ -0,0 +1,48 @@
+"""
+Django command to fetch members' new submissions from the platforms
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from problem.submissions import ingest_all
+
+
+class Command(BaseCommand):
+    """
+    Django command to sync submissions past each handle's high-water mark
+    """
+    help = 'Fetch and store submissions newer than the last sync.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Handles synced in parallel '
+                 '(default: SUBMISSION_INGEST_WORKERS).'
+        )
+        parser.add_argument(
+            '--email',
+            action='append',
+            help='Only sync these members (repeatable).'
+        )
+        parser.add_argument('--page-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.filter(is_active=True)
+        if options['email']:
+            users = users.filter(email__in=options['email'])
+
+        added, errors = ingest_all(
+            users,
+            workers=options['workers'],
+            page_size=options['page_size']
+        )
+
+        for handle, error in errors:
+            self.stderr.write(f'{handle}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Added {added} submissions, {len(errors)} handles failed.'
+        ))
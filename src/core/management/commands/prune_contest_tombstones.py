@@ -0,0 +1,29 @@
+"""
+Django command to delete contest tombstones past their retention
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import ContestTombstone
+
+
+class Command(BaseCommand):
+    """
+    Django command to prune the contest deletion log
+    """
+    help = 'Delete contest tombstones older than the retention period.'
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(
+            days=settings.CONTEST_TOMBSTONE_RETENTION_DAYS
+        )
+        deleted, _ = ContestTombstone.objects.filter(
+            deleted_at__lt=cutoff
+        ).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} contest tombstones.'
+        ))
@@ -0,0 +1,36 @@
+"""
+Django command to recompute members' solved-problem bitmaps
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+
+from core.models import Problem, Submission
+from problem import solved
+
+
+class Command(BaseCommand):
+    """
+    Django command to link submissions to problems and rebuild solved sets
+    """
+    help = (
+        'Link submissions to catalog problems imported after them, then '
+        'recompute every solved set from accepted submissions.'
+    )
+
+    def handle(self, *args, **options):
+        linked = Submission.objects.filter(problem__isnull=True).update(
+            problem=Subquery(
+                Problem.objects.filter(
+                    platform=OuterRef('platform'),
+                    contest_id=OuterRef('contest_id'),
+                    index=OuterRef('index')
+                ).values('id')[:1]
+            )
+        )
+        members = solved.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {linked} unlinked submissions, rebuilt solved sets for '
+            f'{members} members.'
+        ))
@@ -0,0 +1,18 @@
+"""
+Django command to refresh members' platform ratings
+"""
+
+from django.core.management.base import BaseCommand
+
+from team.ratings import refresh_ratings
+
+
+class Command(BaseCommand):
+    """
+    Django command to store each member's current platform ratings
+    """
+    help = 'Fetch and store the current rating of every member handle.'
+
+    def handle(self, *args, **options):
+        stored = refresh_ratings()
+        self.stdout.write(self.style.SUCCESS(f'Stored {stored} ratings.'))
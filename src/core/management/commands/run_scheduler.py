@@ -0,0 +1,47 @@
+"""
+Django command to run the periodic jobs in core.scheduler
+"""
+
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from core.scheduler import scheduler
+
+
+class Command(BaseCommand):
+    """
+    Django command to run due jobs, once or until interrupted
+    """
+    help = (
+        'Run the registered periodic jobs. Any number of nodes can run this '
+        'command; each due job runs on only one of them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the jobs that are due and exit.'
+        )
+
+    def handle(self, *args, **options):
+        scheduler.autodiscover()
+
+        if options['once']:
+            ran = scheduler.run_pending()
+            self.stdout.write(self.style.SUCCESS(
+                f'Ran {len(ran)} jobs: {", ".join(ran) or "none"}.'
+            ))
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: stop.set())
+
+        self.stdout.write(
+            f'Scheduling {len(scheduler.jobs)} jobs: '
+            f'{", ".join(sorted(scheduler.jobs))}.'
+        )
+        scheduler.run_forever(stop)
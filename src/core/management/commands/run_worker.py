@@ -0,0 +1,88 @@
+"""
+Django command to run background tasks from the database queue
+"""
+
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import tasks
+
+
+class Command(BaseCommand):
+    """
+    Django command to run queued tasks on a thread or process pool
+    """
+    help = (
+        'Run queued background tasks. Any number of workers can share the '
+        'queue.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=1,
+            help='Tasks run concurrently by each process.'
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Worker processes to fork, each with --threads threads.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Tasks claimed per query by single-threaded workers '
+                 '(default: TASK_BATCH_SIZE).'
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty.'
+        )
+
+    def handle(self, *args, **options):
+        tasks.autodiscover()
+        threads, processes = options['threads'], options['processes']
+        self.stdout.write(
+            f'Running {len(tasks.registry)} task types on {processes} '
+            f'processes x {threads} threads.'
+        )
+
+        if processes <= 1:
+            stop = threading.Event()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *args: stop.set())
+            worker = tasks.Worker(threads, options['batch_size'])
+            worker.run(stop, options['burst'])
+            self.stdout.write(f'Processed {worker.processed} tasks.')
+            return
+
+        # Children must open their own connections rather than share the
+        # parent's sockets.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        children = [
+            context.Process(
+                target=tasks.run_worker,
+                args=(threads, options['batch_size'], options['burst'])
+            )
+            for _ in range(processes)
+        ]
+        for child in children:
+            child.start()
+
+        def terminate(*args):
+            for child in children:
+                child.terminate()
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, terminate)
+        for child in children:
+            child.join()
@@ -0,0 +1,222 @@
+"""
+Django command to fill the database with synthetic data for scale testing
+"""
+
+import itertools
+import random
+import secrets
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+
+from core.models import User, Contest
+
+
+FIRST_NAMES = [
+    'Ana', 'Luis', 'María', 'José', 'Sofía', 'Diego', 'Valeria', 'Carlos',
+    'Fernanda', 'Miguel', 'Daniela', 'Jorge', 'Camila', 'Andrés', 'Paula',
+]
+
+LAST_NAMES = [
+    'García', 'Hernández', 'Martínez', 'López', 'González', 'Pérez',
+    'Rodríguez', 'Sánchez', 'Ramírez', 'Torres', 'Flores', 'Rivera',
+]
+
+CONTEST_URLS = {
+    'C': 'https://codeforces.com/contest/{}',
+    'O': 'https://omegaup.com/arena/{}',
+    'K': 'https://open.kattis.com/contests/{}',
+    'V': 'https://vjudge.net/contest/{}',
+}
+
+USER_COLUMNS = [
+    'password',
+    'is_superuser',
+    'email',
+    'name',
+    'is_active',
+    'is_staff',
+    'codeforces_handle',
+    'omegaup_handle',
+    'kattis_handle',
+    'codeforces_handle_status',
+    'omegaup_handle_status',
+    'kattis_handle_status',
+    'participation_count',
+]
+
+CONTEST_COLUMNS = [
+    'name',
+    'description',
+    'url',
+    'platform',
+    'platform_id',
+    'start_time',
+    'end_time',
+    'last_updated',
+    'participant_count',
+]
+
+TOKEN_COLUMNS = ['key', 'user_id', 'created']
+
+
+class Command(BaseCommand):
+    """
+    Django command to seed users, tokens and contests in large batches
+    """
+    help = 'Fill the database with synthetic users, tokens and contests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--contests', type=int, default=1000)
+        parser.add_argument(
+            '--tokens',
+            action='store_true',
+            help='Create an auth token for every seeded user.'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--password',
+            default='password1234',
+            help='Password shared by every seeded user (hashed once).'
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Use bulk_create even on PostgreSQL.'
+        )
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.use_copy = (
+            connection.vendor == 'postgresql' and not options['no_copy']
+        )
+        self.random = random.Random(options['seed'])
+        run = secrets.token_hex(3)
+
+        password = make_password(options['password'])
+
+        with transaction.atomic():
+            self.write(
+                User,
+                USER_COLUMNS,
+                self.user_rows(run, password, options['users'])
+            )
+            if options['tokens']:
+                self.write(Token, TOKEN_COLUMNS, self.token_rows(run))
+            self.write(
+                Contest,
+                CONTEST_COLUMNS,
+                self.contest_rows(run, options['contests'])
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Seeded run "{run}".'))
+
+    def write(self, model, columns, rows):
+        """
+        Insert rows with COPY on PostgreSQL and bulk_create elsewhere.
+        """
+        table = model._meta.db_table
+        count = 0
+
+        if self.use_copy:
+            quote = connection.ops.quote_name
+            statement = 'COPY {} ({}) FROM STDIN'.format(
+                quote(table),
+                ', '.join(quote(column) for column in columns)
+            )
+            with connection.cursor() as cursor:
+                with cursor.copy(statement) as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                        count += 1
+        else:
+            fields = [
+                model._meta.get_field(column).attname for column in columns
+            ]
+            while True:
+                batch = list(itertools.islice(rows, self.batch_size))
+                if not batch:
+                    break
+                model.objects.bulk_create(
+                    [model(**dict(zip(fields, row))) for row in batch],
+                    batch_size=self.batch_size
+                )
+                count += len(batch)
+                self.stdout.write(f'{table}: {count} rows...')
+
+        self.stdout.write(f'{table}: inserted {count} rows.')
+
+    def user_rows(self, run, password, count):
+        """
+        Yield user rows with unique emails and handles on every platform.
+        """
+        for i in range(count):
+            first = self.random.choice(FIRST_NAMES)
+            last = self.random.choice(LAST_NAMES)
+            handle = f'{first.lower()}_{run}_{i}'
+            yield (
+                password,
+                False,
+                f'seed.{run}.{i}@example.com',
+                f'{first} {last}',
+                True,
+                False,
+                f'cf_{handle}',
+                f'ou_{handle}',
+                f'kt_{handle}',
+                # Made up handles are left unchecked.
+                '',
+                '',
+                '',
+                0,
+            )
+
+    def token_rows(self, run):
+        """
+        Return one token row for every user seeded in this run.
+
+        The user ids are fetched before returning, since the connection is
+        busy with COPY while the rows are consumed.
+        """
+        now = timezone.now()
+        user_ids = list(User.objects.filter(
+            email__startswith=f'seed.{run}.'
+        ).values_list('id', flat=True))
+
+        return (
+            (Token.generate_key(), user_id, now) for user_id in user_ids
+        )
+
+    def contest_rows(self, run, count):
+        """
+        Yield contests spread over every platform, from years ago to
+        upcoming ones.
+        """
+        now = timezone.now()
+        platforms = list(Contest.PLATFORMS)
+
+        for i in range(count):
+            platform = platforms[i % len(platforms)]
+            platform_id = str(i)
+            start = now - timedelta(
+                minutes=self.random.randint(-60 * 24 * 60, 60 * 24 * 365 * 8)
+            )
+            duration = timedelta(minutes=self.random.choice([120, 150, 300]))
+            yield (
+                f'{Contest.PLATFORMS[platform]} Round #{i}',
+                f'Synthetic contest {i} seeded by run {run}.',
+                CONTEST_URLS[platform].format(platform_id),
+                platform,
+                platform_id,
+                start,
+                start + duration,
+                now,
+                0,
+            )
@@ -0,0 +1,257 @@
+"""
+Custom middleware.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.core.cache import cache
+from django.db import connection, DatabaseError
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse, JsonResponse
+from django.middleware import csrf
+
+from core import db_routers
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class HealthCheckMiddleware:
+    """
+    Answer load balancer probes before the rest of the middleware stack.
+
+    `/healthz` only proves that the process is serving requests. `/readyz`
+    checks the database, the cache and that every migration is applied; its
+    result is cached for `HEALTH_CHECK_CACHE_SECONDS` so frequent probes do
+    not turn into a database round trip each.
+    """
+    LIVENESS_PATH = '/healthz'
+    READINESS_PATH = '/readyz'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._lock = threading.Lock()
+        self._checked_at = None
+        self._result = None
+        self._migrations_applied = False
+
+    def __call__(self, request):
+        path = request.path_info.rstrip('/')
+
+        if path == self.LIVENESS_PATH:
+            return HttpResponse('ok', content_type='text/plain')
+
+        if path == self.READINESS_PATH:
+            return self.readiness()
+
+        return self.get_response(request)
+
+    def readiness(self):
+        """
+        Return the (possibly cached) readiness response.
+        """
+        ttl = getattr(settings, 'HEALTH_CHECK_CACHE_SECONDS', 5)
+
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is None or now - self._checked_at >= ttl:
+                self._result = self.run_checks()
+                self._checked_at = now
+            checks = self._result
+
+        ready = all(value == 'ok' for value in checks.values())
+        return JsonResponse(
+            {'status': 'ok' if ready else 'unavailable', 'checks': checks},
+            status=200 if ready else 503
+        )
+
+    def run_checks(self):
+        """
+        Run every readiness check and return a mapping of results.
+        """
+        return {
+            'database': self.check_database(),
+            'cache': self.check_cache(),
+            'migrations': self.check_migrations(),
+        }
+
+    def check_database(self):
+        """
+        Check that a database connection can run a query.
+        """
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except DatabaseError:
+            return 'unavailable'
+        return 'ok'
+
+    def check_cache(self):
+        """
+        Check that the default cache accepts writes and reads them back.
+        """
+        try:
+            cache.set('healthcheck', 'ok', timeout=30)
+            if cache.get('healthcheck') != 'ok':
+                return 'unavailable'
+        except Exception:
+            return 'unavailable'
+        return 'ok'
+
+    def check_migrations(self):
+        """
+        Check for unapplied migrations.
+
+        Loading the migration graph is expensive and the answer can only change
+        with a deploy, so a positive result is kept for the process lifetime.
+        """
+        if self._migrations_applied:
+            return 'ok'
+
+        try:
+            executor = MigrationExecutor(connection)
+            targets = executor.loader.graph.leaf_nodes()
+            pending = executor.migration_plan(targets)
+        except DatabaseError:
+            return 'unavailable'
+
+        if pending:
+            return 'pending'
+
+        self._migrations_applied = True
+        return 'ok'
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let safe requests to opted-in views read from a replica.
+
+    A view opts in with `replica_reads = True`, or with a collection of
+    viewset action names such as `('list', 'retrieve')`. After an unsafe
+    request the client is pinned to the primary for
+    `REPLICA_STICKY_SECONDS`, so it reads its own writes despite
+    replication lag. The pin covers the authenticated member and the
+    request's auth token, or its session cookie or address when it has no
+    token. Members pinned through another token or a session are moved
+    back to the primary by core.authentication once their token is known.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = db_routers.enable_replica_reads(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            db_routers.reset_replica_reads(token)
+
+        if request.method not in SAFE_METHODS:
+            identities = self.identities(request)
+            user = request.__dict__.get('user')
+            if user is not None and user.is_authenticated:
+                identities.append(db_routers.user_identity(user.pk))
+            db_routers.pin_primary(*identities)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in SAFE_METHODS
+            and db_routers.replicas()
+            and self.view_allows_replica(request, view_func)
+            and not db_routers.primary_pinned(*self.identities(request))
+        ):
+            db_routers.enable_replica_reads()
+
+    def view_allows_replica(self, request, view_func):
+        """
+        Check whether the view opted in to replica reads for this request.
+        """
+        view_class = getattr(view_func, 'cls', None)
+        allowed = getattr(view_class, 'replica_reads', False)
+        if allowed is True or not allowed:
+            return bool(allowed)
+
+        actions = getattr(view_func, 'actions', None) or {}
+        return actions.get(request.method.lower()) in allowed
+
+    def identities(self, request):
+        """
+        Identify the client, before authentication, by its auth token, or
+        by its other credentials, session cookie or address.
+        """
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        scheme, _, key = header.partition(' ')
+        if scheme == 'Token' and key.strip():
+            return [db_routers.token_identity(key.strip())]
+        return ['client:' + (
+            header
+            or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+            or request.META.get('REMOTE_ADDR', '')
+        )]
+
+
+def is_api_request(request):
+    """
+    Check whether the request is for the token-authenticated API.
+    """
+    return request.path_info.startswith(
+        tuple(getattr(settings, 'API_PATH_PREFIXES', ['/api/']))
+    )
+
+
+class SkipForApiMixin:
+    """
+    Pass API requests straight to the next middleware.
+
+    The API authenticates with tokens only, so it has no use for sessions,
+    the session user, flash messages or CSRF checks, which only protect
+    cookie-authenticated requests. DRF views are CSRF exempt already, and
+    with no session loaded a session cookie cannot authenticate an API
+    request. Requests to the admin and other pages take the full path.
+    """
+
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(
+    SkipForApiMixin,
+    sessions_middleware.SessionMiddleware
+):
+    pass
+
+
+class CsrfViewMiddleware(SkipForApiMixin, csrf.CsrfViewMiddleware):
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_api_request(request):
+            return None
+        return super().process_view(
+            request,
+            callback,
+            callback_args,
+            callback_kwargs
+        )
+
+
+class AuthenticationMiddleware(
+    SkipForApiMixin,
+    auth_middleware.AuthenticationMiddleware
+):
+    pass
+
+
+class MessageMiddleware(
+    SkipForApiMixin,
+    messages_middleware.MessageMiddleware
+):
+    pass
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-19 04:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_alter_contest_platform_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contest',
+            name='end_time',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='contest',
+            name='start_time',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
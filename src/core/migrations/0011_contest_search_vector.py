@@ -0,0 +1,123 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import migrations
+
+
+POSTGRESQL_FORWARD = [
+    """
+    CREATE FUNCTION core_contest_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+            setweight(
+                to_tsvector('simple', coalesce(NEW.description, '')), 'B'
+            );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER core_contest_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON core_contest
+    FOR EACH ROW EXECUTE FUNCTION core_contest_search_vector_update()
+    """,
+    "UPDATE core_contest SET name = name",
+    "CREATE INDEX contest_search_idx ON core_contest USING gin (search_vector)",
+]
+
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX IF EXISTS contest_search_idx",
+    "DROP TRIGGER IF EXISTS core_contest_search_vector_trigger ON core_contest",
+    "DROP FUNCTION IF EXISTS core_contest_search_vector_update()",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_contest_fts USING fts5(
+        name, description, content='core_contest', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER core_contest_fts_insert AFTER INSERT ON core_contest BEGIN
+        INSERT INTO core_contest_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER core_contest_fts_delete AFTER DELETE ON core_contest BEGIN
+        INSERT INTO core_contest_fts(core_contest_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER core_contest_fts_update AFTER UPDATE ON core_contest BEGIN
+        INSERT INTO core_contest_fts(core_contest_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO core_contest_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO core_contest_fts(core_contest_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_contest_fts_insert",
+    "DROP TRIGGER IF EXISTS core_contest_fts_delete",
+    "DROP TRIGGER IF EXISTS core_contest_fts_update",
+    "DROP TABLE IF EXISTS core_contest_fts",
+]
+
+
+def run_statements(statements):
+    """
+    Return a RunPython callable executing the statements for one vendor.
+    """
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for statement in statements.get(vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text search over contest name and description.
+
+    PostgreSQL keeps a weighted tsvector up to date with a trigger and indexes
+    it with GIN. SQLite, used for local runs, gets an FTS5 index instead.
+    """
+
+    dependencies = [
+        ('core', '0010_contest_schedule_not_auto_now'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contest',
+            name='search_vector',
+            field=SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='contest',
+                    index=GinIndex(
+                        fields=['search_vector'],
+                        name='contest_search_idx'
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(
+                    run_statements({
+                        'postgresql': POSTGRESQL_FORWARD,
+                        'sqlite': SQLITE_FORWARD,
+                    }),
+                    run_statements({
+                        'postgresql': POSTGRESQL_BACKWARD,
+                        'sqlite': SQLITE_BACKWARD,
+                    }),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.15 on 2026-10-19 04:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_contest_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContestTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contest_id', models.IntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='contest',
+            index=models.Index(fields=['last_updated'], name='contest_last_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.15 on 2026-10-19 05:06
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+
+search_migration = import_module('core.migrations.0011_contest_search_vector')
+
+
+def restore_sqlite_search(apps, schema_editor):
+    """
+    Recreate the FTS5 triggers dropped when SQLite rebuilt the table.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in search_migration.SQLITE_FORWARD[1:]:
+        schema_editor.execute(statement)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_contest_delta_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contest',
+            name='is_archived',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(
+            restore_sqlite_search,
+            migrations.RunPython.noop,
+        ),
+        migrations.AddIndex(
+            model_name='contest',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['id'], name='contest_hot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contest',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['start_time'], name='contest_hot_start_idx'),
+        ),
+    ]
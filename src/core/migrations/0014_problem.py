@@ -0,0 +1,36 @@
+# Generated by Django 5.1.15 on 2026-10-19 05:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_contest_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Problem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('C', 'Codeforces'), ('O', 'OmegaUp'), ('K', 'Kattis'), ('V', 'Vjudge')], max_length=1)),
+                ('contest_id', models.CharField(max_length=20)),
+                ('index', models.CharField(max_length=10)),
+                ('name', models.CharField(max_length=255)),
+                ('rating', models.IntegerField(blank=True, null=True)),
+                ('tags', models.ManyToManyField(blank=True, related_name='problems', to='core.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['rating'], name='problem_rating_idx')],
+                'constraints': [models.UniqueConstraint(fields=('platform', 'contest_id', 'index'), name='problem_platform_key')],
+            },
+        ),
+    ]
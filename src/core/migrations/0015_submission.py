@@ -0,0 +1,48 @@
+# Generated by Django 5.1.15 on 2026-10-19 05:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_problem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Submission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('C', 'Codeforces'), ('O', 'OmegaUp'), ('K', 'Kattis'), ('V', 'Vjudge')], max_length=1)),
+                ('external_id', models.BigIntegerField()),
+                ('contest_id', models.CharField(blank=True, max_length=20)),
+                ('index', models.CharField(blank=True, max_length=10)),
+                ('verdict', models.CharField(blank=True, max_length=32)),
+                ('language', models.CharField(blank=True, max_length=64)),
+                ('submitted_at', models.DateTimeField()),
+                ('problem', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='submissions', to='core.problem')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'submitted_at'], name='submission_user_time_idx')],
+                'constraints': [models.UniqueConstraint(fields=('platform', 'external_id'), name='submission_platform_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SubmissionCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('C', 'Codeforces'), ('O', 'OmegaUp'), ('K', 'Kattis'), ('V', 'Vjudge')], max_length=1)),
+                ('handle', models.CharField(max_length=255)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_cursors', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'platform'), name='submission_cursor_key')],
+            },
+        ),
+    ]
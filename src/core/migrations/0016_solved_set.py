@@ -0,0 +1,25 @@
+# Generated by Django 5.1.15 on 2026-10-19 05:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_submission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolvedSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bits', models.BinaryField(default=bytes)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='solved_set', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-19 05:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('C', 'Codeforces'), ('O', 'OmegaUp'), ('K', 'Kattis'), ('V', 'Vjudge')], max_length=1)),
+                ('handle', models.CharField(max_length=255)),
+                ('rating', models.IntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'platform'), name='member_rating_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_member_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Scoreboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('penalty_minutes', models.PositiveSmallIntegerField(default=20)),
+                ('freeze_after', models.PositiveIntegerField(blank=True, null=True)),
+                ('unfrozen', models.BooleanField(default=False)),
+                ('contest', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='scoreboard', to='core.contest')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ContestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team', models.CharField(max_length=100)),
+                ('problem', models.CharField(max_length=10)),
+                ('verdict', models.CharField(choices=[('AC', 'Accepted'), ('WA', 'Wrong answer'), ('TLE', 'Time limit exceeded'), ('MLE', 'Memory limit exceeded'), ('RE', 'Runtime error'), ('PE', 'Presentation error'), ('CE', 'Compilation error')], max_length=3)),
+                ('time', models.PositiveIntegerField()),
+                ('external_id', models.CharField(blank=True, max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('contest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='runs', to='core.contest')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['contest', 'id'], name='contest_run_contest_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('external_id', ''), _negated=True), fields=('contest', 'external_id'), name='contest_run_external_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:13
+
+from importlib import import_module
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+search_migration = import_module('core.migrations.0011_contest_search_vector')
+
+# Counter updates should not recompute the search vector, so the trigger
+# only fires when the searched columns change.
+POSTGRESQL_FORWARD = [
+    "DROP TRIGGER core_contest_search_vector_trigger ON core_contest",
+    """
+    CREATE TRIGGER core_contest_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description ON core_contest
+    FOR EACH ROW EXECUTE FUNCTION core_contest_search_vector_update()
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    "DROP TRIGGER core_contest_search_vector_trigger ON core_contest",
+    search_migration.POSTGRESQL_FORWARD[1],
+]
+
+
+def forward(apps, schema_editor):
+    """
+    Narrow the search trigger on PostgreSQL, and recreate the FTS5
+    triggers dropped when SQLite rebuilt the table.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = POSTGRESQL_FORWARD
+    elif vendor == 'sqlite':
+        statements = search_migration.SQLITE_FORWARD[1:]
+    else:
+        statements = []
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def backward(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRESQL_BACKWARD:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_contest_runs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contest',
+            name='participant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(forward, backward),
+        migrations.AddField(
+            model_name='user',
+            name='participation_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='Participation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('contest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participations', to='core.contest')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'contest'], name='participation_user_idx')],
+                'constraints': [models.UniqueConstraint(fields=('contest', 'user'), name='participation_key')],
+            },
+        ),
+    ]
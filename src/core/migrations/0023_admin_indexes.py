@@ -0,0 +1,74 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:52
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+PREFIX_INDEXES = [
+    models.Index(
+        django.contrib.postgres.indexes.OpClass(
+            django.db.models.functions.text.Upper(field),
+            name='text_pattern_ops'
+        ),
+        name=name
+    )
+    for field, name in (
+        ('email', 'user_email_prefix_idx'),
+        ('name', 'user_name_prefix_idx'),
+        ('codeforces_handle', 'user_codeforces_prefix_idx'),
+        ('omegaup_handle', 'user_omegaup_prefix_idx'),
+        ('kattis_handle', 'user_kattis_prefix_idx'),
+    )
+]
+
+
+def add_prefix_indexes(apps, schema_editor):
+    """
+    Index UPPER(column) for LIKE 'prefix%' on PostgreSQL, which SQLite
+    cannot do.
+
+    The indexes stay out of the model state, or SQLite would try to build
+    them whenever a later migration remakes core_user.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    user = apps.get_model('core', 'User')
+    for index in PREFIX_INDEXES:
+        schema_editor.add_index(user, index)
+
+
+def remove_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    user = apps.get_model('core', 'User')
+    for index in PREFIX_INDEXES:
+        schema_editor.remove_index(user, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0022_activity'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contest',
+            index=models.Index(fields=['start_time', 'id'], name='contest_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contest',
+            index=models.Index(fields=['platform', 'start_time', 'id'], name='contest_platform_start_idx'),
+        ),
+        migrations.RunPython(add_prefix_indexes, remove_prefix_indexes),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_staff', True)), fields=['id'], name='user_staff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['id'], name='user_inactive_idx'),
+        ),
+    ]
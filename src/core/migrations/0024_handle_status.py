@@ -0,0 +1,57 @@
+# Generated by Django 5.1.15 on 2026-10-19 07:18
+
+from django.db import migrations, models
+
+
+def queue_existing_handles(apps, schema_editor):
+    """
+    Mark handles stored before verification existed for checking, which
+    the verify-handles job picks up.
+    """
+    user = apps.get_model('core', 'User')
+    for field in ('codeforces_handle', 'omegaup_handle', 'kattis_handle'):
+        user.objects.exclude(**{f'{field}__isnull': True}).exclude(
+            **{field: ''}
+        ).update(**{f'{field}_status': 'P'})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0023_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='codeforces_handle_status',
+            field=models.CharField(blank=True, choices=[('P', 'Pending'), ('V', 'Verified'), ('N', 'Not found')], editable=False, max_length=1),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='kattis_handle_status',
+            field=models.CharField(blank=True, choices=[('P', 'Pending'), ('V', 'Verified'), ('N', 'Not found')], editable=False, max_length=1),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='omegaup_handle_status',
+            field=models.CharField(blank=True, choices=[('P', 'Pending'), ('V', 'Verified'), ('N', 'Not found')], editable=False, max_length=1),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('codeforces_handle_status', 'P')), fields=['id'], name='user_codeforces_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('omegaup_handle_status', 'P')), fields=['id'], name='user_omegaup_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('kattis_handle_status', 'P')), fields=['id'], name='user_kattis_pending_idx'),
+        ),
+        migrations.RunPython(
+            queue_existing_handles,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.15 on 2026-10-19 09:01
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_user_import'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='contest',
+            name='contest_hot_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='contest',
+            name='contest_hot_start_idx',
+        ),
+        migrations.RemoveField(
+            model_name='contest',
+            name='is_archived',
+        ),
+    ]
@@ -2,7 +2,11 @@
 Database models.
 """
 
+import secrets
+
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -40,6 +44,19 @@ class UserManager(BaseUserManager):
         return user
 
 
+# User columns the admin searches by prefix, see core.admin.UserAdmin.
+# Their UPPER(column) text_pattern_ops indexes exist on PostgreSQL only
+# and are left out of the model state, since SQLite would have to rebuild
+# them whenever core_user is remade; see migration 0023.
+USER_SEARCH_INDEXES = {
+    'email': 'user_email_prefix_idx',
+    'name': 'user_name_prefix_idx',
+    'codeforces_handle': 'user_codeforces_prefix_idx',
+    'omegaup_handle': 'user_omegaup_prefix_idx',
+    'kattis_handle': 'user_kattis_prefix_idx',
+}
+
+
 class User(AbstractBaseUser, PermissionsMixin):
     """
     Custom user model.
@@ -66,11 +83,128 @@ class User(AbstractBaseUser, PermissionsMixin):
         blank=True,
         unique=True
     )
+    # Whether each handle exists on its platform, set by user.verification.
+    # Blank until a check is requested.
+    HANDLE_PENDING = 'P'
+    HANDLE_VERIFIED = 'V'
+    HANDLE_NOT_FOUND = 'N'
+    HANDLE_STATUSES = [
+        (HANDLE_PENDING, 'Pending'),
+        (HANDLE_VERIFIED, 'Verified'),
+        (HANDLE_NOT_FOUND, 'Not found'),
+    ]
+    codeforces_handle_status = models.CharField(
+        max_length=1,
+        choices=HANDLE_STATUSES,
+        blank=True,
+        editable=False
+    )
+    omegaup_handle_status = models.CharField(
+        max_length=1,
+        choices=HANDLE_STATUSES,
+        blank=True,
+        editable=False
+    )
+    kattis_handle_status = models.CharField(
+        max_length=1,
+        choices=HANDLE_STATUSES,
+        blank=True,
+        editable=False
+    )
+    # Maintained by contest.participation, never counted on read.
+    participation_count = models.PositiveIntegerField(
+        default=0,
+        editable=False
+    )
+    # Written behind by core.activity, so it trails by up to a flush.
+    last_seen_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False
+    )
 
     objects = UserManager()
 
     USERNAME_FIELD = 'email'  # Default field for authentication
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['id'],
+                name='user_staff_idx',
+                condition=models.Q(is_staff=True)
+            ),
+            models.Index(
+                fields=['id'],
+                name='user_inactive_idx',
+                condition=models.Q(is_active=False)
+            ),
+            # Handles waiting for a check.
+            *[
+                models.Index(
+                    fields=['id'],
+                    name=f'user_{platform}_pending_idx',
+                    condition=models.Q(**{f'{platform}_handle_status': 'P'})
+                )
+                for platform in ('codeforces', 'omegaup', 'kattis')
+            ],
+        ]
+
+
+class EndpointUsage(models.Model):
+    """
+    Requests a member made to one endpoint, see core.activity.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='endpoint_usage'
+    )
+    # HTTP method and URL name, such as 'GET contest:contest-list'.
+    endpoint = models.CharField(max_length=100)
+    count = models.PositiveBigIntegerField(default=0)
+    last_used_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'endpoint'],
+                name='endpoint_usage_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} {self.endpoint}: {self.count}'
+
+
+class CalendarToken(models.Model):
+    """
+    Secret in the URL of a member's contest calendar feed.
+
+    Kept apart from the API token, since calendar apps store feed URLs in
+    plain sight and poll them unattended; rotating it only breaks the
+    feed subscriptions.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='calendar_token'
+    )
+    key = models.CharField(max_length=40, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @staticmethod
+    def generate_key():
+        return secrets.token_urlsafe(30)
+
+    def save(self, *args, **kwargs):
+        if not self.key:
+            self.key = self.generate_key()
+        return super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f'Calendar token of {self.user}'
+
 
 class Contest(models.Model):
     """
@@ -96,13 +230,11 @@ class Contest(models.Model):
     platform_id = models.CharField(max_length=10)
 
     start_time = models.DateTimeField(
-        auto_now=True,
         null=True,
         blank=True
     )
 
     end_time = models.DateTimeField(
-        auto_now=True,
         null=True,
         blank=True
     )
@@ -112,5 +244,406 @@ class Contest(models.Model):
         blank=True
     )
 
+    # Maintained by a database trigger on PostgreSQL, see migration 0011.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Maintained by contest.participation, never counted on read.
+    participant_count = models.PositiveIntegerField(
+        default=0,
+        editable=False
+    )
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='contest_search_idx'),
+            models.Index(
+                fields=['last_updated'],
+                name='contest_last_updated_idx'
+            ),
+            # The admin lists every contest by start time, by platform.
+            models.Index(
+                fields=['start_time', 'id'],
+                name='contest_start_idx'
+            ),
+            models.Index(
+                fields=['platform', 'start_time', 'id'],
+                name='contest_platform_start_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class ContestTombstone(models.Model):
+    """
+    Record of a deleted contest, so delta sync clients can drop it.
+    """
+    contest_id = models.IntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f'Contest {self.contest_id} deleted at {self.deleted_at}'
+
+
+class Participation(models.Model):
+    """
+    Member registered for a contest.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='participations'
+    )
+    contest = models.ForeignKey(
+        Contest,
+        on_delete=models.CASCADE,
+        related_name='participations'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['contest', 'user'],
+                name='participation_key'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'contest'],
+                name='participation_user_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} in {self.contest}'
+
+
+class Tag(models.Model):
+    """
+    Problem topic, such as 'dp' or 'graphs'.
+    """
+    name = models.CharField(max_length=64, unique=True)
+
     def __str__(self):
         return self.name
+
+
+class Problem(models.Model):
+    """
+    Problem from a platform's problemset.
+    """
+    platform = models.CharField(
+        max_length=1,
+        choices=Contest.PLATFORMS
+    )
+    contest_id = models.CharField(max_length=20)
+    index = models.CharField(max_length=10)
+    name = models.CharField(max_length=255)
+    rating = models.IntegerField(null=True, blank=True)
+    tags = models.ManyToManyField(Tag, related_name='problems', blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['platform', 'contest_id', 'index'],
+                name='problem_platform_key'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['rating'], name='problem_rating_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.contest_id}{self.index} - {self.name}'
+
+
+class Submission(models.Model):
+    """
+    Member's submission on a platform.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='submissions'
+    )
+    platform = models.CharField(
+        max_length=1,
+        choices=Contest.PLATFORMS
+    )
+    external_id = models.BigIntegerField()
+    problem = models.ForeignKey(
+        Problem,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='submissions'
+    )
+    contest_id = models.CharField(max_length=20, blank=True)
+    index = models.CharField(max_length=10, blank=True)
+    verdict = models.CharField(max_length=32, blank=True)
+    language = models.CharField(max_length=64, blank=True)
+    submitted_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['platform', 'external_id'],
+                name='submission_platform_key'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'submitted_at'],
+                name='submission_user_time_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.platform}{self.external_id} ({self.verdict})'
+
+
+class SubmissionCursor(models.Model):
+    """
+    High-water mark of the submissions ingested for a member's handle.
+
+    Submissions with ids up to `last_id` have been stored or are known to be
+    final, so the next sync only asks for newer ones.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='submission_cursors'
+    )
+    platform = models.CharField(
+        max_length=1,
+        choices=Contest.PLATFORMS
+    )
+    handle = models.CharField(max_length=255)
+    last_id = models.BigIntegerField(default=0)
+    synced_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'platform'],
+                name='submission_cursor_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.handle} ({self.platform}) up to {self.last_id}'
+
+
+class SolvedSet(models.Model):
+    """
+    Problems a member has solved, as a bitmap indexed by problem id.
+
+    Bit `i` of the little-endian `bits` is set when problem `i` has an
+    accepted submission. See problem.solved.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='solved_set'
+    )
+    bits = models.BinaryField(default=bytes)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f'{self.user} solved {self.count}'
+
+
+class MemberRating(models.Model):
+    """
+    A member's current rating on a platform, refreshed periodically.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='ratings'
+    )
+    platform = models.CharField(
+        max_length=1,
+        choices=Contest.PLATFORMS
+    )
+    handle = models.CharField(max_length=255)
+    rating = models.IntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'platform'],
+                name='member_rating_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.handle} ({self.platform}): {self.rating}'
+
+
+class ScheduledJob(models.Model):
+    """
+    Shared state of a periodic job, see core.scheduler.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    next_run_at = models.DateTimeField()
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_duration = models.FloatField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Task(models.Model):
+    """
+    Background task waiting in or taken from the queue, see core.tasks.
+    """
+    QUEUED = 'Q'
+    RUNNING = 'R'
+    DONE = 'D'
+    DEAD = 'X'
+    STATUSES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (DEAD, 'Dead'),
+    ]
+
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=1,
+        choices=STATUSES,
+        default=QUEUED
+    )
+    priority = models.SmallIntegerField(default=0)
+    run_at = models.DateTimeField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Only queued rows are scanned by workers, so the index stays
+            # small however many finished tasks are kept.
+            models.Index(
+                models.F('priority').desc(),
+                'run_at',
+                name='task_queued_idx',
+                condition=models.Q(status='Q')
+            ),
+            models.Index(
+                fields=['locked_at'],
+                name='task_running_idx',
+                condition=models.Q(status='R')
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.get_status_display()})'
+
+
+class UserImport(models.Model):
+    """
+    Bulk import of members run by a worker, see user.importer.
+
+    `rows` holds the uploaded rows, passwords included, until the import
+    runs, and is emptied once it has.
+    """
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    rows = models.JSONField(default=list, blank=True)
+    created = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'Import #{self.pk}'
+
+
+class Scoreboard(models.Model):
+    """
+    Standings settings of a club contest, see standings.engine.
+    """
+    contest = models.OneToOneField(
+        Contest,
+        on_delete=models.CASCADE,
+        related_name='scoreboard'
+    )
+    penalty_minutes = models.PositiveSmallIntegerField(default=20)
+    # Seconds from the contest start after which public standings only
+    # show attempts as pending. Null for a scoreboard that never freezes.
+    freeze_after = models.PositiveIntegerField(null=True, blank=True)
+    unfrozen = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f'Scoreboard of {self.contest}'
+
+
+class ContestRun(models.Model):
+    """
+    Judged submission of a team in a club contest.
+    """
+    ACCEPTED = 'AC'
+    COMPILATION_ERROR = 'CE'
+    VERDICTS = [
+        (ACCEPTED, 'Accepted'),
+        ('WA', 'Wrong answer'),
+        ('TLE', 'Time limit exceeded'),
+        ('MLE', 'Memory limit exceeded'),
+        ('RE', 'Runtime error'),
+        ('PE', 'Presentation error'),
+        (COMPILATION_ERROR, 'Compilation error'),
+    ]
+
+    contest = models.ForeignKey(
+        Contest,
+        on_delete=models.CASCADE,
+        related_name='runs'
+    )
+    team = models.CharField(max_length=100)
+    problem = models.CharField(max_length=10)
+    verdict = models.CharField(max_length=3, choices=VERDICTS)
+    # Seconds from the contest start.
+    time = models.PositiveIntegerField()
+    # Id on the judge the run was mirrored from, so replays are idempotent.
+    external_id = models.CharField(max_length=50, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['contest', 'external_id'],
+                name='contest_run_external_key',
+                condition=~models.Q(external_id='')
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['contest', 'id'],
+                name='contest_run_contest_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.team} {self.problem} {self.verdict} at {self.time}s'
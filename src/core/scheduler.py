@@ -0,0 +1,247 @@
+"""
+Periodic jobs shared by every app replica.
+
+Jobs are registered by interval in a `jobs.py` module of any installed app:
+
+    from core.scheduler import scheduler
+
+    @scheduler.job('sync-problems', interval=timedelta(days=1))
+    def sync_problems():
+        ...
+
+Every replica may run the scheduler, but each due job runs on one node only.
+A node first takes a lock named after the job (a PostgreSQL advisory lock,
+or an flock on a file for other databases, which only covers one host) and
+then checks the job's ScheduledJob row. `next_run_at` is moved past the
+current time before the job starts, so runs missed while every node was
+down, or while a run overran its interval, collapse into a single run.
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from core.models import ScheduledJob
+
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """
+    A function to run every `interval`.
+    """
+
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+
+    def __repr__(self):
+        return f'<Job {self.name} every {self.interval}>'
+
+
+def lock_key(name):
+    """
+    Return the signed 64-bit advisory lock key for a job name.
+    """
+    digest = hashlib.sha256(f'scheduler:{name}'.encode()).digest()
+    return int.from_bytes(digest[:8], 'big', signed=True)
+
+
+@contextmanager
+def advisory_lock(name):
+    """
+    Try to take a session-level PostgreSQL advisory lock for name.
+
+    Yields whether the lock was taken. The lock is also released if the
+    connection dies, so a crashed node never blocks the others.
+    """
+    key = lock_key(name)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [key])
+        acquired = cursor.fetchone()[0]
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [key])
+
+
+@contextmanager
+def file_lock(name):
+    """
+    Try to take an exclusive flock on a file named after the job.
+
+    Yields whether the lock was taken.
+    """
+    directory = getattr(settings, 'SCHEDULER_LOCK_DIR', None)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{name}.lock')
+
+    with open(path, 'a') as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def job_lock(name):
+    """
+    Return the lock for a job suited to the database in use.
+    """
+    if connection.vendor == 'postgresql':
+        return advisory_lock(name)
+    return file_lock(name)
+
+
+class Scheduler:
+    """
+    Registry and runner of periodic jobs.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self._thread = None
+        self._stop = threading.Event()
+
+    def job(self, name, interval):
+        """
+        Register the decorated function to run every interval.
+
+        `interval` is a timedelta or a number of seconds.
+        """
+        if not isinstance(interval, timedelta):
+            interval = timedelta(seconds=interval)
+
+        def register(func):
+            self.jobs[name] = Job(name, func, interval)
+            return func
+        return register
+
+    def autodiscover(self):
+        """
+        Import the `jobs` module of every installed app.
+        """
+        autodiscover_modules('jobs')
+
+    def run_pending(self, now=None):
+        """
+        Run every due job this node wins the lock for.
+
+        Returns the names of the jobs that ran.
+        """
+        ran = []
+        for job in list(self.jobs.values()):
+            if self.run_job(job, now):
+                ran.append(job.name)
+        return ran
+
+    def run_job(self, job, now=None):
+        """
+        Run job if it is due and no other node holds its lock.
+        """
+        with job_lock(job.name) as acquired:
+            if not acquired:
+                return False
+
+            now = now or timezone.now()
+            state, _ = ScheduledJob.objects.get_or_create(
+                name=job.name,
+                defaults={'next_run_at': now}
+            )
+            if state.next_run_at > now:
+                return False
+
+            missed = (now - state.next_run_at) // job.interval
+            state.next_run_at += job.interval * (missed + 1)
+            state.last_run_at = now
+            state.save(update_fields=['next_run_at', 'last_run_at'])
+
+            started = time.monotonic()
+            try:
+                job.func()
+                state.last_error = ''
+            except Exception as error:
+                logger.exception('Scheduled job %s failed.', job.name)
+                state.last_error = repr(error)
+            state.last_duration = time.monotonic() - started
+            state.save(update_fields=['last_duration', 'last_error'])
+
+            return True
+
+    def seconds_until_due(self, now=None):
+        """
+        Return the seconds until the next job is due, per the shared state.
+        """
+        now = now or timezone.now()
+        due = ScheduledJob.objects.filter(
+            name__in=self.jobs
+        ).values_list('name', 'next_run_at')
+        next_runs = dict(due)
+        if set(next_runs) != set(self.jobs):
+            return 0
+        return max(0, min(
+            (when - now).total_seconds() for when in next_runs.values()
+        ))
+
+    def run_forever(self, stop=None, poll=None):
+        """
+        Run due jobs until stop is set, polling at most every `poll`
+        seconds so runs by other nodes are noticed.
+        """
+        stop = stop or self._stop
+        if poll is None:
+            poll = getattr(settings, 'SCHEDULER_POLL_SECONDS', 5)
+
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                self.run_pending()
+                wait = min(poll, self.seconds_until_due())
+            except Exception:
+                logger.exception('Scheduler loop failed.')
+                wait = poll
+            stop.wait(wait)
+
+        close_old_connections()
+
+    def start(self):
+        """
+        Run the scheduler on a daemon thread of this process.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.autodiscover()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run_forever,
+            name='scheduler',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+scheduler = Scheduler()
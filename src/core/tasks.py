@@ -0,0 +1,362 @@
+"""
+Background task queue stored in the application database.
+
+Tasks are registered in a `tasks.py` module of any installed app and
+enqueued from request handlers, ideally in the same transaction as the
+change that prompted them, so a rolled back request leaves no task behind:
+
+    from core.tasks import task
+
+    @task(priority=5)
+    def sync_handle(user_id):
+        ...
+
+    sync_handle.enqueue(user_id=user.id)
+
+Workers (`manage.py run_worker`) claim queued tasks in batches with
+`SELECT ... FOR UPDATE SKIP LOCKED`, so any number of them share the queue
+without waiting on each other's rows. A failed task is retried with
+exponential backoff and, after `max_attempts`, left dead in the table with
+its last error for inspection.
+"""
+
+import logging
+import os
+import signal
+import socket
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from core.models import Task
+
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+class TaskFunction:
+    """
+    Registered task, callable directly or through the queue.
+    """
+
+    def __init__(self, func, name, priority, max_attempts):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def enqueue(self, priority=None, delay=None, **kwargs):
+        """
+        Queue a call with JSON serializable keyword arguments.
+        """
+        return enqueue(
+            self.name,
+            kwargs,
+            priority=self.priority if priority is None else priority,
+            delay=delay,
+            max_attempts=self.max_attempts
+        )
+
+    def __repr__(self):
+        return f'<TaskFunction {self.name}>'
+
+
+def task(name=None, priority=0, max_attempts=None):
+    """
+    Register the decorated function as a task.
+
+    Tasks with a higher priority are taken first. The name defaults to the
+    function's dotted path.
+    """
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        registry[task_name] = TaskFunction(
+            func,
+            task_name,
+            priority,
+            max_attempts or getattr(settings, 'TASK_MAX_ATTEMPTS', 5)
+        )
+        return registry[task_name]
+    return register
+
+
+def autodiscover():
+    """
+    Import the `tasks` module of every installed app.
+    """
+    autodiscover_modules('tasks')
+
+
+def enqueue(name, kwargs=None, priority=0, delay=None, max_attempts=None):
+    """
+    Queue a task by name and return it.
+    """
+    return Task.objects.create(
+        name=name,
+        kwargs=kwargs or {},
+        priority=priority,
+        run_at=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts or getattr(settings, 'TASK_MAX_ATTEMPTS', 5)
+    )
+
+
+def enqueue_many(name, calls, priority=0, batch_size=1000):
+    """
+    Queue one task per kwargs dict in calls with a bulk insert.
+    """
+    now = timezone.now()
+    max_attempts = getattr(settings, 'TASK_MAX_ATTEMPTS', 5)
+    return Task.objects.bulk_create(
+        [
+            Task(
+                name=name,
+                kwargs=kwargs,
+                priority=priority,
+                run_at=now,
+                max_attempts=max_attempts
+            )
+            for kwargs in calls
+        ],
+        batch_size=batch_size
+    )
+
+
+def dequeue(worker, limit=1, now=None):
+    """
+    Claim up to limit due tasks for worker, highest priority first.
+
+    Rows locked by a concurrent dequeue are skipped rather than waited on.
+    Where row locks are not supported the claim is a conditional update, so
+    a task taken by someone else in between is simply not returned.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(status=Task.QUEUED, run_at__lte=now)
+            .order_by('-priority', 'run_at', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+
+        Task.objects.filter(id__in=ids, status=Task.QUEUED).update(
+            status=Task.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            attempts=F('attempts') + 1
+        )
+
+    return sorted(
+        Task.objects.filter(
+            id__in=ids,
+            status=Task.RUNNING,
+            locked_by=worker
+        ),
+        key=lambda queued: (-queued.priority, queued.run_at, queued.id)
+    )
+
+
+def backoff(attempts):
+    """
+    Return the delay before retrying a task that failed attempts times.
+    """
+    base = getattr(settings, 'TASK_RETRY_BACKOFF', 10)
+    cap = getattr(settings, 'TASK_RETRY_BACKOFF_MAX', 3600)
+    return timedelta(seconds=min(cap, base * 2 ** (attempts - 1)))
+
+
+def claimed(queued):
+    """
+    Return the task as a queryset, unless it was requeued as stale and
+    possibly claimed by another worker since.
+    """
+    return Task.objects.filter(
+        id=queued.id,
+        status=Task.RUNNING,
+        locked_by=queued.locked_by
+    )
+
+
+def run(queued):
+    """
+    Run a claimed task and record the outcome. Returns whether it
+    succeeded.
+    """
+    try:
+        func = registry[queued.name]
+        func(**queued.kwargs)
+    except Exception as error:
+        fail(queued, f'{type(error).__name__}: {error}')
+        return False
+
+    claimed(queued).update(
+        status=Task.DONE,
+        finished_at=timezone.now(),
+        last_error=''
+    )
+    return True
+
+
+def fail(queued, error):
+    """
+    Schedule a retry of a failed task, or dead-letter it once it ran out
+    of attempts.
+    """
+    now = timezone.now()
+    if queued.attempts >= queued.max_attempts:
+        logger.error('Task %s is dead: %s', queued, error)
+        changes = {'status': Task.DEAD, 'finished_at': now}
+    else:
+        logger.warning('Task %s failed, will retry: %s', queued, error)
+        changes = {
+            'status': Task.QUEUED,
+            'run_at': now + backoff(queued.attempts),
+        }
+    claimed(queued).update(
+        last_error=error,
+        locked_by='',
+        **changes
+    )
+
+
+def requeue_stale(timeout=None, now=None):
+    """
+    Return tasks held by workers that died mid-run to the queue.
+
+    A task running longer than timeout seconds counts as an attempt that
+    failed. Returns the number of tasks requeued or dead-lettered.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'TASK_LOCK_TIMEOUT', 3600)
+    now = now or timezone.now()
+    stale = Task.objects.filter(
+        status=Task.RUNNING,
+        locked_at__lt=now - timedelta(seconds=timeout)
+    )
+    for queued in stale:
+        fail(queued, f'Worker {queued.locked_by} timed out.')
+    return len(stale)
+
+
+def purge(days=None, now=None):
+    """
+    Delete tasks that finished successfully more than days ago.
+    """
+    if days is None:
+        days = getattr(settings, 'TASK_RETENTION_DAYS', 7)
+    now = now or timezone.now()
+    deleted, _ = Task.objects.filter(
+        status=Task.DONE,
+        finished_at__lt=now - timedelta(days=days)
+    ).delete()
+    return deleted
+
+
+class Worker:
+    """
+    Runs queued tasks, on the calling thread or on a pool of threads.
+
+    A single-threaded worker claims `batch_size` tasks per round trip. A
+    pooled worker claims only as many tasks as it has idle threads, so
+    tasks it cannot start yet stay available to other workers. Both poll
+    every `poll` seconds while the queue is empty.
+    """
+
+    def __init__(self, threads=1, batch_size=None, poll=None, name=None):
+        self.threads = max(1, threads)
+        self.batch_size = batch_size or getattr(
+            settings,
+            'TASK_BATCH_SIZE',
+            10
+        )
+        if poll is None:
+            poll = getattr(settings, 'TASK_POLL_SECONDS', 1)
+        self.poll = poll
+        self.name = name or (
+            f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        )
+        self.processed = 0
+
+    def run_once(self):
+        """
+        Claim a batch of tasks and run them on the calling thread.
+
+        Returns the number of tasks run.
+        """
+        claimed = dequeue(self.name, self.batch_size)
+        for queued in claimed:
+            run(queued)
+        self.processed += len(claimed)
+        return len(claimed)
+
+    def run(self, stop, burst=False):
+        """
+        Run tasks until stop is set, or until the queue is empty in burst
+        mode.
+        """
+        if self.threads == 1:
+            while not stop.is_set():
+                if self.run_once():
+                    continue
+                if burst:
+                    return
+                requeue_stale()
+                stop.wait(self.poll)
+            return
+
+        pending = set()
+        with ThreadPoolExecutor(
+            max_workers=self.threads,
+            thread_name_prefix='task-worker'
+        ) as pool:
+            while not stop.is_set():
+                idle = self.threads - len(pending)
+                claimed = dequeue(self.name, idle) if idle else []
+                self.processed += len(claimed)
+                pending.update(
+                    pool.submit(self.run_in_thread, queued)
+                    for queued in claimed
+                )
+
+                if pending:
+                    _, pending = wait(
+                        pending,
+                        timeout=self.poll,
+                        return_when=FIRST_COMPLETED
+                    )
+                elif burst:
+                    break
+                else:
+                    requeue_stale()
+                    stop.wait(self.poll)
+            wait(pending)
+
+    def run_in_thread(self, queued):
+        close_old_connections()
+        try:
+            return run(queued)
+        finally:
+            close_old_connections()
+
+
+def run_worker(threads, batch_size=None, burst=False):
+    """
+    Process entry point of `run_worker --processes`.
+    """
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    Worker(threads, batch_size).run(stop, burst)
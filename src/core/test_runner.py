@@ -0,0 +1,25 @@
+"""
+Test runner for the project.
+"""
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Test runner that turns member activity tracking off.
+
+    Tests count queries and compare rows exactly, which a buffered flush
+    landing mid-test would upset. Activity tests turn tracking back on with
+    override_settings.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.activity_settings = override_settings(ACTIVITY_TRACKING=False)
+        self.activity_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.activity_settings.disable()
+        super().teardown_test_environment(**kwargs)
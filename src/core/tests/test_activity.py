@@ -0,0 +1,158 @@
+"""
+Tests for write-behind activity tracking.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from core import activity
+from core.models import EndpointUsage
+
+
+CONTEST_URL = reverse('contest:contest-list')
+
+
+def create_user(email, **params):
+    return get_user_model().objects.create_user(
+        email=email,
+        password='testpass123',
+        name=email.split('@')[0],
+        **params
+    )
+
+
+@override_settings(ACTIVITY_TRACKING=True, ACTIVITY_FLUSH_SECONDS=3600)
+class ActivityTrackerTests(TestCase):
+    """
+    Test buffering and flushing member activity.
+    """
+
+    def setUp(self):
+        activity.tracker.clear()
+        self.addCleanup(activity.tracker.clear)
+        self.user = create_user('member@example.com')
+        self.other = create_user('other@example.com')
+
+    def test_flush_writes_last_seen_and_counts(self):
+        """Test one flush records the latest touch and the totals."""
+        now = timezone.now()
+        tracker = activity.ActivityTracker()
+        for i in range(3):
+            tracker.touch(self.user.id, 'GET a', now + timedelta(seconds=i))
+        tracker.touch(self.user.id, 'POST b', now)
+        tracker.touch(self.other.id, 'GET a', now)
+
+        with self.assertNumQueries(5):
+            self.assertEqual(tracker.flush(), 5)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_seen_at, now + timedelta(seconds=2))
+        self.assertEqual(
+            sorted(EndpointUsage.objects.values_list(
+                'user_id', 'endpoint', 'count'
+            )),
+            sorted([
+                (self.user.id, 'GET a', 3),
+                (self.user.id, 'POST b', 1),
+                (self.other.id, 'GET a', 1),
+            ])
+        )
+        self.assertEqual(tracker.stats['flushes'], 1)
+        self.assertEqual(tracker.pending, 0)
+        self.assertEqual(tracker.flush(), 0)
+
+    def test_flushes_add_up_and_never_move_back(self):
+        """Test later flushes add counts and ignore older touches."""
+        now = timezone.now()
+        tracker = activity.ActivityTracker()
+        tracker.touch(self.user.id, 'GET a', now)
+        tracker.flush()
+        tracker.touch(self.user.id, 'GET a', now - timedelta(hours=1))
+        tracker.flush()
+
+        self.user.refresh_from_db()
+        usage = EndpointUsage.objects.get(user=self.user)
+        self.assertEqual(self.user.last_seen_at, now)
+        self.assertEqual(usage.count, 2)
+        self.assertEqual(usage.last_used_at, now)
+
+    def test_deleted_member_dropped(self):
+        """Test activity of a member deleted before the flush is skipped."""
+        tracker = activity.ActivityTracker()
+        tracker.touch(self.other.id, 'GET a')
+        tracker.touch(self.user.id, 'GET a')
+        self.other.delete()
+
+        tracker.flush()
+
+        self.assertEqual(
+            list(EndpointUsage.objects.values_list('user_id', flat=True)),
+            [self.user.id]
+        )
+
+    def test_failed_flush_is_retried(self):
+        """Test entries of a failed flush stay buffered."""
+        tracker = activity.ActivityTracker()
+        tracker.touch(self.user.id, 'GET a')
+
+        with patch('core.activity.write_usage', side_effect=DatabaseError):
+            self.assertEqual(tracker.flush(), 0)
+
+        self.assertEqual(tracker.stats['errors'], 1)
+        self.assertEqual(tracker.pending, 2)
+        tracker.flush()
+        self.assertEqual(EndpointUsage.objects.get().count, 1)
+
+    @override_settings(ACTIVITY_MAX_PENDING=2)
+    def test_due_when_full(self):
+        """Test a full buffer is due before the interval."""
+        tracker = activity.ActivityTracker()
+        self.assertFalse(tracker.due())
+        tracker.touch(self.user.id, 'GET a')
+
+        self.assertTrue(tracker.due())
+
+    def test_middleware_tracks_token_requests(self):
+        """Test requests authenticated by DRF are recorded by endpoint."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        client.get(CONTEST_URL)
+        client.get(CONTEST_URL)
+        APIClient().get(CONTEST_URL)
+
+        activity.tracker.flush()
+
+        usage = EndpointUsage.objects.get()
+        self.assertEqual(usage.user, self.user)
+        self.assertEqual(usage.endpoint, 'GET contest:contest-list')
+        self.assertEqual(usage.count, 2)
+
+    @override_settings(ACTIVITY_FLUSH_SECONDS=0)
+    def test_write_through(self):
+        """Test a zero interval flushes after every request."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        client.get(CONTEST_URL)
+
+        self.assertEqual(activity.tracker.pending, 0)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_seen_at)
+
+    @override_settings(ACTIVITY_TRACKING=False)
+    def test_tracking_disabled(self):
+        """Test nothing is buffered with tracking off."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        client.get(CONTEST_URL)
+
+        self.assertEqual(activity.tracker.pending, 0)
@@ -2,10 +2,21 @@
 Test for the custom Django admin.
 """
 
+import csv
+import io
+from datetime import timedelta
+from unittest import skipUnless
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.test import Client
+from django.utils import timezone
+
+from core.admin import EstimatedCountPaginator
+from core.models import Contest, Participation
 
 
 class AdminSiteTests(TestCase):
@@ -56,3 +67,187 @@ class AdminSiteTests(TestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, 200)
+
+
+class LargeTableAdminTests(TestCase):
+    """
+    Test the admin options for large contest and user tables.
+    """
+
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='password1234'
+        )
+        self.client = Client()
+        self.client.force_login(self.admin_user)
+        self.contests = [
+            Contest.objects.create(
+                name=name,
+                url='https://example.com',
+                platform=platform,
+                platform_id=str(i),
+                start_time=timezone.now() - timedelta(days=i)
+            )
+            for i, (name, platform) in enumerate([
+                ('Spring Cup', 'C'),
+                ('Summer Cup', 'K'),
+                ('Spring Open', 'K'),
+            ])
+        ]
+
+    def test_contest_filters_and_search(self):
+        """
+        Test filtering contests by platform and searching them.
+        """
+        url = reverse('admin:core_contest_changelist')
+
+        res = self.client.get(url, {'platform__exact': 'K'})
+        self.assertEqual(
+            [contest.name for contest in res.context['cl'].result_list],
+            ['Summer Cup', 'Spring Open']
+        )
+
+        res = self.client.get(url, {'q': 'spring'})
+        self.assertEqual(
+            [contest.name for contest in res.context['cl'].result_list],
+            ['Spring Cup', 'Spring Open']
+        )
+
+    def test_changelist_counts_once(self):
+        """
+        Test that the changelist does not count the whole table as well.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                reverse('admin:core_contest_changelist'),
+                {'platform__exact': 'K'}
+            )
+
+        self.assertEqual(res.status_code, 200)
+        counts = [
+            query['sql'] for query in queries.captured_queries
+            if 'COUNT(' in query['sql']
+        ]
+        self.assertEqual(len(counts), 1)
+        self.assertIn('WHERE', counts[0])
+
+    def test_page_keeps_order(self):
+        """
+        Test that pages looked up by key keep the queryset's order.
+        """
+        queryset = Contest.objects.order_by('-start_time', '-id')
+        paginator = EstimatedCountPaginator(queryset, 2)
+
+        self.assertEqual(paginator.count, 3)
+        self.assertEqual(
+            list(paginator.page(1).object_list),
+            [self.contests[0], self.contests[1]]
+        )
+        self.assertEqual(
+            list(paginator.page(2).object_list),
+            [self.contests[2]]
+        )
+
+    @skipUnless(connection.vendor == 'postgresql', 'planner estimates')
+    def test_estimated_count(self):
+        """
+        Test that results above the limit are estimated, not counted.
+        """
+        with self.settings(ADMIN_EXACT_COUNT_LIMIT=-1):
+            paginator = EstimatedCountPaginator(
+                Contest.objects.order_by('id'),
+                10
+            )
+            with CaptureQueriesContext(connection) as queries:
+                count = paginator.count
+
+        self.assertIsInstance(count, int)
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries
+        ))
+
+    def test_export_csv(self):
+        """
+        Test exporting every filtered contest, in several chunks.
+        """
+        for i in range(3, 8):
+            Contest.objects.create(
+                name=f'Kattis {i}',
+                url='https://example.com',
+                platform='K',
+                platform_id=str(i)
+            )
+        url = reverse('admin:core_contest_changelist') + '?platform__exact=K'
+
+        with self.settings(ADMIN_EXPORT_CHUNK_SIZE=2):
+            res = self.client.post(url, {
+                'action': 'export_csv',
+                'select_across': '1',
+                'index': '0',
+                '_selected_action': [self.contests[0].id],
+            })
+            rows = list(csv.reader(io.StringIO(
+                b''.join(res.streaming_content).decode()
+            )))
+
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        self.assertEqual(rows[0][:3], ['id', 'name', 'platform'])
+        self.assertEqual(
+            [int(row[0]) for row in rows[1:]],
+            list(Contest.objects.filter(
+                platform='K'
+            ).order_by('id').values_list('id', flat=True))
+        )
+
+    def test_user_search_by_prefix(self):
+        """
+        Test that users are found by the start of their email or handle.
+        """
+        alice = get_user_model().objects.create_user(
+            email='alice@example.com',
+            password='password1234',
+            codeforces_handle='tourist'
+        )
+        get_user_model().objects.create_user(
+            email='malice@example.com',
+            password='password1234'
+        )
+        url = reverse('admin:core_user_changelist')
+
+        for term in ('ALI', 'tour'):
+            res = self.client.get(url, {'q': term})
+            self.assertEqual(list(res.context['cl'].result_list), [alice])
+
+    @skipUnless(connection.vendor == 'postgresql', 'operator classes')
+    def test_user_search_uses_index(self):
+        """
+        Test that prefix searches can use the expression indexes.
+        """
+        queryset = get_user_model().objects.filter(email__istartswith='ali')
+        sql, params = queryset.query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}', params)
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+
+        self.assertIn('user_email_prefix_idx', plan)
+
+    def test_participation_list_queries(self):
+        """
+        Test that listing registrations does not query per row.
+        """
+        url = reverse('admin:core_participation_changelist')
+        Participation.objects.create(
+            user=self.admin_user,
+            contest=self.contests[0]
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+
+        for contest in self.contests[1:]:
+            Participation.objects.create(user=self.admin_user, contest=contest)
+        with self.assertNumQueries(len(queries)):
+            res = self.client.get(url)
+        self.assertContains(res, 'Spring Open')
@@ -2,13 +2,23 @@
 Test custom Django management commands.
 """
 
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
 from unittest.mock import patch
 
 from psycopg import OperationalError as PsycopgError
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+
+from core.models import Contest, ContestTombstone
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -41,3 +51,103 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 7)
         patched_check.assert_called_with(databases=['default'])
+
+
+class SeedDbCommandTests(TestCase):
+    """
+    Test the synthetic data seeding command.
+    """
+
+    def test_seed_db(self):
+        """
+        Test seeding users, tokens and contests on every platform.
+        """
+        out = StringIO()
+
+        call_command(
+            'seed_db',
+            users=7,
+            contests=9,
+            tokens=True,
+            batch_size=3,
+            password='seedpass1234',
+            stdout=out
+        )
+
+        users = get_user_model().objects.all()
+        self.assertEqual(users.count(), 7)
+        self.assertEqual(Token.objects.count(), 7)
+        self.assertEqual(
+            set(Contest.objects.values_list('platform', flat=True)),
+            set(Contest.PLATFORMS)
+        )
+        self.assertTrue(users.first().check_password('seedpass1234'))
+
+        for field in ['codeforces_handle', 'omegaup_handle', 'kattis_handle']:
+            handles = users.values_list(field, flat=True)
+            self.assertEqual(len(set(handles)), 7)
+
+    def test_seed_db_twice(self):
+        """
+        Test that consecutive runs do not collide on unique fields.
+        """
+        call_command('seed_db', users=3, contests=1, stdout=StringIO())
+        call_command('seed_db', users=3, contests=1, stdout=StringIO())
+
+        self.assertEqual(get_user_model().objects.count(), 6)
+
+
+class ImportUsersCommandTests(TestCase):
+    """
+    Test the bulk user import command.
+    """
+
+    def test_import_users_csv(self):
+        """
+        Test importing users from a CSV file.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'members.csv'
+            path.write_text(
+                'email,name,password,omegaup_handle\n'
+                'a@example.com,A,testpass1234,a_ou\n'
+                'b@example.com,B,123,b_ou\n'
+            )
+            out, err = StringIO(), StringIO()
+
+            call_command(
+                'import_users',
+                str(path),
+                workers=1,
+                stdout=out,
+                stderr=err
+            )
+
+        self.assertIn('Created 1 users, rejected 1 rows.', out.getvalue())
+        self.assertIn('Row 2', err.getvalue())
+        self.assertTrue(
+            get_user_model().objects.filter(omegaup_handle='a_ou').exists()
+        )
+
+
+class PruneContestTombstonesCommandTests(TestCase):
+    """
+    Test pruning the contest deletion log.
+    """
+
+    def test_prune_old_tombstones(self):
+        """
+        Test that only tombstones past retention are deleted.
+        """
+        old = ContestTombstone.objects.create(contest_id=1)
+        ContestTombstone.objects.filter(id=old.id).update(
+            deleted_at=timezone.now() - timedelta(days=31)
+        )
+        recent = ContestTombstone.objects.create(contest_id=2)
+
+        call_command('prune_contest_tombstones', stdout=StringIO())
+
+        self.assertEqual(
+            list(ContestTombstone.objects.values_list('id', flat=True)),
+            [recent.id]
+        )
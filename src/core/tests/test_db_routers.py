@@ -0,0 +1,283 @@
+"""
+Tests for read replica routing.
+
+The integration tests need a second database alias. Point it at the local
+database to run them, e.g.:
+
+    DB_REPLICA_HOSTS=db python manage.py test core.tests.test_db_routers
+"""
+
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    RequestFactory,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import db_routers
+from core.authentication import TokenAuthentication
+from core.middleware import ReplicaRoutingMiddleware
+from core.models import Contest
+
+
+CONTEST_URL = reverse('contest:contest-list')
+TOKEN_URL = reverse('user:token')
+
+
+def make_view(replica_reads, actions=None):
+    """
+    Return a view function that records whether replica reads were on.
+    """
+    calls = []
+
+    def view(request):
+        calls.append(db_routers.replica_reads_enabled())
+        return HttpResponse()
+
+    view.cls = type('View', (), {'replica_reads': replica_reads})
+    view.actions = actions
+    view.calls = calls
+    return view
+
+
+@override_settings(DATABASE_REPLICAS=['replica_a', 'replica_b'])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    """
+    Test the primary/replica router.
+    """
+
+    def setUp(self):
+        self.router = db_routers.PrimaryReplicaRouter()
+
+    def test_reads_use_primary_by_default(self):
+        """
+        Test that reads stay on the primary outside replica contexts.
+        """
+        self.assertEqual(self.router.db_for_read(Contest), 'default')
+
+    def test_reads_use_replica_when_enabled(self):
+        """
+        Test that enabled contexts read from a replica.
+        """
+        with db_routers.use_replicas():
+            self.assertIn(
+                self.router.db_for_read(Contest),
+                ['replica_a', 'replica_b']
+            )
+            self.assertEqual(self.router.db_for_write(Contest), 'default')
+
+    def test_replicas_are_not_migrated(self):
+        """
+        Test that migrations only run on the primary.
+        """
+        self.assertFalse(self.router.allow_migrate('replica_a', 'core'))
+        self.assertIsNone(self.router.allow_migrate('default', 'core'))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """
+        Test that everything goes to the primary without replicas.
+        """
+        with db_routers.use_replicas():
+            self.assertEqual(self.router.db_for_read(Contest), 'default')
+
+
+@override_settings(DATABASE_REPLICAS=['replica_a'])
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    """
+    Test the middleware deciding when replica reads are allowed.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def dispatch(self, request, view):
+        middleware = ReplicaRoutingMiddleware(
+            lambda req: middleware.process_view(req, view, (), {}) or view(req)
+        )
+        return middleware(request)
+
+    def test_safe_request_to_opted_in_view(self):
+        """
+        Test that GETs to opted-in views may use a replica.
+        """
+        view = make_view(True)
+
+        self.dispatch(self.factory.get('/'), view)
+
+        self.assertEqual(view.calls, [True])
+        self.assertFalse(db_routers.replica_reads_enabled())
+
+    def test_view_not_opted_in(self):
+        """
+        Test that views read from the primary unless they opt in.
+        """
+        view = make_view(False)
+
+        self.dispatch(self.factory.get('/'), view)
+
+        self.assertEqual(view.calls, [False])
+
+    def test_viewset_actions(self):
+        """
+        Test that viewsets opt in per action.
+        """
+        listing = make_view(('list',), actions={'get': 'list'})
+        creating = make_view(('list',), actions={'get': 'create'})
+
+        self.dispatch(self.factory.get('/'), listing)
+        self.dispatch(self.factory.get('/'), creating)
+
+        self.assertEqual(listing.calls + creating.calls, [True, False])
+
+    def test_reads_pinned_after_write(self):
+        """
+        Test that a client reads from the primary right after writing.
+        """
+        view = make_view(True)
+        mine = {'HTTP_AUTHORIZATION': 'Token mine'}
+        theirs = {'HTTP_AUTHORIZATION': 'Token theirs'}
+
+        self.dispatch(self.factory.post('/', **mine), view)
+        self.dispatch(self.factory.get('/', **mine), view)
+        self.dispatch(self.factory.get('/', **theirs), view)
+
+        self.assertEqual(view.calls, [False, False, True])
+
+    def test_pin_covers_authenticated_member(self):
+        """
+        Test that a write pins the member, not just the credentials used.
+        """
+        view = make_view(True)
+        request = self.factory.post('/', HTTP_AUTHORIZATION='Token mine')
+        request.user = get_user_model()(pk=7)
+
+        self.dispatch(request, view)
+
+        self.assertTrue(db_routers.primary_pinned(
+            db_routers.user_identity(7)
+        ))
+
+
+@override_settings(DATABASE_REPLICAS=['lagging_replica'])
+class ReadYourWritesTests(TestCase):
+    """
+    Test that clients read from the primary right after writing.
+
+    'lagging_replica' is no configured database, so any read sent to it
+    fails, as a read of rows the replica has not received yet would.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'member@example.com',
+            'testpass1234'
+        )
+
+    def test_login_then_authenticated_get(self):
+        """
+        Test that the token from a login works on the next request.
+        """
+        client = APIClient()
+        res = client.post(TOKEN_URL, {
+            'email': 'member@example.com',
+            'password': 'testpass1234',
+        })
+        client.credentials(HTTP_AUTHORIZATION=f'Token {res.data["token"]}')
+
+        res = client.get(CONTEST_URL)
+
+        self.assertEqual(res.status_code, 200)
+
+    @override_settings(DATABASE_REPLICAS=['default'])
+    def test_member_pinned_through_other_credentials(self):
+        """
+        Test that authenticating a pinned member leaves the replica.
+        """
+        token = Token.objects.create(user=self.user)
+        db_routers.pin_primary(db_routers.user_identity(self.user.pk))
+
+        with db_routers.use_replicas():
+            TokenAuthentication().authenticate_credentials(token.key)
+
+            self.assertFalse(db_routers.replica_reads_enabled())
+
+
+@skipUnless(settings.DATABASE_REPLICAS, 'No read replica configured.')
+class ReplicaIntegrationTests(TransactionTestCase):
+    """
+    Test routing against a real second database alias.
+    """
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        staff = get_user_model().objects.create_superuser(
+            'staff@example.com',
+            'testpass1234'
+        )
+        reader = get_user_model().objects.create_user(
+            'reader@example.com',
+            'testpass1234'
+        )
+        self.writer = self.client_for(staff)
+        self.reader = self.client_for(reader)
+
+    def client_for(self, user):
+        """
+        Return an API client authenticated with a real token.
+        """
+        token = Token.objects.create(user=user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
+
+    def replica_queries(self, client):
+        """
+        List the contests and return how many queries hit a replica.
+        """
+        contexts = [
+            CaptureQueriesContext(connections[alias])
+            for alias in settings.DATABASE_REPLICAS
+        ]
+        for context in contexts:
+            context.__enter__()
+        try:
+            res = client.get(CONTEST_URL)
+        finally:
+            for context in contexts:
+                context.__exit__(None, None, None)
+
+        self.assertEqual(len(res.data), 1)
+        return sum(len(context) for context in contexts)
+
+    def test_list_reads_from_replica(self):
+        """
+        Test that contest lists are served from a replica, except for the
+        client that just wrote.
+        """
+        res = self.writer.post(CONTEST_URL, {
+            'name': 'Replicated Contest',
+            'url': 'https://example.com/contest/1',
+            'platform': 'C',
+            'platform_id': '1',
+        })
+        self.assertEqual(res.status_code, 201)
+
+        self.assertEqual(self.replica_queries(self.writer), 0)
+        self.assertGreater(self.replica_queries(self.reader), 0)
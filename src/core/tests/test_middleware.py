@@ -0,0 +1,204 @@
+"""
+Tests for custom middleware.
+"""
+
+import json
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.test import Client, TestCase, RequestFactory, override_settings
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+
+from core.middleware import HealthCheckMiddleware, is_api_request
+
+
+def downstream(request):
+    """
+    Stand-in for the rest of the middleware stack.
+    """
+    return HttpResponse('downstream')
+
+
+class HealthCheckMiddlewareTests(TestCase):
+    """
+    Test the health check middleware.
+    """
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = HealthCheckMiddleware(downstream)
+
+    def test_liveness_short_circuits(self):
+        """
+        Test that /healthz answers without calling the rest of the stack.
+        """
+        with patch('core.middleware.connection') as patched_connection:
+            res = self.middleware(self.factory.get('/healthz'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content, b'ok')
+        patched_connection.cursor.assert_not_called()
+
+    def test_readiness_ok(self):
+        """
+        Test that /readyz reports every check as ok.
+        """
+        res = self.middleware(self.factory.get('/readyz/'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(json.loads(res.content), {
+            'status': 'ok',
+            'checks': {'database': 'ok', 'cache': 'ok', 'migrations': 'ok'},
+        })
+
+    def test_readiness_database_down(self):
+        """
+        Test that /readyz returns 503 when the database is unavailable.
+        """
+        with patch.object(
+            HealthCheckMiddleware,
+            'check_database',
+            return_value='unavailable'
+        ):
+            res = self.middleware(self.factory.get('/readyz'))
+
+        checks = json.loads(res.content)['checks']
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(checks['database'], 'unavailable')
+
+    def test_readiness_cached(self):
+        """
+        Test that readiness checks are reused within the cache window.
+        """
+        with patch.object(
+            HealthCheckMiddleware,
+            'run_checks',
+            return_value={'database': 'ok'}
+        ) as patched_checks:
+            self.middleware(self.factory.get('/readyz'))
+            self.middleware(self.factory.get('/readyz'))
+
+        patched_checks.assert_called_once()
+
+    def test_migrations_check_handles_database_error(self):
+        """
+        Test that a failing migration lookup reports unavailable.
+        """
+        with patch(
+            'core.middleware.MigrationExecutor',
+            side_effect=DatabaseError
+        ):
+            self.assertEqual(
+                self.middleware.check_migrations(),
+                'unavailable'
+            )
+
+    def test_other_paths_pass_through(self):
+        """
+        Test that other requests reach the rest of the stack.
+        """
+        res = self.middleware(self.factory.get('/api/user/me/'))
+
+        self.assertEqual(res.content, b'downstream')
+
+    def test_probe_through_full_stack(self):
+        """
+        Test that probes work through the configured middleware.
+        """
+        res = self.client.get('/healthz')
+
+        self.assertEqual(res.status_code, 200)
+
+
+class ApiFastPathTests(TestCase):
+    """
+    Test that API requests skip the session, CSRF, authentication and
+    message middleware while the admin keeps them.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='password1234'
+        )
+
+    def test_api_ignores_session(self):
+        """
+        Test that a logged in session does not authenticate API requests.
+        """
+        client = Client()
+        client.force_login(self.user)
+
+        res = client.get(reverse('user:list'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn('session', res.wsgi_request.__dict__)
+        self.assertFalse(hasattr(res.wsgi_request, '_messages'))
+        self.assertFalse(res.wsgi_request.user.is_authenticated)
+        self.assertNotIn('Cookie', res.get('Vary', ''))
+        self.assertEqual(res.cookies, {})
+
+    def test_api_token_with_session_cookie(self):
+        """
+        Test that token authentication works alongside a session cookie.
+        """
+        token = Token.objects.create(user=self.user)
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+
+        res = client.patch(
+            reverse('user:me'),
+            {'name': 'Renamed'},
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Token {token.key}'
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'Renamed')
+
+    def test_admin_login_enforces_csrf(self):
+        """
+        Test that the admin still uses sessions and CSRF protection.
+        """
+        client = Client(enforce_csrf_checks=True)
+        url = reverse('admin:login')
+        credentials = {
+            'username': 'admin@example.com',
+            'password': 'password1234',
+        }
+
+        res = client.get(url)
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('csrftoken', res.cookies)
+
+        res = client.post(url, credentials)
+        self.assertEqual(res.status_code, 403)
+
+        res = client.post(url, {
+            **credentials,
+            'csrfmiddlewaretoken': client.cookies['csrftoken'].value,
+        })
+        self.assertEqual(res.status_code, 302)
+        self.assertIn('sessionid', res.cookies)
+
+        res = client.get(reverse('admin:index'))
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.wsgi_request.user.is_authenticated)
+
+    def test_is_api_request(self):
+        """
+        Test matching requests against the configured prefixes.
+        """
+        factory = RequestFactory()
+
+        self.assertTrue(is_api_request(factory.get('/api/user/me/')))
+        self.assertFalse(is_api_request(factory.get('/admin/')))
+        self.assertFalse(is_api_request(factory.get('/apis/')))
+        with override_settings(API_PATH_PREFIXES=['/api/', '/v2/']):
+            self.assertTrue(is_api_request(factory.get('/v2/contests/')))
@@ -0,0 +1,45 @@
+"""
+Tests for the migration history.
+"""
+
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+from django.test import TestCase
+
+
+class MigrationHistoryTests(TestCase):
+    """
+    Test databases migrated by earlier releases keep migrating.
+    """
+
+    def test_graph_has_one_migration_per_number(self):
+        """
+        Test each core migration number is used once.
+        """
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        numbers = [
+            name.split('_', 1)[0]
+            for app, name in loader.disk_migrations
+            if app == 'core'
+        ]
+
+        self.assertEqual(len(numbers), len(set(numbers)))
+
+    def test_state_only_prefix_migration_is_ignored(self):
+        """
+        Test a database that applied the dropped 0023_prefix_index_state
+        before 0024 is still consistent.
+        """
+        MigrationRecorder(connection).record_applied(
+            'core',
+            '0023_prefix_index_state'
+        )
+
+        loader = MigrationLoader(connection)
+
+        loader.check_consistent_history(connection)
+        self.assertIn(
+            ('core', '0024_handle_status'),
+            loader.applied_migrations
+        )
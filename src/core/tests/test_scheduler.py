@@ -0,0 +1,191 @@
+"""
+Tests for the periodic job scheduler.
+"""
+
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import ScheduledJob
+from core.scheduler import Scheduler, advisory_lock, file_lock, lock_key
+
+
+@contextmanager
+def held_lock(name):
+    yield False
+
+
+@override_settings(SCHEDULER_LOCK_DIR=tempfile.mkdtemp())
+class SchedulerTests(TestCase):
+    """
+    Test running scheduled jobs.
+    """
+
+    def setUp(self):
+        self.scheduler = Scheduler()
+        self.calls = []
+
+        @self.scheduler.job('count', interval=timedelta(minutes=10))
+        def count():
+            self.calls.append(timezone.now())
+
+        self.job = self.scheduler.jobs['count']
+        self.now = timezone.now()
+
+    def test_interval_in_seconds(self):
+        """
+        Test registering a job with a plain number of seconds.
+        """
+        self.scheduler.job('other', interval=90)(lambda: None)
+
+        self.assertEqual(
+            self.scheduler.jobs['other'].interval,
+            timedelta(seconds=90)
+        )
+
+    def test_first_run_records_state(self):
+        """
+        Test a new job runs at once and is scheduled an interval later.
+        """
+        ran = self.scheduler.run_pending(self.now)
+
+        self.assertEqual(ran, ['count'])
+        self.assertEqual(len(self.calls), 1)
+        state = ScheduledJob.objects.get(name='count')
+        self.assertEqual(state.next_run_at, self.now + timedelta(minutes=10))
+        self.assertEqual(state.last_run_at, self.now)
+        self.assertEqual(state.last_error, '')
+        self.assertIsNotNone(state.last_duration)
+
+    def test_job_not_due_is_skipped(self):
+        """
+        Test a job does not run again before its next run time.
+        """
+        self.scheduler.run_pending(self.now)
+        ran = self.scheduler.run_pending(self.now + timedelta(minutes=9))
+
+        self.assertEqual(ran, [])
+        self.assertEqual(len(self.calls), 1)
+
+    def test_missed_runs_are_coalesced(self):
+        """
+        Test runs missed while no node was up collapse into one run.
+        """
+        ScheduledJob.objects.create(
+            name='count',
+            next_run_at=self.now - timedelta(minutes=35)
+        )
+
+        self.scheduler.run_pending(self.now)
+        self.scheduler.run_pending(self.now)
+
+        self.assertEqual(len(self.calls), 1)
+        state = ScheduledJob.objects.get(name='count')
+        # Still aligned to the original schedule.
+        self.assertEqual(state.next_run_at, self.now + timedelta(minutes=5))
+
+    def test_job_error_is_recorded(self):
+        """
+        Test a failing job is recorded and does not stop the others.
+        """
+        @self.scheduler.job('broken', interval=60)
+        def broken():
+            raise RuntimeError('upstream down')
+
+        with self.assertLogs('core.scheduler', 'ERROR'):
+            ran = self.scheduler.run_pending(self.now)
+
+        self.assertEqual(sorted(ran), ['broken', 'count'])
+        state = ScheduledJob.objects.get(name='broken')
+        self.assertIn('upstream down', state.last_error)
+        self.assertEqual(state.next_run_at, self.now + timedelta(seconds=60))
+
+    def test_lock_held_elsewhere_skips_job(self):
+        """
+        Test a job whose lock another node holds is not run.
+        """
+        with patch('core.scheduler.job_lock', held_lock):
+            ran = self.scheduler.run_pending(self.now)
+
+        self.assertEqual(ran, [])
+        self.assertEqual(self.calls, [])
+        self.assertFalse(ScheduledJob.objects.exists())
+
+    def test_seconds_until_due(self):
+        """
+        Test the wait until the next job is due.
+        """
+        self.assertEqual(self.scheduler.seconds_until_due(self.now), 0)
+
+        self.scheduler.run_pending(self.now)
+
+        self.assertEqual(
+            self.scheduler.seconds_until_due(self.now + timedelta(minutes=4)),
+            360
+        )
+
+    # The test transaction would otherwise be closed as obsolete.
+    @patch('core.scheduler.close_old_connections')
+    def test_run_forever_stops(self, patched_close):
+        """
+        Test the loop runs due jobs and exits once stopped.
+        """
+        stop = threading.Event()
+        self.scheduler.job('stop', interval=60)(stop.set)
+
+        self.scheduler.run_forever(stop, poll=0)
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertTrue(ScheduledJob.objects.filter(name='stop').exists())
+
+
+@override_settings(SCHEDULER_LOCK_DIR=tempfile.mkdtemp())
+class LockTests(TestCase):
+    """
+    Test the per-job locks.
+    """
+
+    def test_file_lock_is_exclusive(self):
+        """
+        Test a file lock cannot be taken twice until released.
+        """
+        with file_lock('job') as first:
+            with file_lock('job') as second:
+                self.assertTrue(first)
+                self.assertFalse(second)
+            with file_lock('other') as other:
+                self.assertTrue(other)
+
+        with file_lock('job') as again:
+            self.assertTrue(again)
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL only')
+    def test_advisory_lock_is_exclusive(self):
+        """
+        Test an advisory lock held by another session is not taken.
+        """
+        other = connection.copy()
+        try:
+            with other.cursor() as cursor:
+                with advisory_lock('job') as acquired:
+                    self.assertTrue(acquired)
+                    cursor.execute(
+                        'SELECT pg_try_advisory_lock(%s)',
+                        [lock_key('job')]
+                    )
+                    self.assertFalse(cursor.fetchone()[0])
+
+                cursor.execute(
+                    'SELECT pg_try_advisory_lock(%s)',
+                    [lock_key('job')]
+                )
+                self.assertTrue(cursor.fetchone()[0])
+        finally:
+            other.close()
@@ -0,0 +1,291 @@
+"""
+Tests for the background task queue.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core import tasks
+from core.models import Task
+
+
+calls = []
+
+
+@tasks.task(name='test.record')
+def record(value):
+    calls.append(value)
+
+
+@tasks.task(name='test.fail', max_attempts=2)
+def always_fail():
+    raise ValueError('boom')
+
+
+class TaskQueueTests(TestCase):
+    """
+    Test enqueueing, claiming and finishing tasks.
+    """
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue(self):
+        """
+        Test a registered task is queued with its arguments.
+        """
+        queued = record.enqueue(value=1)
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.name, 'test.record')
+        self.assertEqual(queued.kwargs, {'value': 1})
+        self.assertEqual(queued.status, Task.QUEUED)
+        self.assertEqual(calls, [])
+
+    def test_default_name_is_dotted_path(self):
+        """
+        Test tasks are named after their function by default.
+        """
+        tasks.autodiscover()
+
+        self.assertIn(
+            'problem.tasks.ingest_member_submissions',
+            tasks.registry
+        )
+
+    def test_dequeue_orders_by_priority_then_age(self):
+        """
+        Test higher priorities are claimed first, oldest first within one.
+        """
+        low = record.enqueue(value='low')
+        first = record.enqueue(value='first', priority=5)
+        second = record.enqueue(value='second', priority=5)
+
+        claimed = tasks.dequeue('worker', limit=2)
+
+        self.assertEqual([t.id for t in claimed], [first.id, second.id])
+        self.assertEqual(
+            [t.id for t in tasks.dequeue('worker', limit=2)],
+            [low.id]
+        )
+        self.assertEqual(tasks.dequeue('worker'), [])
+
+    def test_dequeue_marks_claimed(self):
+        """
+        Test claimed tasks are running, locked and counted as attempted.
+        """
+        record.enqueue(value=1)
+
+        claimed, = tasks.dequeue('worker')
+
+        self.assertEqual(claimed.status, Task.RUNNING)
+        self.assertEqual(claimed.locked_by, 'worker')
+        self.assertEqual(claimed.attempts, 1)
+
+    def test_delayed_task_not_due(self):
+        """
+        Test a delayed task is not claimed before its time.
+        """
+        record.enqueue(value=1, delay=timedelta(minutes=5))
+
+        self.assertEqual(tasks.dequeue('worker'), [])
+        self.assertEqual(len(tasks.dequeue(
+            'worker',
+            now=timezone.now() + timedelta(minutes=6)
+        )), 1)
+
+    def test_enqueue_many(self):
+        """
+        Test bulk enqueueing creates one task per call.
+        """
+        tasks.enqueue_many('test.record', [{'value': i} for i in range(5)])
+
+        worker = tasks.Worker(batch_size=10)
+        self.assertEqual(worker.run_once(), 5)
+        self.assertEqual(sorted(calls), [0, 1, 2, 3, 4])
+        self.assertEqual(Task.objects.filter(status=Task.DONE).count(), 5)
+
+    @override_settings(TASK_RETRY_BACKOFF=10)
+    def test_failed_task_retried_with_backoff(self):
+        """
+        Test a failing task is requeued after a delay.
+        """
+        queued = always_fail.enqueue()
+        claimed, = tasks.dequeue('worker')
+
+        with self.assertLogs('core.tasks', 'WARNING'):
+            self.assertFalse(tasks.run(claimed))
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.QUEUED)
+        self.assertEqual(queued.locked_by, '')
+        self.assertEqual(queued.last_error, 'ValueError: boom')
+        self.assertGreater(
+            queued.run_at,
+            timezone.now() + timedelta(seconds=8)
+        )
+        self.assertEqual(tasks.dequeue('worker'), [])
+
+    def test_task_dead_after_max_attempts(self):
+        """
+        Test a task that keeps failing is dead-lettered.
+        """
+        queued = always_fail.enqueue()
+        later = timezone.now() + timedelta(hours=1)
+
+        with self.assertLogs('core.tasks', 'WARNING'):
+            tasks.run(tasks.dequeue('worker')[0])
+            tasks.run(tasks.dequeue('worker', now=later)[0])
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.DEAD)
+        self.assertEqual(queued.attempts, 2)
+        self.assertIsNotNone(queued.finished_at)
+        self.assertEqual(
+            tasks.dequeue('worker', now=later + timedelta(days=1)),
+            []
+        )
+
+    def test_backoff_is_capped(self):
+        """
+        Test retry delays double up to the configured maximum.
+        """
+        with override_settings(
+            TASK_RETRY_BACKOFF=10,
+            TASK_RETRY_BACKOFF_MAX=60
+        ):
+            self.assertEqual(
+                [tasks.backoff(n).total_seconds() for n in range(1, 6)],
+                [10, 20, 40, 60, 60]
+            )
+
+    def test_requeue_stale(self):
+        """
+        Test tasks of a dead worker are returned to the queue.
+        """
+        queued = record.enqueue(value=1)
+        tasks.dequeue('dead-worker')
+        later = timezone.now() + timedelta(hours=2)
+
+        with self.assertLogs('core.tasks', 'WARNING'):
+            self.assertEqual(tasks.requeue_stale(3600, now=later), 1)
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.QUEUED)
+        self.assertIn('dead-worker', queued.last_error)
+
+    def test_late_completion_of_requeued_task_ignored(self):
+        """
+        Test a worker finishing a task requeued as stale does not mark it
+        done.
+        """
+        queued = record.enqueue(value=1)
+        claimed, = tasks.dequeue('slow-worker')
+        with self.assertLogs('core.tasks', 'WARNING'):
+            tasks.requeue_stale(
+                0,
+                now=timezone.now() + timedelta(seconds=1)
+            )
+
+        tasks.run(claimed)
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.QUEUED)
+
+    def test_purge(self):
+        """
+        Test old finished tasks are deleted and others kept.
+        """
+        done = record.enqueue(value=1)
+        dead = record.enqueue(value=2)
+        Task.objects.filter(id=done.id).update(
+            status=Task.DONE,
+            finished_at=timezone.now() - timedelta(days=10)
+        )
+        Task.objects.filter(id=dead.id).update(
+            status=Task.DEAD,
+            finished_at=timezone.now() - timedelta(days=10)
+        )
+
+        self.assertEqual(tasks.purge(7), 1)
+        self.assertEqual(list(Task.objects.values_list('id', flat=True)), [
+            dead.id
+        ])
+
+    def test_worker_burst(self):
+        """
+        Test a burst worker runs every due task and exits.
+        """
+        for i in range(3):
+            record.enqueue(value=i)
+
+        worker = tasks.Worker(batch_size=2, poll=0)
+        worker.run(threading.Event(), burst=True)
+
+        self.assertEqual(worker.processed, 3)
+        self.assertEqual(sorted(calls), [0, 1, 2])
+
+    def test_run_worker_command(self):
+        """
+        Test the worker command in burst mode.
+        """
+        record.enqueue(value='cmd')
+        out = StringIO()
+
+        call_command('run_worker', '--burst', stdout=out)
+
+        self.assertEqual(calls, ['cmd'])
+        self.assertIn('Processed 1 tasks.', out.getvalue())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Needs row locks')
+class ConcurrentWorkerTests(TransactionTestCase):
+    """
+    Test workers sharing the queue from separate connections.
+    """
+
+    def setUp(self):
+        calls.clear()
+
+    def test_concurrent_dequeue_claims_each_task_once(self):
+        """
+        Test concurrent dequeues skip each other's rows.
+        """
+        tasks.enqueue_many('test.record', [{'value': i} for i in range(200)])
+        start = threading.Barrier(4)
+
+        def drain(i):
+            start.wait()
+            claimed = []
+            try:
+                while batch := tasks.dequeue(f'worker-{i}', 7):
+                    claimed.extend(task.id for task in batch)
+            finally:
+                connection.close()
+            return claimed
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            claimed = [i for ids in pool.map(drain, range(4)) for i in ids]
+
+        self.assertEqual(len(claimed), 200)
+        self.assertEqual(len(set(claimed)), 200)
+
+    def test_threaded_worker(self):
+        """
+        Test a pooled worker runs every task.
+        """
+        tasks.enqueue_many('test.record', [{'value': i} for i in range(20)])
+
+        worker = tasks.Worker(threads=4, poll=0.01)
+        worker.run(threading.Event(), burst=True)
+
+        self.assertEqual(sorted(calls), list(range(20)))
+        self.assertEqual(Task.objects.filter(status=Task.DONE).count(), 20)
@@ -0,0 +1,112 @@
+"""
+Tests for token bucket throttling.
+"""
+
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.throttling import LocMemTokenBucketStore, CacheTokenBucketStore
+
+
+class LocMemTokenBucketStoreTests(SimpleTestCase):
+    """
+    Test the per-process bucket store.
+    """
+
+    def setUp(self):
+        self.store = LocMemTokenBucketStore()
+
+    @patch('core.throttling.time.monotonic')
+    def test_bucket_empties_and_refills(self, patched_time):
+        """
+        Test that a bucket allows a burst of capacity, then refills.
+        """
+        patched_time.return_value = 100.0
+
+        results = [self.store.consume('k', 3, 1.0) for _ in range(4)]
+
+        self.assertEqual([allowed for allowed, _ in results], [1, 1, 1, 0])
+        self.assertAlmostEqual(results[-1][1], 1.0)
+
+        patched_time.return_value = 101.0
+        self.assertTrue(self.store.consume('k', 3, 1.0)[0])
+        self.assertFalse(self.store.consume('k', 3, 1.0)[0])
+
+    @patch('core.throttling.time.monotonic')
+    def test_keys_are_independent(self, patched_time):
+        """
+        Test that emptying one bucket does not affect another.
+        """
+        patched_time.return_value = 0.0
+
+        self.store.consume('a', 1, 1.0)
+
+        self.assertFalse(self.store.consume('a', 1, 1.0)[0])
+        self.assertTrue(self.store.consume('b', 1, 1.0)[0])
+
+    @patch('core.throttling.time.monotonic')
+    def test_idle_keys_expire(self, patched_time):
+        """
+        Test that refilled buckets are dropped.
+        """
+        patched_time.return_value = 0.0
+        for i in range(10):
+            self.store.consume(f'key-{i}', 2, 1.0)
+
+        patched_time.return_value = 10.0
+        self.store.consume('fresh', 2, 1.0)
+
+        self.assertEqual(len(self.store), 1)
+
+    def test_max_entries(self):
+        """
+        Test that the store never holds more than max_entries buckets.
+        """
+        store = LocMemTokenBucketStore(max_entries=5)
+
+        for i in range(20):
+            store.consume(f'key-{i}', 10, 0.001)
+
+        self.assertEqual(len(store), 5)
+
+    @patch('core.throttling.time.monotonic')
+    def test_flood_does_not_reset_draining_buckets(self, patched_time):
+        """
+        Test that a full store refuses new keys instead of forgetting a
+        bucket that is still refilling.
+        """
+        patched_time.return_value = 100.0
+        store = LocMemTokenBucketStore(max_entries=3)
+        store.consume('victim', 1, 0.1)
+
+        flood = [store.consume(f'key-{i}', 1, 0.1)[0] for i in range(5)]
+
+        self.assertEqual(flood, [True, True, False, False, False])
+        self.assertFalse(store.consume('victim', 1, 0.1)[0])
+
+        patched_time.return_value = 110.0
+        self.assertTrue(store.consume('new', 1, 0.1)[0])
+
+
+class CacheTokenBucketStoreTests(SimpleTestCase):
+    """
+    Test the cache-backed bucket store.
+    """
+
+    def setUp(self):
+        self.store = CacheTokenBucketStore()
+        self.store.clear()
+
+    @patch('core.throttling.time.time')
+    def test_bucket_empties_and_refills(self, patched_time):
+        """
+        Test that the shared bucket behaves like the local one.
+        """
+        patched_time.return_value = 1000.0
+
+        results = [self.store.consume('k', 2, 0.5)[0] for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
+
+        patched_time.return_value = 1002.0
+        self.assertTrue(self.store.consume('k', 2, 0.5)[0])
@@ -0,0 +1,221 @@
+"""
+Token bucket request throttling.
+
+Each key holds a bucket of `capacity` tokens that refills at `capacity` per
+period of the configured rate (e.g. '10/min'). A bucket is just a token count
+and a timestamp, and once it has refilled completely it carries no more
+information than a missing one, so idle keys are dropped.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+class LocMemTokenBucketStore:
+    """
+    Per-process bucket store.
+
+    Buckets are kept in last-use order so expired ones are swept from the
+    front in amortized constant time. `max_entries` bounds memory under a
+    flood of distinct keys: forgetting a bucket that is still refilling
+    would reset it, so once the store is full, requests for new keys are
+    refused until buckets refill and are swept.
+    """
+
+    def __init__(self, max_entries=100_000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        """
+        Take one token from the bucket for key.
+
+        Returns whether the request is allowed and, if not, the seconds
+        until a token is available.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            self._sweep(now)
+            entry = self._buckets.pop(key, None)
+            if entry is None and len(self._buckets) >= self.max_entries:
+                return False, 1 / rate
+            tokens = capacity if entry is None else min(
+                capacity,
+                entry[0] + (now - entry[1]) * rate
+            )
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+
+            full_at = now + (capacity - tokens) / rate
+            self._buckets[key] = (tokens, now, full_at)
+
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+    def clear(self):
+        """
+        Forget every bucket.
+        """
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _sweep(self, now):
+        while self._buckets:
+            key, (_, _, full_at) = next(iter(self._buckets.items()))
+            if full_at > now:
+                break
+            del self._buckets[key]
+
+
+class CacheTokenBucketStore:
+    """
+    Bucket store shared between processes through a Django cache.
+
+    Entries expire once the bucket would be full again. The read and write
+    are not atomic, so concurrent requests for one key across processes can
+    occasionally both take the last token.
+    """
+
+    def __init__(self, alias=None):
+        self.alias = alias or getattr(
+            settings,
+            'THROTTLE_CACHE_ALIAS',
+            'default'
+        )
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def consume(self, key, capacity, rate):
+        """
+        Take one token from the bucket for key.
+        """
+        now = time.time()
+        cache_key = f'throttle:{key}'
+
+        entry = self.cache.get(cache_key)
+        tokens = capacity if entry is None else min(
+            capacity,
+            entry[0] + max(0, now - entry[1]) * rate
+        )
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        timeout = math.ceil((capacity - tokens) / rate)
+        self.cache.set(cache_key, (tokens, now), timeout=max(timeout, 1))
+
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+    def clear(self):
+        """
+        Forget every bucket (clears the whole cache alias).
+        """
+        self.cache.clear()
+
+
+_stores = {}
+
+
+def get_store():
+    """
+    Return the bucket store configured by `THROTTLE_STORE`.
+    """
+    path = getattr(
+        settings,
+        'THROTTLE_STORE',
+        'core.throttling.LocMemTokenBucketStore'
+    )
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Base throttle drawing from a token bucket per `scope` and key.
+
+    The rate for the scope comes from `DEFAULT_THROTTLE_RATES`, read on
+    every request so tests and deployments can change it.
+    """
+    scope = None
+
+    def get_key(self, request, view):
+        """
+        Return the bucket key for the request, or None to skip throttling.
+        """
+        raise NotImplementedError('.get_key() must be overridden')
+
+    def get_rate(self):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if rate is None:
+            return None
+        num, period = rate.split('/')
+        duration = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+        return int(num), int(num) / duration
+
+    def allow_request(self, request, view):
+        rate = self.get_rate()
+        key = self.get_key(request, view)
+        if rate is None or key is None:
+            return True
+
+        capacity, refill = rate
+        allowed, self._wait = get_store().consume(
+            f'{self.scope}:{key}',
+            capacity,
+            refill
+        )
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Throttle by client address.
+
+    X-Forwarded-For is only trusted as far as the NUM_PROXIES proxies in
+    front of the app append to it; without proxies, or with NUM_PROXIES
+    unset, the key is REMOTE_ADDR. DRF's get_ident() would take the whole
+    client supplied header then, a fresh bucket per made up value.
+    """
+
+    def get_key(self, request, view):
+        proxies = api_settings.NUM_PROXIES or 0
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if proxies and forwarded:
+            addresses = forwarded.split(',')
+            return addresses[-min(proxies, len(addresses))].strip()
+        return request.META.get('REMOTE_ADDR')
+
+
+class EmailTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Throttle by the email address in the request body.
+    """
+
+    def get_key(self, request, view):
+        data = request.data
+        email = data.get('email') if hasattr(data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return email.strip().lower()
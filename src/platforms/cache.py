@@ -0,0 +1,134 @@
+"""
+On-disk cache of platform API responses.
+
+Each entry is a body file and a small JSON metadata file named after a hash
+of the request. Bodies are written to a temporary file and renamed into
+place, so concurrent readers never see a partial body and a crash mid-write
+leaves the previous entry intact.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+
+class CacheEntry:
+    """
+    Metadata of a cached response.
+    """
+
+    def __init__(self, path, meta):
+        self.path = path
+        self.meta = meta
+
+    @property
+    def body_path(self):
+        return self.path.with_suffix('.body')
+
+    @property
+    def etag(self):
+        return self.meta.get('etag')
+
+    @property
+    def last_modified(self):
+        return self.meta.get('last_modified')
+
+    @property
+    def headers(self):
+        return self.meta.get('headers', {})
+
+    def is_fresh(self, now=None):
+        return (now or time.time()) < self.meta.get('expires', 0)
+
+    def validators(self):
+        """
+        Return the conditional request headers for revalidating the entry.
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Cache of GET responses keyed by URL and query parameters.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def key(self, url, params=None):
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        return hashlib.sha256(f'{url}?{query}'.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Return the entry for key, or None when there is no complete entry.
+        """
+        path = self._path(key)
+        try:
+            meta = json.loads(path.with_suffix('.json').read_text())
+        except (OSError, ValueError):
+            return None
+
+        entry = CacheEntry(path, meta)
+        if not entry.body_path.exists():
+            return None
+        return entry
+
+    def store(self, key, chunks, headers, ttl):
+        """
+        Write a response body from an iterable of chunks and return its entry.
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, temp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                for chunk in chunks:
+                    handle.write(chunk)
+            os.replace(temp, path.with_suffix('.body'))
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+        meta = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'headers': {
+                'Content-Type': headers.get('Content-Type', ''),
+            },
+        }
+        return self.refresh(CacheEntry(path, meta), ttl)
+
+    def refresh(self, entry, ttl):
+        """
+        Mark an entry as fresh for another ttl seconds.
+        """
+        entry.meta['expires'] = time.time() + ttl
+        self._write_meta(entry)
+        return entry
+
+    def clear(self):
+        """
+        Delete every cached response.
+        """
+        for path in self.directory.glob('*/*'):
+            path.unlink(missing_ok=True)
+
+    def _path(self, key):
+        return self.directory / key[:2] / key
+
+    def _write_meta(self, entry):
+        fd, temp = tempfile.mkstemp(dir=entry.path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w') as handle:
+            json.dump(entry.meta, handle)
+        os.replace(temp, entry.path.with_suffix('.json'))
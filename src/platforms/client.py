@@ -0,0 +1,261 @@
+"""
+Shared HTTP client for the contest platform APIs.
+
+One pooled `requests.Session` is kept per host, so syncs reuse keep-alive
+connections instead of paying a TCP and TLS handshake per call. Every host
+also gets a semaphore bounding the requests in flight to it, however many
+threads are syncing, so we stay polite to upstream rate limits.
+
+GET responses go through an on-disk cache: fresh entries are served without
+touching the network, and stale ones are revalidated with If-None-Match /
+If-Modified-Since, so an unchanged upstream answers with an empty 304.
+"""
+
+import io
+import json
+import re
+import threading
+from urllib.parse import urljoin, urlsplit
+
+from django.conf import settings
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from platforms.cache import ResponseCache
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class PlatformError(Exception):
+    """
+    A platform API request failed after retries.
+    """
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PlatformResponse:
+    """
+    A response body, in memory or in the response cache.
+
+    `from_cache` tells whether the body came from the cache, either because
+    the entry was fresh or because upstream answered 304 Not Modified.
+    """
+
+    def __init__(self, url, status_code, headers, content=None, path=None,
+                 from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.from_cache = from_cache
+        self._content = content
+        self._path = path
+
+    def open(self):
+        """
+        Return a binary file object over the body, for streaming parsers.
+        """
+        if self._path is not None:
+            return open(self._path, 'rb')
+        return io.BytesIO(self._content)
+
+    @property
+    def content(self):
+        if self._content is None:
+            with self.open() as handle:
+                return handle.read()
+        return self._content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        with self.open() as handle:
+            return json.load(handle)
+
+
+class PlatformClient:
+    """
+    Pooled, retrying and cached HTTP client shared by platform integrations.
+    """
+
+    def __init__(self, cache_dir=None, max_per_host=None, retries=None,
+                 backoff=None, timeout=None):
+        self.cache = ResponseCache(
+            cache_dir or settings.PLATFORM_HTTP_CACHE_DIR
+        )
+        self.max_per_host = max_per_host or settings.PLATFORM_HTTP_MAX_PER_HOST
+        self.retries = (
+            settings.PLATFORM_HTTP_RETRIES if retries is None else retries
+        )
+        self.backoff = (
+            settings.PLATFORM_HTTP_BACKOFF if backoff is None else backoff
+        )
+        self.timeout = timeout or settings.PLATFORM_HTTP_TIMEOUT
+        self._sessions = {}
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def session(self, host):
+        """
+        Return the pooled session for host, creating it on first use.
+        """
+        with self._lock:
+            if host not in self._sessions:
+                self._sessions[host] = self._build_session()
+                self._semaphores[host] = threading.BoundedSemaphore(
+                    self.max_per_host
+                )
+            return self._sessions[host]
+
+    def _build_session(self):
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry,
+            pool_connections=1,
+            pool_maxsize=self.max_per_host,
+        )
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['User-Agent'] = settings.PLATFORM_HTTP_USER_AGENT
+        return session
+
+    def get(self, url, params=None, ttl=None, cache=True):
+        """
+        GET url and return a PlatformResponse.
+
+        Fresh cached responses are returned without a request; stale ones are
+        revalidated. `ttl` overrides how long a response stays fresh when
+        upstream does not send Cache-Control max-age. Error statuses raise
+        PlatformError.
+        """
+        host = urlsplit(url).netloc
+        session = self.session(host)
+
+        entry = None
+        if cache:
+            key = self.cache.key(url, params)
+            entry = self.cache.get(key)
+            if entry is not None and entry.is_fresh():
+                return self._cached(url, entry)
+
+        headers = entry.validators() if entry is not None else {}
+
+        # The slot is held until the body is read, since the connection is
+        # busy until then.
+        with self._semaphores[host]:
+            response = self._request(session, url, params, headers=headers)
+
+            with response:
+                if response.status_code == 304 and entry is not None:
+                    self.cache.refresh(entry, self._ttl(response, ttl))
+                    return self._cached(url, entry)
+
+                self._raise_for_status(response)
+                try:
+                    if not cache:
+                        return PlatformResponse(
+                            response.url,
+                            response.status_code,
+                            dict(response.headers),
+                            content=response.content
+                        )
+                    entry = self.cache.store(
+                        key,
+                        response.iter_content(CHUNK_SIZE),
+                        response.headers,
+                        self._ttl(response, ttl)
+                    )
+                except requests.RequestException as error:
+                    raise PlatformError(
+                        f'GET {url} failed: {error}'
+                    ) from error
+
+        return PlatformResponse(
+            response.url,
+            response.status_code,
+            entry.headers,
+            path=entry.body_path
+        )
+
+    def platform_url(self, platform, path):
+        """
+        Return the URL of path on a platform's API, e.g. ('C', 'contest.list').
+        """
+        return urljoin(settings.PLATFORM_API_URLS[platform], path)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._semaphores.clear()
+
+    def _request(self, session, url, params, headers=None):
+        try:
+            return session.get(
+                url,
+                params=params,
+                headers=headers,
+                timeout=self.timeout,
+                stream=True
+            )
+        except requests.RequestException as error:
+            raise PlatformError(f'GET {url} failed: {error}') from error
+
+    def _raise_for_status(self, response):
+        if response.status_code >= 400:
+            raise PlatformError(
+                f'GET {response.url} returned {response.status_code}.',
+                status_code=response.status_code
+            )
+
+    def _ttl(self, response, ttl):
+        match = re.search(
+            r'max-age=(\d+)',
+            response.headers.get('Cache-Control', '')
+        )
+        if match:
+            return int(match.group(1))
+        return settings.PLATFORM_HTTP_CACHE_TTL if ttl is None else ttl
+
+    def _cached(self, url, entry):
+        return PlatformResponse(
+            url,
+            200,
+            entry.headers,
+            path=entry.body_path,
+            from_cache=True
+        )
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the process-wide platform client.
+    """
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = PlatformClient()
+        return _client
@@ -0,0 +1,154 @@
+"""
+A local HTTP server standing in for the platform APIs in tests.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class Route:
+    """
+    A canned response, optionally failing or slow.
+
+    `body` may be a callable taking the parsed query string, for endpoints
+    whose answer depends on it. `fail` responses with `fail_status` are sent
+    before the real one, to exercise retries. With `etag` or `last_modified`
+    set, matching conditional requests get 304 Not Modified.
+    """
+
+    def __init__(self, body=b'', status=200, headers=None, etag=None,
+                 last_modified=None, delay=0, fail=0, fail_status=503):
+        self.body = body
+        self.status = status
+        self.headers = headers or {}
+        self.etag = etag
+        self.last_modified = last_modified
+        self.delay = delay
+        self.fail = fail
+        self.fail_status = fail_status
+
+
+class FakeUpstream:
+    """
+    Threaded HTTP server serving routes registered with `route()`.
+
+    Records every request so tests can count hits, inspect the headers sent
+    and check how many requests were in flight at once.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def route(self, path, *args, **kwargs):
+        self.routes[path] = Route(*args, **kwargs)
+        return self.routes[path]
+
+    def url(self, path=''):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}{path}'
+
+    def hits(self, path):
+        return sum(1 for request in self.requests if request['path'] == path)
+
+    def start(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                upstream.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def handle(self, handler):
+        path = handler.path.partition('?')[0]
+
+        with self._lock:
+            self.requests.append({
+                'path': path,
+                'query': handler.path.partition('?')[2],
+                'headers': dict(handler.headers),
+                'port': handler.client_address[1],
+            })
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            route = self.routes.get(path)
+            failing = route is not None and route.fail > 0
+            if failing:
+                route.fail -= 1
+
+        try:
+            if route is not None and route.delay:
+                time.sleep(route.delay)
+
+            if route is None:
+                self.send(handler, 404, b'not found')
+            elif failing:
+                self.send(handler, route.fail_status, b'unavailable')
+            elif self.not_modified(handler, route):
+                self.send(handler, 304, b'', self.validators(route))
+            else:
+                headers = dict(route.headers, **self.validators(route))
+                self.send(handler, route.status, self.body(handler, route),
+                          headers)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def body(self, handler, route):
+        body = route.body
+        if callable(body):
+            body = body(parse_qs(handler.path.partition('?')[2]))
+        if isinstance(body, str):
+            body = body.encode()
+        return body
+
+    def not_modified(self, handler, route):
+        if route.etag and handler.headers.get('If-None-Match') == route.etag:
+            return True
+        return bool(
+            route.last_modified
+            and handler.headers.get('If-Modified-Since') == route.last_modified
+        )
+
+    def validators(self, route):
+        headers = {}
+        if route.etag:
+            headers['ETag'] = route.etag
+        if route.last_modified:
+            headers['Last-Modified'] = route.last_modified
+        return headers
+
+    def send(self, handler, status, body, headers=None):
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        if status != 304:
+            handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        if body:
+            handler.wfile.write(body)
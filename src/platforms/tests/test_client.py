@@ -0,0 +1,198 @@
+"""
+Tests for the platform HTTP client.
+"""
+
+import tempfile
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from platforms.client import PlatformClient, PlatformError
+from platforms.tests.fake_upstream import FakeUpstream
+
+
+class PlatformClientTests(SimpleTestCase):
+    """
+    Test the pooled, cached client against a fake upstream.
+    """
+
+    def setUp(self):
+        self.upstream = FakeUpstream().start()
+        self.addCleanup(self.upstream.stop)
+
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+
+        self.client = PlatformClient(
+            cache_dir=cache_dir.name,
+            max_per_host=2,
+            retries=2,
+            backoff=0,
+            timeout=(1, 5)
+        )
+        self.addCleanup(self.client.close)
+
+    def test_fresh_cache_skips_request(self):
+        """
+        Test that a fresh cached response is served without a request.
+        """
+        self.upstream.route('/contest.list', '{"status": "OK"}')
+        url = self.upstream.url('/contest.list')
+
+        first = self.client.get(url, params={'gym': 'false'}, ttl=60)
+        second = self.client.get(url, params={'gym': 'false'}, ttl=60)
+
+        self.assertEqual(first.json(), {'status': 'OK'})
+        self.assertFalse(first.from_cache)
+        self.assertEqual(second.json(), {'status': 'OK'})
+        self.assertTrue(second.from_cache)
+        self.assertEqual(self.upstream.hits('/contest.list'), 1)
+
+    def test_params_are_part_of_the_key(self):
+        """
+        Test that different query parameters are cached separately.
+        """
+        self.upstream.route('/user.info', 'ok')
+        url = self.upstream.url('/user.info')
+
+        self.client.get(url, params={'handles': 'a'})
+        self.client.get(url, params={'handles': 'b'})
+
+        self.assertEqual(self.upstream.hits('/user.info'), 2)
+
+    def test_stale_cache_revalidates_with_etag(self):
+        """
+        Test that stale entries are revalidated and 304 reuses the body.
+        """
+        self.upstream.route('/problemset', 'problems', etag='"v1"')
+        url = self.upstream.url('/problemset')
+
+        self.client.get(url, ttl=0)
+        res = self.client.get(url, ttl=0)
+
+        self.assertEqual(res.content, b'problems')
+        self.assertTrue(res.from_cache)
+        self.assertEqual(
+            self.upstream.requests[-1]['headers'].get('If-None-Match'),
+            '"v1"'
+        )
+
+    def test_revalidates_with_last_modified(self):
+        """
+        Test revalidating an entry that only has Last-Modified.
+        """
+        modified = 'Mon, 19 Oct 2026 10:00:00 GMT'
+        self.upstream.route('/ranking', 'ranking', last_modified=modified)
+        url = self.upstream.url('/ranking')
+
+        self.client.get(url, ttl=0)
+        res = self.client.get(url, ttl=0)
+
+        self.assertTrue(res.from_cache)
+        self.assertEqual(
+            self.upstream.requests[-1]['headers'].get('If-Modified-Since'),
+            modified
+        )
+
+    def test_changed_upstream_replaces_entry(self):
+        """
+        Test that a new body replaces the cached one.
+        """
+        route = self.upstream.route('/contests', 'old', etag='"v1"')
+        url = self.upstream.url('/contests')
+        self.client.get(url, ttl=0)
+
+        route.body, route.etag = b'new', '"v2"'
+        res = self.client.get(url, ttl=0)
+
+        self.assertFalse(res.from_cache)
+        self.assertEqual(res.content, b'new')
+
+    def test_max_age_overrides_ttl(self):
+        """
+        Test that upstream Cache-Control max-age sets the freshness.
+        """
+        self.upstream.route(
+            '/cached',
+            'body',
+            headers={'Cache-Control': 'public, max-age=60'}
+        )
+        url = self.upstream.url('/cached')
+
+        self.client.get(url, ttl=0)
+        res = self.client.get(url, ttl=0)
+
+        self.assertTrue(res.from_cache)
+        self.assertEqual(self.upstream.hits('/cached'), 1)
+
+    def test_retries_with_backoff(self):
+        """
+        Test that transient errors are retried.
+        """
+        self.upstream.route('/flaky', 'ok', fail=2)
+
+        res = self.client.get(self.upstream.url('/flaky'), cache=False)
+
+        self.assertEqual(res.content, b'ok')
+        self.assertEqual(self.upstream.hits('/flaky'), 3)
+
+    def test_gives_up_after_retries(self):
+        """
+        Test that persistent errors raise PlatformError.
+        """
+        self.upstream.route('/down', 'ok', fail=10)
+
+        with self.assertRaises(PlatformError) as context:
+            self.client.get(self.upstream.url('/down'))
+
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertEqual(self.upstream.hits('/down'), 3)
+
+    def test_client_errors_not_cached(self):
+        """
+        Test that 4xx responses raise and leave nothing cached.
+        """
+        url = self.upstream.url('/missing')
+
+        for _ in range(2):
+            with self.assertRaises(PlatformError):
+                self.client.get(url)
+
+        self.assertEqual(self.upstream.hits('/missing'), 2)
+
+    def test_keep_alive(self):
+        """
+        Test that sequential requests reuse one connection.
+        """
+        self.upstream.route('/a', 'a')
+
+        for _ in range(3):
+            self.client.get(self.upstream.url('/a'), cache=False)
+
+        ports = {request['port'] for request in self.upstream.requests}
+        self.assertEqual(len(ports), 1)
+
+    def test_per_host_concurrency_limit(self):
+        """
+        Test that requests in flight to one host are capped.
+        """
+        self.upstream.route('/slow', 'slow', delay=0.1)
+        url = self.upstream.url('/slow')
+
+        threads = [
+            threading.Thread(
+                target=self.client.get,
+                args=(url,),
+                kwargs={'cache': False}
+            )
+            for _ in range(6)
+        ]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.upstream.max_in_flight, 2)
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
@@ -0,0 +1,161 @@
+"""
+Import of platform problemsets into the local problem catalog.
+"""
+
+import itertools
+
+from django.db import transaction
+
+from core.models import Problem, Tag
+from platforms.client import get_client
+from problem.parser import iter_array
+
+
+CODEFORCES_PROBLEMSET = 'problemset.problems'
+
+
+def fetch_codeforces_problems(client=None):
+    """
+    Yield the problems in the Codeforces problemset as dicts.
+
+    The response is cached on disk by the platform client and parsed as a
+    stream, so only one problem is decoded at a time.
+    """
+    client = client or get_client()
+    response = client.get(
+        client.platform_url('C', CODEFORCES_PROBLEMSET),
+        ttl=3600
+    )
+
+    with response.open() as stream:
+        for problem in iter_array(stream, ('result', 'problems')):
+            if 'contestId' not in problem:
+                continue
+            yield {
+                'contest_id': str(problem['contestId']),
+                'index': problem['index'],
+                'name': problem['name'],
+                'rating': problem.get('rating'),
+                'tags': sorted(set(problem.get('tags', []))),
+            }
+
+
+class ProblemImporter:
+    """
+    Upsert problems in batches, writing only what changed.
+
+    Each batch costs two reads (the existing problems and their tags); rows
+    that already match are left alone, so re-importing an unchanged
+    problemset issues no writes.
+    """
+
+    def __init__(self, platform, batch_size=1000):
+        self.platform = platform
+        self.batch_size = batch_size
+        self.tag_ids = dict(Tag.objects.values_list('name', 'id'))
+        self.stats = {'created': 0, 'updated': 0, 'unchanged': 0}
+
+    def run(self, problems):
+        """
+        Import an iterable of problem dicts and return the counts.
+        """
+        problems = iter(problems)
+        while True:
+            batch = list(itertools.islice(problems, self.batch_size))
+            if not batch:
+                return self.stats
+            with transaction.atomic():
+                self.import_batch(batch)
+
+    def import_batch(self, batch):
+        # Later duplicates of a key win, as they would with row-by-row saves.
+        batch = {(row['contest_id'], row['index']): row for row in batch}
+
+        existing = {
+            (problem.contest_id, problem.index): problem
+            for problem in Problem.objects.filter(
+                platform=self.platform,
+                contest_id__in={contest_id for contest_id, _ in batch}
+            )
+            if (problem.contest_id, problem.index) in batch
+        }
+        current_tags = {problem.id: set() for problem in existing.values()}
+        for problem_id, tag_id in Problem.tags.through.objects.filter(
+            problem_id__in=current_tags
+        ).values_list('problem_id', 'tag_id'):
+            current_tags[problem_id].add(tag_id)
+
+        self.ensure_tags({
+            tag for row in batch.values() for tag in row['tags']
+        })
+
+        created, changed, retagged = [], [], {}
+        for key, row in batch.items():
+            tag_ids = {self.tag_ids[tag] for tag in row['tags']}
+            problem = existing.get(key)
+
+            if problem is None:
+                problem = Problem(
+                    platform=self.platform,
+                    contest_id=row['contest_id'],
+                    index=row['index'],
+                    name=row['name'],
+                    rating=row['rating']
+                )
+                created.append((problem, tag_ids))
+                continue
+
+            fields_changed = (
+                problem.name != row['name'] or problem.rating != row['rating']
+            )
+            if fields_changed:
+                problem.name = row['name']
+                problem.rating = row['rating']
+                changed.append(problem)
+            if current_tags[problem.id] != tag_ids:
+                retagged[problem.id] = tag_ids
+            if not fields_changed and problem.id not in retagged:
+                self.stats['unchanged'] += 1
+
+        Problem.objects.bulk_create([problem for problem, _ in created])
+        for problem, tag_ids in created:
+            retagged[problem.id] = tag_ids
+        Problem.objects.bulk_update(changed, ['name', 'rating'])
+
+        self.stats['created'] += len(created)
+        self.stats['updated'] += len(
+            {problem.id for problem in changed}
+            | (set(retagged) - {problem.id for problem, _ in created})
+        )
+        self.set_tags(retagged)
+
+    def ensure_tags(self, names):
+        """
+        Create missing tags and remember their ids.
+        """
+        missing = names - self.tag_ids.keys()
+        if not missing:
+            return
+
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in missing],
+            ignore_conflicts=True
+        )
+        self.tag_ids.update(
+            Tag.objects.filter(name__in=missing).values_list('name', 'id')
+        )
+
+    def set_tags(self, retagged):
+        """
+        Replace the tags of the given problems.
+        """
+        if not retagged:
+            return
+
+        through = Problem.tags.through
+        through.objects.filter(problem_id__in=retagged).delete()
+        through.objects.bulk_create([
+            through(problem_id=problem_id, tag_id=tag_id)
+            for problem_id, tag_ids in retagged.items()
+            for tag_id in tag_ids
+        ])
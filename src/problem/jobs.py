@@ -0,0 +1,19 @@
+"""
+Periodic platform syncs, see core.scheduler.
+"""
+
+from datetime import timedelta
+
+from django.core.management import call_command
+
+from core.scheduler import scheduler
+
+
+@scheduler.job('import-problems', interval=timedelta(days=1))
+def import_problems():
+    call_command('import_problems')
+
+
+@scheduler.job('ingest-submissions', interval=timedelta(minutes=15))
+def ingest_submissions():
+    call_command('ingest_submissions')
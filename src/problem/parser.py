@@ -0,0 +1,134 @@
+"""
+Incremental JSON parsing for large platform responses.
+
+`iter_array` walks a JSON document from a binary stream down to an array and
+yields its elements one at a time, so memory use depends on the largest
+element rather than on the document. Values outside the path are decoded
+and discarded as they are passed, which is fine for the small envelopes
+platform APIs wrap their results in.
+"""
+
+import codecs
+import json
+
+
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = ' \t\n\r'
+
+
+class ParseError(ValueError):
+    """
+    The document does not have the expected structure.
+    """
+
+
+class _Reader:
+    """
+    Sliding window over a decoded text stream.
+    """
+
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.json = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """
+        Read another chunk, dropping the consumed part of the buffer.
+        """
+        if self.eof:
+            raise ParseError('Unexpected end of document.')
+
+        chunk = self.stream.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + self.decoder.decode(
+            chunk,
+            final=self.eof
+        )
+        self.pos = 0
+
+    def peek(self):
+        """
+        Return the next non-whitespace character without consuming it.
+        """
+        while True:
+            while (
+                self.pos < len(self.buffer)
+                and self.buffer[self.pos] in WHITESPACE
+            ):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            self.fill()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ParseError(
+                f'Expected {char!r}, found {self.buffer[self.pos]!r}.'
+            )
+        self.pos += 1
+
+    def value(self):
+        """
+        Decode the next complete JSON value.
+
+        A value ending exactly at the end of the buffer may be a truncated
+        number, so it is only accepted once more input (or the end of the
+        document) confirms it.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.json.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                self.fill()
+                continue
+            if end == len(self.buffer) and not self.eof:
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array(stream, path, chunk_size=CHUNK_SIZE):
+    """
+    Yield the elements of the array at `path` in a JSON document.
+
+    `path` is a sequence of object keys, e.g. ('result', 'problems').
+    """
+    reader = _Reader(stream, chunk_size)
+
+    for key in path:
+        _find_key(reader, key)
+
+    reader.expect('[')
+    if reader.peek() == ']':
+        return
+
+    while True:
+        yield reader.value()
+        if reader.peek() == ']':
+            return
+        reader.expect(',')
+
+
+def _find_key(reader, wanted):
+    """
+    Advance into the current object until the value of key `wanted`.
+    """
+    reader.expect('{')
+    while reader.peek() != '}':
+        key = reader.value()
+        reader.expect(':')
+        if key == wanted:
+            return
+        reader.value()
+        if reader.peek() == ',':
+            reader.pos += 1
+
+    raise ParseError(f'Key {wanted!r} not found.')
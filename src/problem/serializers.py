@@ -0,0 +1,43 @@
+"""
+Serializers for the problem API View.
+"""
+
+from rest_framework import serializers
+
+from core.models import Problem, Tag
+
+
+class ProblemSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the problem object.
+    """
+    tags = serializers.SlugRelatedField(
+        many=True,
+        read_only=True,
+        slug_field='name'
+    )
+
+    class Meta:
+        model = Problem
+        fields = [
+            'id',
+            'platform',
+            'contest_id',
+            'index',
+            'name',
+            'rating',
+            'tags'
+        ]
+        read_only_fields = fields
+
+
+class TagSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the tag object, with the number of tagged problems.
+    """
+    problem_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Tag
+        fields = ['id', 'name', 'problem_count']
+        read_only_fields = fields
@@ -0,0 +1,158 @@
+"""
+Solved-problem sets as bitmaps.
+
+A member's solved problems are a Python int used as a bitmap over problem
+ids. Union, intersection and difference over a 10k-problem catalog are then
+single C-level operations on ~1.25 KB integers, and counting is
+`int.bit_count()`, so club-wide questions cost microseconds per member
+instead of set joins in the database.
+
+The bitmaps are stored in SolvedSet rows and each process keeps all of them
+in memory, reloading only when a row changed.
+"""
+
+import threading
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, Max
+
+from core.models import SolvedSet, Submission
+
+
+ACCEPTED = 'OK'
+
+
+def to_bits(ids):
+    """
+    Return the bitmap with the bits of ids set.
+    """
+    ids = list(ids)
+    if not ids:
+        return 0
+
+    buffer = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        buffer[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def from_bits(bits):
+    """
+    Return the ids whose bits are set, in increasing order.
+    """
+    binary = bin(bits)[:1:-1]
+    return [i for i, bit in enumerate(binary) if bit == '1']
+
+
+def to_bytes(bits):
+    return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+
+
+def from_bytes(data):
+    return int.from_bytes(data or b'', 'little')
+
+
+def add_solved(user_id, problem_ids):
+    """
+    Mark problems as solved by a member.
+    """
+    problem_ids = list(problem_ids)
+    if not problem_ids:
+        return
+
+    with transaction.atomic():
+        solved, _ = SolvedSet.objects.select_for_update().get_or_create(
+            user_id=user_id
+        )
+        bits = from_bytes(solved.bits) | to_bits(problem_ids)
+        solved.bits = to_bytes(bits)
+        solved.count = bits.bit_count()
+        solved.save()
+
+
+def rebuild():
+    """
+    Recompute every solved set from accepted submissions.
+
+    Returns the number of members with at least one solved problem.
+    """
+    solved = {}
+    for user_id, problem_id in Submission.objects.filter(
+        verdict=ACCEPTED,
+        problem__isnull=False
+    ).values_list('user_id', 'problem_id').distinct().iterator():
+        solved.setdefault(user_id, []).append(problem_id)
+
+    with transaction.atomic():
+        SolvedSet.objects.all().delete()
+        rows = []
+        for user_id, problem_ids in solved.items():
+            bits = to_bits(problem_ids)
+            rows.append(SolvedSet(
+                user_id=user_id,
+                bits=to_bytes(bits),
+                count=bits.bit_count()
+            ))
+        SolvedSet.objects.bulk_create(rows, batch_size=1000)
+
+    return len(rows)
+
+
+class SolvedSets:
+    """
+    In-memory snapshot of every member's solved bitmap.
+
+    Each access checks the latest update time and row count, one indexed
+    query, and reloads the bitmaps only when they changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._sets = {}
+        self._union = 0
+
+    def _refresh(self):
+        version = tuple(SolvedSet.objects.aggregate(
+            Max('updated_at'),
+            Count('id')
+        ).values())
+
+        with self._lock:
+            if version == self._version:
+                return self._sets, self._union
+
+        sets = {
+            user_id: from_bytes(bits)
+            for user_id, bits in SolvedSet.objects.values_list(
+                'user_id',
+                'bits'
+            ).iterator()
+        }
+        union = reduce(or_, sets.values(), 0)
+
+        with self._lock:
+            self._version = version
+            self._sets, self._union = sets, union
+            return sets, union
+
+    def get(self, user_id):
+        """
+        Return a member's bitmap (0 when nothing is solved).
+        """
+        sets, _ = self._refresh()
+        return sets.get(user_id, 0)
+
+    def union(self, user_ids=None):
+        """
+        Return the problems solved by any of user_ids, or by anyone.
+        """
+        sets, union = self._refresh()
+        if user_ids is None:
+            return union
+        return reduce(or_, (sets.get(i, 0) for i in user_ids), 0)
+
+
+solved_sets = SolvedSets()
@@ -0,0 +1,235 @@
+"""
+Incremental ingestion of member submissions.
+
+Every (member, platform) pair has a SubmissionCursor holding the highest
+submission id already accounted for. Platforms list submissions newest
+first, so a sync pages back only until it reaches the cursor, and a refresh
+of the whole club costs in proportion to the new activity.
+"""
+
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Problem, Submission, SubmissionCursor
+from platforms.client import PlatformError, get_client
+from problem.solved import ACCEPTED, add_solved
+
+
+logger = logging.getLogger(__name__)
+
+# Codeforces verdicts of submissions still being judged.
+PENDING_VERDICTS = {None, 'TESTING'}
+
+
+def fetch_codeforces_submissions(client, handle, after_id, page_size=100):
+    """
+    Yield a handle's Codeforces submissions newer than after_id, newest
+    first, as dicts.
+    """
+    url = client.platform_url('C', 'user.status')
+
+    for start in itertools.count(1, page_size):
+        response = client.get(
+            url,
+            params={'handle': handle, 'from': start, 'count': page_size},
+            cache=False
+        )
+        page = response.json()['result']
+
+        for submission in page:
+            if submission['id'] <= after_id:
+                return
+            problem = submission.get('problem', {})
+            yield {
+                'id': submission['id'],
+                'contest_id': str(problem.get('contestId', '')),
+                'index': problem.get('index', ''),
+                'verdict': submission.get('verdict'),
+                'language': submission.get('programmingLanguage', ''),
+                'submitted_at': datetime.fromtimestamp(
+                    submission['creationTimeSeconds'],
+                    dt_timezone.utc
+                ),
+            }
+
+        if len(page) < page_size:
+            return
+
+
+# Platforms with a public per-handle submission listing, mapped to the user
+# field holding the handle and the fetcher.
+FETCHERS = {
+    'C': ('codeforces_handle', fetch_codeforces_submissions),
+}
+
+
+def ingest_user(user, platform, client=None, page_size=100):
+    """
+    Store a member's new submissions on one platform.
+
+    Returns the number of submissions added.
+    """
+    cursor = get_cursor(user, platform)
+    rows = fetch_new(cursor, client or get_client(), page_size)
+    return apply(cursor, rows)
+
+
+def get_cursor(user, platform):
+    """
+    Return the cursor for a member's handle, reset if the handle changed.
+    """
+    handle = getattr(user, FETCHERS[platform][0])
+    cursor, _ = SubmissionCursor.objects.get_or_create(
+        user=user,
+        platform=platform,
+        defaults={'handle': handle}
+    )
+    if cursor.handle != handle:
+        cursor.handle, cursor.last_id = handle, 0
+    return cursor
+
+
+def fetch_new(cursor, client, page_size=100):
+    """
+    Return the submissions newer than the cursor. Does not touch the
+    database.
+    """
+    fetch = FETCHERS[cursor.platform][1]
+    return list(fetch(client, cursor.handle, cursor.last_id, page_size))
+
+
+def apply(cursor, rows):
+    """
+    Store fetched submissions and advance the cursor.
+    """
+    # Submissions still being judged are stored once they have a verdict,
+    # so the mark stops short of the oldest one.
+    pending = [row['id'] for row in rows if row['verdict'] in PENDING_VERDICTS]
+    final = [row for row in rows if row['verdict'] not in PENDING_VERDICTS]
+    if pending:
+        last_id = min(pending) - 1
+    elif rows:
+        last_id = max(row['id'] for row in rows)
+    else:
+        last_id = cursor.last_id
+
+    with transaction.atomic():
+        created = store(cursor.user_id, cursor.platform, final)
+        add_solved(cursor.user_id, {
+            submission.problem_id for submission in created
+            if submission.verdict == ACCEPTED and submission.problem_id
+        })
+        cursor.last_id = max(cursor.last_id, last_id)
+        cursor.synced_at = timezone.now()
+        cursor.save()
+
+    return len(created)
+
+
+def store(user_id, platform, rows):
+    """
+    Insert rows not stored yet, linked to catalog problems when known.
+
+    Returns the new submissions.
+    """
+    if not rows:
+        return []
+
+    known = set(Submission.objects.filter(
+        platform=platform,
+        external_id__in=[row['id'] for row in rows]
+    ).values_list('external_id', flat=True))
+    rows = [row for row in rows if row['id'] not in known]
+
+    keys = {(row['contest_id'], row['index']) for row in rows}
+    lookup = Q(pk__in=[])
+    for contest_id, index in keys:
+        lookup |= Q(contest_id=contest_id, index=index)
+    problems = {
+        (contest_id, index): problem_id
+        for problem_id, contest_id, index in Problem.objects.filter(
+            lookup,
+            platform=platform
+        ).values_list('id', 'contest_id', 'index')
+    } if keys else {}
+
+    return Submission.objects.bulk_create(
+        [
+            Submission(
+                user_id=user_id,
+                platform=platform,
+                external_id=row['id'],
+                problem_id=problems.get((row['contest_id'], row['index'])),
+                contest_id=row['contest_id'],
+                index=row['index'],
+                verdict=row['verdict'],
+                language=row['language'],
+                submitted_at=row['submitted_at'],
+            )
+            for row in rows
+        ],
+        batch_size=500,
+        ignore_conflicts=True
+    )
+
+
+def ingest_all(users=None, platforms=None, workers=None, client=None,
+               page_size=100):
+    """
+    Ingest new submissions for every member with a handle.
+
+    Handles are fetched on a bounded thread pool, while the platform client
+    still caps the requests in flight to each host. Results are written by
+    the calling thread as they arrive, so the database sees one writer and
+    the workers need no connections. Returns the number of submissions
+    added and a list of (handle, error) for failed handles.
+    """
+    if workers is None:
+        workers = getattr(settings, 'SUBMISSION_INGEST_WORKERS', 4)
+    if users is None:
+        users = get_user_model().objects.all()
+    client = client or get_client()
+
+    cursors = []
+    for platform in platforms or FETCHERS:
+        field = FETCHERS[platform][0]
+        cursors.extend(
+            get_cursor(user, platform)
+            for user in users.exclude(**{f'{field}__isnull': True})
+            .exclude(**{field: ''})
+        )
+
+    added, errors = 0, []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(fetch_new, cursor, client, page_size): cursor
+            for cursor in cursors
+        }
+        for future in as_completed(futures):
+            cursor = futures[future]
+            try:
+                added += apply(cursor, future.result())
+            except (PlatformError, KeyError, ValueError) as error:
+                logger.warning(
+                    'Submission sync failed for %s: %s',
+                    cursor.handle,
+                    error
+                )
+                errors.append((cursor.handle, str(error)))
+            except Exception as error:
+                # One malformed record must not abort the other handles.
+                logger.exception(
+                    'Submission sync failed for %s.',
+                    cursor.handle
+                )
+                errors.append((cursor.handle, repr(error)))
+
+    return added, errors
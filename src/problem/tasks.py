@@ -0,0 +1,22 @@
+"""
+Background tasks of the problem app, see core.tasks.
+"""
+
+from django.contrib.auth import get_user_model
+
+from core.tasks import task
+from problem.submissions import FETCHERS, ingest_user
+
+
+@task(priority=5)
+def ingest_member_submissions(user_id):
+    """
+    Ingest new submissions for each platform a member has a handle on.
+    """
+    user = get_user_model().objects.filter(id=user_id).first()
+    if user is None:
+        return
+
+    for platform, (field, _) in FETCHERS.items():
+        if getattr(user, field):
+            ingest_user(user, platform)
@@ -0,0 +1,160 @@
+"""
+Tests for the problemset importer.
+"""
+
+import json
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Problem, Tag
+from platforms.client import PlatformClient
+from platforms.tests.fake_upstream import FakeUpstream
+from problem.importer import ProblemImporter, fetch_codeforces_problems
+
+
+def problem(contest_id, index, rating=None, tags=()):
+    data = {
+        'contestId': contest_id,
+        'index': index,
+        'name': f'Problem {contest_id}{index}',
+        'type': 'PROGRAMMING',
+        'tags': list(tags),
+    }
+    if rating is not None:
+        data['rating'] = rating
+    return data
+
+
+class ProblemImportTests(TestCase):
+    """
+    Test importing the Codeforces problemset from a fake upstream.
+    """
+
+    def setUp(self):
+        self.upstream = FakeUpstream().start()
+        self.addCleanup(self.upstream.stop)
+
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.client = PlatformClient(cache_dir=cache_dir.name, retries=0)
+        self.addCleanup(self.client.close)
+
+        settings = override_settings(
+            PLATFORM_API_URLS={'C': self.upstream.url('/api/')}
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def serve(self, problems, etag=None):
+        self.upstream.route(
+            '/api/problemset.problems',
+            json.dumps({
+                'status': 'OK',
+                'result': {'problems': problems, 'problemStatistics': []},
+            }),
+            etag=etag,
+            headers={'Cache-Control': 'max-age=0'}
+        )
+
+    def run_import(self, batch_size=2):
+        importer = ProblemImporter('C', batch_size=batch_size)
+        return importer.run(fetch_codeforces_problems(self.client))
+
+    def test_import(self):
+        """
+        Test that problems and tags are created.
+        """
+        self.serve([
+            problem(1, 'A', 800, ['math']),
+            problem(1, 'B', 1200, ['dp', 'greedy']),
+            problem(2, 'A', tags=['dp']),
+            {'problemsetName': 'acmsguru', 'index': '100', 'name': 'A+B'},
+        ])
+
+        stats = self.run_import()
+
+        self.assertEqual(stats['created'], 3)
+        b = Problem.objects.get(platform='C', contest_id='1', index='B')
+        self.assertEqual(b.rating, 1200)
+        self.assertEqual(
+            sorted(b.tags.values_list('name', flat=True)),
+            ['dp', 'greedy']
+        )
+        self.assertIsNone(Problem.objects.get(contest_id='2').rating)
+        self.assertEqual(Tag.objects.count(), 3)
+
+    def test_reimport_unchanged_writes_nothing(self):
+        """
+        Test that importing the same problemset again issues no writes.
+        """
+        self.serve([
+            problem(1, 'A', 800, ['math']),
+            problem(1, 'B', 1200, ['dp']),
+            problem(2, 'A', 1500),
+        ])
+        self.run_import()
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = self.run_import()
+
+        writes = [
+            query['sql'] for query in queries
+            if query['sql'].split()[0] in ('INSERT', 'UPDATE', 'DELETE')
+        ]
+        self.assertEqual(writes, [])
+        self.assertEqual(stats['unchanged'], 3)
+
+    def test_reimport_applies_changes(self):
+        """
+        Test that renamed, re-rated and re-tagged problems are updated.
+        """
+        self.serve([problem(1, 'A', 800, ['math']), problem(1, 'B', 900)])
+        self.run_import()
+
+        changed = problem(1, 'A', 1000, ['math', 'brute force'])
+        changed['name'] = 'Renamed'
+        self.serve([changed, problem(1, 'B', 900)])
+        stats = self.run_import()
+
+        self.assertEqual(
+            (stats['created'], stats['updated'], stats['unchanged']),
+            (0, 1, 1)
+        )
+        a = Problem.objects.get(contest_id='1', index='A')
+        self.assertEqual((a.name, a.rating), ('Renamed', 1000))
+        self.assertEqual(
+            sorted(a.tags.values_list('name', flat=True)),
+            ['brute force', 'math']
+        )
+
+    def test_unchanged_upstream_is_revalidated(self):
+        """
+        Test that a 304 from upstream reuses the cached problemset.
+        """
+        self.serve([problem(1, 'A')], etag='"v1"')
+        self.run_import()
+        self.run_import()
+
+        self.assertEqual(
+            self.upstream.requests[-1]['headers'].get('If-None-Match'),
+            '"v1"'
+        )
+        self.assertEqual(Problem.objects.count(), 1)
+
+    def test_import_problems_command(self):
+        """
+        Test the import_problems management command.
+        """
+        self.serve([problem(1, 'A', 800)])
+        out = StringIO()
+
+        with patch('problem.importer.get_client', return_value=self.client):
+            call_command('import_problems', stdout=out)
+
+        self.assertIn('1 created', out.getvalue())
@@ -0,0 +1,118 @@
+"""
+Tests for the streaming JSON parser.
+"""
+
+import io
+import json
+import tracemalloc
+
+from django.test import SimpleTestCase
+
+from problem.parser import ParseError, iter_array
+
+
+def problemset(count):
+    """
+    Return a Codeforces style problemset document as bytes.
+    """
+    return json.dumps({
+        'status': 'OK',
+        'result': {
+            'problems': [
+                {
+                    'contestId': 1000 + i,
+                    'index': 'A',
+                    'name': f'Problème {i}',
+                    'rating': 800 + i % 28 * 100,
+                    'tags': ['dp', 'greedy'],
+                }
+                for i in range(count)
+            ],
+            'problemStatistics': [],
+        },
+    }).encode()
+
+
+class IterArrayTests(SimpleTestCase):
+    """
+    Test incremental parsing of arrays inside JSON documents.
+    """
+
+    def test_chunk_boundaries(self):
+        """
+        Test that elements split across chunks are parsed correctly.
+        """
+        document = problemset(5)
+
+        for chunk_size in (1, 7, 1024):
+            items = list(iter_array(
+                io.BytesIO(document),
+                ('result', 'problems'),
+                chunk_size=chunk_size
+            ))
+            self.assertEqual(
+                items,
+                json.loads(document)['result']['problems']
+            )
+
+    def test_numbers_at_chunk_end(self):
+        """
+        Test that numbers are not cut at a chunk boundary.
+        """
+        document = b'{"a": [12345, 678]}'
+
+        for chunk_size in range(1, len(document) + 1):
+            self.assertEqual(
+                list(iter_array(io.BytesIO(document), ['a'], chunk_size)),
+                [12345, 678]
+            )
+
+    def test_empty_array(self):
+        """
+        Test parsing an empty array.
+        """
+        document = io.BytesIO(b'{"result": {"problems": [ ]}}')
+
+        self.assertEqual(
+            list(iter_array(document, ('result', 'problems'))),
+            []
+        )
+
+    def test_missing_key(self):
+        """
+        Test that a document without the path raises ParseError.
+        """
+        document = io.BytesIO(
+            b'{"status": "FAILED", "comment": "Call limit exceeded"}'
+        )
+
+        with self.assertRaises(ParseError):
+            list(iter_array(document, ('result', 'problems')))
+
+    def test_truncated_document(self):
+        """
+        Test that a truncated document raises ParseError.
+        """
+        document = io.BytesIO(problemset(3)[:-40])
+
+        with self.assertRaises(ParseError):
+            list(iter_array(document, ('result', 'problems')))
+
+    def test_memory_bounded(self):
+        """
+        Test that peak memory does not grow with the document.
+        """
+        document = problemset(20000)
+
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in iter_array(
+                io.BytesIO(document),
+                ('result', 'problems')
+            ))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(count, 20000)
+        self.assertLess(peak, len(document) // 5)
@@ -0,0 +1,110 @@
+"""
+Tests for the problem API.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Problem, Tag
+
+
+PROBLEMS_URL = reverse('problem:problem-list')
+TAGS_URL = reverse('problem:tag-list')
+
+
+def create_problem(contest_id, index, rating=None, tags=()):
+    """
+    Helper function to create a problem with tags.
+    """
+    problem = Problem.objects.create(
+        platform='C',
+        contest_id=contest_id,
+        index=index,
+        name=f'Problem {contest_id}{index}',
+        rating=rating
+    )
+    problem.tags.set(
+        Tag.objects.get_or_create(name=tag)[0] for tag in tags
+    )
+    return problem
+
+
+class PublicProblemApiTests(TestCase):
+    """
+    Test the public problem API (unauthenticated).
+    """
+
+    def test_auth_required(self):
+        """
+        Test that authentication is required.
+        """
+        res = APIClient().get(PROBLEMS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateProblemApiTests(TestCase):
+    """
+    Test the private problem API (authenticated).
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(
+            'problems@example.com',
+            'testpass1234'
+        ))
+        self.easy_dp = create_problem('1', 'A', 800, ['dp'])
+        self.hard_dp = create_problem('1', 'B', 2000, ['dp', 'graphs'])
+        self.graphs = create_problem('2', 'A', 1400, ['graphs'])
+
+    def ids(self, res):
+        return [problem['id'] for problem in res.data['results']]
+
+    def test_list_problems(self):
+        """
+        Test listing problems with their tags.
+        """
+        res = self.client.get(PROBLEMS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 3)
+        self.assertEqual(res.data['results'][1]['tags'], ['dp', 'graphs'])
+
+    def test_filter_by_tags(self):
+        """
+        Test that every requested tag has to match.
+        """
+        res = self.client.get(PROBLEMS_URL, {'tags': 'dp'})
+        self.assertEqual(self.ids(res), [self.easy_dp.id, self.hard_dp.id])
+
+        res = self.client.get(PROBLEMS_URL, {'tags': 'dp,graphs'})
+        self.assertEqual(self.ids(res), [self.hard_dp.id])
+
+    def test_filter_by_rating(self):
+        """
+        Test filtering by a rating range.
+        """
+        res = self.client.get(
+            PROBLEMS_URL,
+            {'rating_min': 1000, 'rating_max': 2000}
+        )
+        self.assertEqual(self.ids(res), [self.hard_dp.id, self.graphs.id])
+
+        res = self.client.get(PROBLEMS_URL, {'rating_min': 'hard'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_tags(self):
+        """
+        Test listing tags with problem counts.
+        """
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(
+            [(tag['name'], tag['problem_count']) for tag in res.data],
+            [('dp', 2), ('graphs', 2)]
+        )
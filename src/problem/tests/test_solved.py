@@ -0,0 +1,201 @@
+"""
+Tests for solved-problem bitmaps and the analytics API.
+"""
+
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Problem, SolvedSet, Submission, Tag
+from problem import solved
+
+
+UNSOLVED_URL = reverse('problem:unsolved')
+OVERLAP_URL = reverse('problem:overlap')
+
+
+def create_problem(contest_id, index='A', rating=None, tags=()):
+    """
+    Helper function to create a problem with tags.
+    """
+    problem = Problem.objects.create(
+        platform='C',
+        contest_id=contest_id,
+        index=index,
+        name=f'Problem {contest_id}{index}',
+        rating=rating
+    )
+    problem.tags.set(
+        Tag.objects.get_or_create(name=tag)[0] for tag in tags
+    )
+    return problem
+
+
+class BitsTests(SimpleTestCase):
+    """
+    Test the bitmap helpers.
+    """
+
+    def test_round_trip(self):
+        """
+        Test converting ids to bitmaps, bytes and back.
+        """
+        ids = [0, 3, 8, 64, 9999]
+
+        bits = solved.to_bits(ids)
+
+        self.assertEqual(solved.from_bits(bits), ids)
+        self.assertEqual(bits.bit_count(), 5)
+        self.assertEqual(
+            solved.from_bytes(bytes(solved.to_bytes(bits))),
+            bits
+        )
+        self.assertEqual(solved.to_bits([]), 0)
+        self.assertEqual(solved.from_bytes(None), 0)
+
+
+class SolvedSetTests(TestCase):
+    """
+    Test maintaining solved sets.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'solver@example.com',
+            'testpass1234'
+        )
+
+    def test_add_solved(self):
+        """
+        Test that solved problems accumulate.
+        """
+        solved.add_solved(self.user.id, [1, 5])
+        solved.add_solved(self.user.id, [5, 7])
+
+        solved_set = SolvedSet.objects.get(user=self.user)
+        self.assertEqual(solved_set.count, 3)
+        self.assertEqual(solved.solved_sets.get(self.user.id),
+                         solved.to_bits([1, 5, 7]))
+
+    def test_rebuild_command_links_submissions(self):
+        """
+        Test rebuilding sets from submissions stored before the catalog.
+        """
+        for external_id, verdict in ((1, 'OK'), (2, 'WRONG_ANSWER')):
+            Submission.objects.create(
+                user=self.user,
+                platform='C',
+                external_id=external_id,
+                contest_id=str(external_id),
+                index='A',
+                verdict=verdict,
+                submitted_at=datetime.now(timezone.utc)
+            )
+        accepted = create_problem('1')
+        create_problem('2')
+
+        call_command('rebuild_solved_sets', stdout=StringIO())
+
+        self.assertEqual(
+            solved.from_bits(solved.solved_sets.get(self.user.id)),
+            [accepted.id]
+        )
+
+
+class SolvedAnalyticsApiTests(TestCase):
+    """
+    Test the analytics endpoints.
+    """
+
+    def setUp(self):
+        model = get_user_model()
+        self.alice = model.objects.create_user('a@example.com', 'pass12345')
+        self.bob = model.objects.create_user('b@example.com', 'pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+        self.dp_1700 = create_problem('1', rating=1700, tags=['dp'])
+        self.dp_2100 = create_problem('2', rating=2100, tags=['dp'])
+        self.graphs_1600 = create_problem('3', rating=1600, tags=['graphs'])
+        self.dp_1800 = create_problem('4', rating=1800, tags=['dp'])
+        self.math_800 = create_problem('5', rating=800, tags=['math'])
+
+        solved.add_solved(self.alice.id, [self.dp_1700.id, self.math_800.id])
+        solved.add_solved(self.bob.id, [self.math_800.id, self.graphs_1600.id])
+
+    def test_unsolved_by_club(self):
+        """
+        Test listing problems nobody has solved.
+        """
+        res = self.client.get(UNSOLVED_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 2)
+        self.assertEqual(
+            [problem['id'] for problem in res.data['results']],
+            [self.dp_2100.id, self.dp_1800.id]
+        )
+
+    def test_unsolved_filtered(self):
+        """
+        Test unsolved problems in a rating range with a tag.
+        """
+        res = self.client.get(UNSOLVED_URL, {
+            'tags': 'dp',
+            'rating_min': 1600,
+            'rating_max': 1900,
+        })
+
+        self.assertEqual(
+            [problem['id'] for problem in res.data['results']],
+            [self.dp_1800.id]
+        )
+
+    def test_unsolved_by_some_users(self):
+        """
+        Test restricting the question to some members.
+        """
+        res = self.client.get(UNSOLVED_URL, {'users': str(self.bob.id)})
+
+        self.assertEqual(res.data['count'], 3)
+
+    def test_overlap(self):
+        """
+        Test comparing two members.
+        """
+        res = self.client.get(
+            OVERLAP_URL,
+            {'users': f'{self.alice.id},{self.bob.id}'}
+        )
+
+        self.assertEqual(res.data['solved'], [2, 2])
+        self.assertEqual(res.data['only'], [1, 1])
+        self.assertEqual(res.data['common'], [self.math_800.id])
+
+        res = self.client.get(
+            OVERLAP_URL,
+            {'users': f'{self.alice.id},{self.bob.id}', 'tags': 'dp'}
+        )
+        self.assertEqual(res.data['solved'], [1, 0])
+
+    def test_overlap_requires_two_users(self):
+        """
+        Test that overlap needs exactly two different users.
+        """
+        alice, bob = self.alice.id, self.bob.id
+        for users in (
+            '',
+            str(alice),
+            f'{alice},x',
+            f'{alice},{alice}',
+            f'{alice},{bob},{bob}',
+        ):
+            res = self.client.get(OVERLAP_URL, {'users': users})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,261 @@
+"""
+Tests for incremental submission ingestion.
+"""
+
+import json
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from core.models import (
+    Problem,
+    SolvedSet,
+    Submission,
+    SubmissionCursor,
+)
+from platforms.client import PlatformClient
+from platforms.tests.fake_upstream import FakeUpstream
+from problem.submissions import ingest_all, ingest_user
+
+
+STATUS_PATH = '/api/user.status'
+
+
+class FakeCodeforcesMixin:
+    """
+    Serve user.status for handles in self.history from a fake upstream.
+    """
+
+    def setUp(self):
+        self.history = {}
+        self.upstream = FakeUpstream().start()
+        self.addCleanup(self.upstream.stop)
+        self.upstream.route(STATUS_PATH, self.user_status)
+
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.client = PlatformClient(cache_dir=cache_dir.name, retries=0)
+        self.addCleanup(self.client.close)
+
+        settings = override_settings(
+            PLATFORM_API_URLS={'C': self.upstream.url('/api/')}
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def user_status(self, query):
+        start = int(query['from'][0])
+        count = int(query['count'][0])
+        submissions = sorted(
+            self.history.get(query['handle'][0], []),
+            key=lambda submission: -submission['id']
+        )
+        return json.dumps({
+            'status': 'OK',
+            'result': submissions[start - 1:start - 1 + count],
+        })
+
+    def submit(self, handle, submission_id, verdict='OK', index='A'):
+        self.history.setdefault(handle, []).append({
+            'id': submission_id,
+            'contestId': 1,
+            'creationTimeSeconds': 1700000000 + submission_id,
+            'problem': {'contestId': 1, 'index': index, 'name': 'P'},
+            'programmingLanguage': 'C++17',
+            'verdict': verdict,
+        })
+
+    def status_requests(self):
+        return [
+            request for request in self.upstream.requests
+            if request['path'] == STATUS_PATH
+        ]
+
+
+class SubmissionIngestTests(FakeCodeforcesMixin, TestCase):
+    """
+    Test syncing one member's submissions.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(
+            'member@example.com',
+            'testpass1234',
+            codeforces_handle='tourist'
+        )
+
+    def test_first_sync(self):
+        """
+        Test that every submission is stored and linked to the catalog.
+        """
+        problem = Problem.objects.create(
+            platform='C',
+            contest_id='1',
+            index='A',
+            name='P'
+        )
+        for i in range(1, 6):
+            self.submit('tourist', i, index='A' if i % 2 else 'B')
+
+        added = ingest_user(self.user, 'C', self.client, page_size=2)
+
+        self.assertEqual(added, 5)
+        self.assertEqual(
+            Submission.objects.filter(problem=problem).count(),
+            3
+        )
+        cursor = SubmissionCursor.objects.get(user=self.user)
+        self.assertEqual(cursor.last_id, 5)
+        self.assertEqual(
+            SolvedSet.objects.get(user=self.user).count,
+            1
+        )
+
+    def test_incremental_sync(self):
+        """
+        Test that later syncs only page back to the high-water mark.
+        """
+        for i in range(1, 11):
+            self.submit('tourist', i)
+        ingest_user(self.user, 'C', self.client, page_size=3)
+        requests_before = len(self.status_requests())
+
+        self.submit('tourist', 11)
+        self.submit('tourist', 12)
+        added = ingest_user(self.user, 'C', self.client, page_size=3)
+
+        self.assertEqual(added, 2)
+        self.assertEqual(len(self.status_requests()) - requests_before, 1)
+        self.assertEqual(Submission.objects.count(), 12)
+
+    def test_pending_submissions_are_revisited(self):
+        """
+        Test that submissions being judged are stored once judged.
+        """
+        self.submit('tourist', 1)
+        self.submit('tourist', 2, verdict='TESTING')
+        self.submit('tourist', 3)
+
+        ingest_user(self.user, 'C', self.client)
+        self.assertEqual(
+            SubmissionCursor.objects.get(user=self.user).last_id,
+            1
+        )
+        self.assertEqual(Submission.objects.count(), 2)
+
+        self.history['tourist'][1]['verdict'] = 'WRONG_ANSWER'
+        added = ingest_user(self.user, 'C', self.client)
+
+        self.assertEqual(added, 1)
+        self.assertEqual(
+            Submission.objects.get(external_id=2).verdict,
+            'WRONG_ANSWER'
+        )
+        self.assertEqual(
+            SubmissionCursor.objects.get(user=self.user).last_id,
+            3
+        )
+
+    def test_handle_change_resets_cursor(self):
+        """
+        Test that a new handle is synced from the beginning.
+        """
+        self.submit('tourist', 5)
+        ingest_user(self.user, 'C', self.client)
+
+        self.submit('petr', 3)
+        self.user.codeforces_handle = 'petr'
+        added = ingest_user(self.user, 'C', self.client)
+
+        self.assertEqual(added, 1)
+        cursor = SubmissionCursor.objects.get(user=self.user)
+        self.assertEqual((cursor.handle, cursor.last_id), ('petr', 3))
+
+    def test_ingest_submissions_command(self):
+        """
+        Test the ingest_submissions command reports failures.
+        """
+        get_user_model().objects.create_user(
+            'other@example.com',
+            'testpass1234',
+            codeforces_handle='unknown'
+        )
+        self.upstream.route(
+            STATUS_PATH,
+            lambda query: self.user_status(query)
+            if query['handle'][0] == 'tourist' else '',
+            status=200
+        )
+        self.submit('tourist', 1)
+        out, err = StringIO(), StringIO()
+
+        with patch('problem.submissions.get_client',
+                   return_value=self.client):
+            call_command(
+                'ingest_submissions',
+                workers=1,
+                stdout=out,
+                stderr=err
+            )
+
+        self.assertIn('Added 1 submissions, 1 handles failed.',
+                      out.getvalue())
+        self.assertIn('unknown', err.getvalue())
+
+
+class ParallelSubmissionIngestTests(FakeCodeforcesMixin, TransactionTestCase):
+    """
+    Test syncing many members on a worker pool.
+    """
+
+    def test_ingest_all_parallel(self):
+        """
+        Test that every handle is synced once.
+        """
+        for i in range(6):
+            get_user_model().objects.create_user(
+                f'member{i}@example.com',
+                'testpass1234',
+                codeforces_handle=f'handle{i}'
+            )
+            for j in range(3):
+                self.submit(f'handle{i}', i * 10 + j + 1)
+        get_user_model().objects.create_user(
+            'nohandle@example.com',
+            'testpass1234'
+        )
+
+        added, errors = ingest_all(workers=3, client=self.client)
+
+        self.assertEqual((added, errors), (18, []))
+        self.assertEqual(SubmissionCursor.objects.count(), 6)
+        self.assertEqual(len(self.status_requests()), 6)
+
+    def test_ingest_all_skips_malformed_records(self):
+        """
+        Test that a handle with a malformed record fails alone.
+        """
+        for handle in ('good', 'bad'):
+            get_user_model().objects.create_user(
+                f'{handle}@example.com',
+                'testpass1234',
+                codeforces_handle=handle
+            )
+            self.submit(handle, 1 if handle == 'good' else 2)
+        self.history['bad'][0]['problem'] = None
+
+        with self.assertLogs('problem.submissions', 'ERROR'):
+            added, errors = ingest_all(workers=2, client=self.client)
+
+        self.assertEqual(added, 1)
+        self.assertEqual([handle for handle, _ in errors], ['bad'])
+        self.assertIn('AttributeError', errors[0][1])
+        self.assertEqual(
+            Submission.objects.get().user.codeforces_handle,
+            'good'
+        )
@@ -0,0 +1,26 @@
+"""
+URL mappings for the problem app.
+"""
+
+from django.urls import path, include
+
+from rest_framework.routers import DefaultRouter
+
+from problem import views
+
+
+router = DefaultRouter()
+router.register('problems', views.ProblemViewSet)
+router.register('tags', views.TagViewSet)
+
+app_name = 'problem'
+
+urlpatterns = [
+    path(
+        'unsolved/',
+        views.UnsolvedProblemsView.as_view(),
+        name='unsolved'
+    ),
+    path('overlap/', views.SolvedOverlapView.as_view(), name='overlap'),
+    path('', include(router.urls)),
+]
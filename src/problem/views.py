@@ -0,0 +1,220 @@
+"""
+Views for the problem API.
+"""
+
+from django.db.models import Count
+
+from drf_spectacular.utils import (
+    extend_schema_view,
+    extend_schema,
+    OpenApiParameter,
+    OpenApiTypes,
+)
+
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.authentication import TokenAuthentication
+from core.models import Problem, Tag
+from problem import serializers, solved
+
+
+FILTER_PARAMS = ('platform', 'tags', 'rating_min', 'rating_max')
+
+FILTER_PARAMETERS = [
+    OpenApiParameter(
+        'platform',
+        OpenApiTypes.STR,
+        description='Platform code, e.g. C for Codeforces.',
+    ),
+    OpenApiParameter(
+        'tags',
+        OpenApiTypes.STR,
+        description='Comma separated tags the problems must all have.',
+    ),
+    OpenApiParameter('rating_min', OpenApiTypes.INT),
+    OpenApiParameter('rating_max', OpenApiTypes.INT),
+]
+
+
+def filter_problems(queryset, params):
+    """
+    Apply the platform, tags and rating filters in params to queryset.
+    """
+    if params.get('platform'):
+        queryset = queryset.filter(platform=params['platform'])
+
+    for tag in params.get('tags', '').split(','):
+        if tag.strip():
+            queryset = queryset.filter(tags__name=tag.strip())
+
+    for param, lookup in (('rating_min', 'gte'), ('rating_max', 'lte')):
+        if params.get(param):
+            try:
+                rating = int(params[param])
+            except ValueError:
+                raise ValidationError({param: 'Enter a whole number.'})
+            queryset = queryset.filter(**{f'rating__{lookup}': rating})
+
+    return queryset
+
+
+def parse_ids(params, name):
+    """
+    Return the comma separated integers in params[name], or None.
+    """
+    if not params.get(name):
+        return None
+    try:
+        return [int(i) for i in params[name].split(',') if i.strip()]
+    except ValueError:
+        raise ValidationError({name: 'Enter comma separated ids.'})
+
+
+class ProblemPagination(PageNumberPagination):
+    """
+    Page number pagination for the problem catalog.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+@extend_schema_view(list=extend_schema(parameters=FILTER_PARAMETERS))
+class ProblemViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Browse the problem catalog.
+    """
+    serializer_class = serializers.ProblemSerializer
+    queryset = Problem.objects.all()
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = ProblemPagination
+    replica_reads = True
+
+    def get_queryset(self):
+        """
+        Retrieve problems matching the query filters.
+        """
+        return filter_problems(
+            self.queryset,
+            self.request.query_params
+        ).prefetch_related('tags').order_by('id')
+
+
+class TagViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    List problem tags with the number of problems for each.
+    """
+    serializer_class = serializers.TagSerializer
+    queryset = Tag.objects.annotate(
+        problem_count=Count('problems')
+    ).order_by('name')
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    replica_reads = True
+
+
+class SolvedAnalyticsView(APIView):
+    """
+    Base view for questions answered from the solved bitmaps.
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    replica_reads = True
+
+    def catalog_mask(self, params):
+        """
+        Return the bitmap of catalog problems matching the filters.
+        """
+        return solved.to_bits(filter_problems(
+            Problem.objects.all(),
+            params
+        ).values_list('id', flat=True))
+
+
+@extend_schema(
+    parameters=FILTER_PARAMETERS + [
+        OpenApiParameter(
+            'users',
+            OpenApiTypes.STR,
+            description='Comma separated user ids to consider instead of '
+                        'the whole club.',
+        ),
+        OpenApiParameter(
+            'limit',
+            OpenApiTypes.INT,
+            description='Maximum problems to return (default 100).',
+        ),
+    ]
+)
+class UnsolvedProblemsView(SolvedAnalyticsView):
+    """
+    List problems nobody in the club (or in `users`) has solved.
+    """
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            limit = min(int(params.get('limit', 100)), 1000)
+        except ValueError:
+            raise ValidationError({'limit': 'Enter a whole number.'})
+
+        solved_by_any = solved.solved_sets.union(parse_ids(params, 'users'))
+        ids = solved.from_bits(self.catalog_mask(params) & ~solved_by_any)
+
+        problems = Problem.objects.filter(
+            id__in=ids[:limit]
+        ).prefetch_related('tags').order_by('id')
+
+        return Response({
+            'count': len(ids),
+            'results': serializers.ProblemSerializer(
+                problems,
+                many=True
+            ).data,
+        })
+
+
+@extend_schema(
+    parameters=FILTER_PARAMETERS + [
+        OpenApiParameter(
+            'users',
+            OpenApiTypes.STR,
+            required=True,
+            description='The two user ids to compare, comma separated.',
+        ),
+    ]
+)
+class SolvedOverlapView(SolvedAnalyticsView):
+    """
+    Compare the problems solved by two members.
+    """
+
+    def get(self, request):
+        params = request.query_params
+        user_ids = parse_ids(params, 'users')
+        if (
+            not user_ids
+            or len(user_ids) != 2
+            or user_ids[0] == user_ids[1]
+        ):
+            raise ValidationError({'users': 'Enter two different user ids.'})
+
+        first, second = user_ids
+        a = solved.solved_sets.get(first)
+        b = solved.solved_sets.get(second)
+        if any(params.get(param) for param in FILTER_PARAMS):
+            catalog = self.catalog_mask(params)
+            a, b = a & catalog, b & catalog
+
+        return Response({
+            'users': [first, second],
+            'solved': [a.bit_count(), b.bit_count()],
+            'only': [(a & ~b).bit_count(), (b & ~a).bit_count()],
+            'common': solved.from_bits(a & b),
+        })
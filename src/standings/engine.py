@@ -0,0 +1,240 @@
+"""
+Incremental ICPC-style standings.
+
+Teams are ranked by problems solved, then by penalty time (the minutes
+into the contest of each accepted run, plus `penalty_minutes` per
+rejected run before it), then by the time of their last accepted run.
+Team names break the remaining ties so every team has its own rank.
+
+Runs are applied one at a time in the order they were recorded. A run only
+changes its own team's row, so the row is taken out of a RankTree and put
+back under its new key instead of re-sorting the board: each run costs
+O(log n) in the number of teams.
+
+Every change is also kept as a compact delta: the team's old and new rank,
+its totals and the cell of the problem the run was for. A client holding
+the board moves that one row and shifts the rows in between by one.
+
+`Standings` keeps two boards. The judges' board applies every run. The
+public board stops scoring runs made after `freeze_after` seconds and
+shows them as pending until the scoreboard is unfrozen.
+"""
+
+from bisect import bisect_right
+from collections import deque, namedtuple
+
+from core.models import ContestRun
+from standings.tree import RankTree
+
+
+Run = namedtuple('Run', 'id team problem verdict time')
+
+FIELDS = Run._fields
+
+# Compilation errors are free, like in most ICPC rule sets.
+UNPENALIZED = {ContestRun.COMPILATION_ERROR}
+
+
+class Cell:
+    """
+    A team's attempts at one problem.
+    """
+    __slots__ = ('tries', 'solved_at', 'pending')
+
+    def __init__(self):
+        self.tries = 0
+        self.solved_at = None
+        self.pending = 0
+
+    def as_dict(self):
+        cell = {'tries': self.tries, 'time': self.solved_at}
+        if self.pending:
+            cell['pending'] = self.pending
+        return cell
+
+
+class TeamRow:
+    """
+    A team's totals and cells.
+    """
+    __slots__ = ('name', 'cells', 'solved', 'penalty', 'last_solved_at')
+
+    def __init__(self, name):
+        self.name = name
+        self.cells = {}
+        self.solved = 0
+        self.penalty = 0
+        self.last_solved_at = 0
+
+    @property
+    def key(self):
+        return (-self.solved, self.penalty, self.last_solved_at, self.name)
+
+
+class Board:
+    """
+    One ranking with its recent deltas.
+    """
+
+    def __init__(self, penalty_minutes=20, log_size=1000):
+        self.penalty_minutes = penalty_minutes
+        self.teams = {}
+        self.tree = RankTree(seed=0)
+        self.version = 0
+        self.log = deque(maxlen=log_size)
+        # Version from which every later delta is still in the log.
+        self.log_floor = 0
+
+    def __len__(self):
+        return len(self.tree)
+
+    def score(self, run):
+        """
+        Apply a run to the ranking. Returns the delta, or None when the
+        run changes nothing, such as one after the problem was solved.
+        """
+        row, cell, joined = self.cell(run)
+        if cell.solved_at is not None or run.verdict in UNPENALIZED:
+            return self.unchanged(run, row, cell, joined)
+
+        old_rank = None if joined else self.tree.rank(row.key)
+        if run.verdict == ContestRun.ACCEPTED:
+            self.tree.remove(row.key)
+            cell.solved_at = run.time
+            row.solved += 1
+            row.penalty += run.time // 60 + cell.tries * self.penalty_minutes
+            row.last_solved_at = max(row.last_solved_at, run.time)
+            self.tree.add(row.key)
+        else:
+            cell.tries += 1
+        return self.record(run, row, cell, old_rank)
+
+    def hold(self, run):
+        """
+        Show a run made during the freeze as pending without scoring it.
+        """
+        row, cell, joined = self.cell(run)
+        if cell.solved_at is not None:
+            return self.unchanged(run, row, cell, joined)
+
+        old_rank = None if joined else self.tree.rank(row.key)
+        cell.pending += 1
+        return self.record(run, row, cell, old_rank)
+
+    def cell(self, run):
+        """
+        Return the team row and cell of a run, and whether the team has
+        just joined the board.
+        """
+        row = self.teams.get(run.team)
+        joined = row is None
+        if joined:
+            row = self.teams[run.team] = TeamRow(run.team)
+            self.tree.add(row.key)
+        cell = row.cells.get(run.problem)
+        if cell is None:
+            cell = row.cells[run.problem] = Cell()
+        return row, cell, joined
+
+    def unchanged(self, run, row, cell, joined):
+        """
+        Account for a run that does not change the ranking. Only a team
+        seen for the first time gets a delta.
+        """
+        if joined:
+            return self.record(run, row, cell, None)
+        self.version = run.id
+        return None
+
+    def record(self, run, row, cell, old_rank):
+        """
+        Log and return the delta of a run. old_rank is None for a team new
+        on the board.
+        """
+        delta = {
+            'version': run.id,
+            'team': row.name,
+            'from': None if old_rank is None else old_rank + 1,
+            'rank': self.tree.rank(row.key) + 1,
+            'solved': row.solved,
+            'penalty': row.penalty,
+            'problem': run.problem,
+            'cell': cell.as_dict(),
+        }
+
+        if len(self.log) == self.log.maxlen:
+            self.log_floor = self.log[0]['version']
+        self.log.append(delta)
+        self.version = run.id
+        return delta
+
+    def deltas_since(self, version):
+        """
+        Return the deltas after version, or None when some of them are no
+        longer kept and the client has to load the board again.
+        """
+        if not self.log_floor <= version <= self.version:
+            return None
+        versions = [delta['version'] for delta in self.log]
+        return list(self.log)[bisect_right(versions, version):]
+
+    def rows(self, offset=0, limit=None):
+        """
+        Return the rows ranked offset + 1 onwards.
+        """
+        stop = None if limit is None else offset + limit
+        return [
+            {
+                'rank': rank,
+                'team': key[-1],
+                'solved': -key[0],
+                'penalty': key[1],
+                'cells': {
+                    problem: cell.as_dict()
+                    for problem, cell in self.teams[key[-1]].cells.items()
+                },
+            }
+            for rank, key in enumerate(
+                self.tree.items(offset, stop),
+                start=offset + 1
+            )
+        ]
+
+
+class Standings:
+    """
+    The judges' and the public board of a contest.
+    """
+
+    def __init__(
+        self,
+        penalty_minutes=20,
+        freeze_after=None,
+        unfrozen=False,
+        log_size=1000
+    ):
+        self.freeze_after = freeze_after
+        self.unfrozen = unfrozen
+        self.judges = Board(penalty_minutes, log_size)
+        self.public = Board(penalty_minutes, log_size)
+
+    @property
+    def version(self):
+        return self.judges.version
+
+    @property
+    def frozen(self):
+        return self.freeze_after is not None and not self.unfrozen
+
+    def apply(self, run):
+        """
+        Apply a run to both boards and return their deltas.
+        """
+        judged = self.judges.score(run)
+        if self.frozen and run.time >= self.freeze_after:
+            return judged, self.public.hold(run)
+        return judged, self.public.score(run)
+
+    def extend(self, runs):
+        for run in runs:
+            self.apply(run)
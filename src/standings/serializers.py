@@ -0,0 +1,33 @@
+"""
+Serializers for the standings API View.
+"""
+
+from rest_framework import serializers
+
+from core.models import ContestRun
+
+
+class ContestRunSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a judged run.
+    """
+
+    class Meta:
+        model = ContestRun
+        fields = ['team', 'problem', 'verdict', 'time', 'external_id']
+        extra_kwargs = {'external_id': {'required': False}}
+
+
+class RecordRunsSerializer(serializers.Serializer):
+    """
+    Serializer for a batch of runs to record.
+    """
+    runs = ContestRunSerializer(many=True, allow_empty=False)
+
+    def validate_runs(self, runs):
+        limit = self.context.get('max_runs')
+        if limit and len(runs) > limit:
+            raise serializers.ValidationError(
+                f'At most {limit} runs can be recorded at once.'
+            )
+        return runs
@@ -0,0 +1,129 @@
+"""
+Standings kept in memory per process and caught up from the database.
+
+Runs are stored as ContestRun rows and the engine's version is the id of
+the last run applied, so each request only applies the runs recorded
+since, by any process, in one indexed query. Runs of a contest are stored
+under a lock on its Scoreboard row, so their ids follow commit order and
+a process never reads a run after a later one it has already applied.
+
+Changing the scoreboard's settings, such as unfreezing it, rebuilds the
+standings from every run.
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+from core.models import ContestRun, Scoreboard
+from standings.engine import FIELDS, Run, Standings
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class Entry:
+    """
+    Cached standings of a contest and the settings they were built with.
+    """
+
+    def __init__(self, scoreboard):
+        self.settings = settings_of(scoreboard)
+        self.standings = Standings(
+            penalty_minutes=scoreboard.penalty_minutes,
+            freeze_after=scoreboard.freeze_after,
+            unfrozen=scoreboard.unfrozen,
+            log_size=getattr(settings, 'STANDINGS_DELTA_LOG_SIZE', 1000)
+        )
+        self.lock = threading.Lock()
+
+
+def settings_of(scoreboard):
+    return (
+        scoreboard.penalty_minutes,
+        scoreboard.freeze_after,
+        scoreboard.unfrozen,
+    )
+
+
+def get_scoreboard(contest):
+    """
+    Return the contest's scoreboard, created on first use.
+
+    A new scoreboard freezes STANDINGS_FREEZE_MINUTES before the contest
+    ends, if the contest is longer than that.
+    """
+    freeze_after = None
+    freeze = getattr(settings, 'STANDINGS_FREEZE_MINUTES', 60) * 60
+    if freeze and contest.start_time and contest.end_time:
+        duration = (contest.end_time - contest.start_time).total_seconds()
+        if duration > freeze:
+            freeze_after = int(duration - freeze)
+
+    penalty = getattr(settings, 'STANDINGS_PENALTY_MINUTES', 20)
+    scoreboard, _ = Scoreboard.objects.get_or_create(
+        contest=contest,
+        defaults={'penalty_minutes': penalty, 'freeze_after': freeze_after}
+    )
+    return scoreboard
+
+
+@contextmanager
+def locked_standings(scoreboard):
+    """
+    Yield the up to date standings of a scoreboard's contest, locked
+    against concurrent updates from other threads.
+    """
+    with _cache_lock:
+        entry = _cache.get(scoreboard.contest_id)
+        if entry is None or entry.settings != settings_of(scoreboard):
+            entry = _cache[scoreboard.contest_id] = Entry(scoreboard)
+        _cache.move_to_end(scoreboard.contest_id)
+        while len(_cache) > getattr(settings, 'STANDINGS_CACHE_SIZE', 16):
+            _cache.popitem(last=False)
+
+    with entry.lock:
+        runs = ContestRun.objects.filter(
+            contest_id=scoreboard.contest_id,
+            id__gt=entry.standings.version
+        ).order_by('id').values_list(*FIELDS)
+        entry.standings.extend(map(Run._make, runs.iterator(chunk_size=2000)))
+        yield entry.standings
+
+
+def record_runs(scoreboard, runs):
+    """
+    Store runs, given as dicts of ContestRun fields, for a scoreboard's
+    contest. Runs with an external id that was already stored are skipped.
+
+    Returns the stored runs.
+    """
+    with transaction.atomic():
+        Scoreboard.objects.select_for_update().filter(pk=scoreboard.pk).get()
+
+        seen = set(ContestRun.objects.filter(
+            contest_id=scoreboard.contest_id,
+            external_id__in=[
+                run['external_id'] for run in runs if run.get('external_id')
+            ]
+        ).values_list('external_id', flat=True))
+
+        new = []
+        for run in runs:
+            external_id = run.get('external_id', '')
+            if external_id:
+                if external_id in seen:
+                    continue
+                seen.add(external_id)
+            new.append(ContestRun(contest_id=scoreboard.contest_id, **run))
+
+        return ContestRun.objects.bulk_create(new, batch_size=1000)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
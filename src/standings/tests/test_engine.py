@@ -0,0 +1,176 @@
+"""
+Tests for the standings engine.
+"""
+
+import random
+
+from django.test import SimpleTestCase
+
+from standings.engine import Board, Run, Standings
+
+
+def runs(*events):
+    return [Run(i, *event) for i, event in enumerate(events, 1)]
+
+
+class BoardTests(SimpleTestCase):
+    """
+    Test ICPC scoring and ranking.
+    """
+
+    def test_scoring(self):
+        """Test penalties for rejected runs and free compilation errors."""
+        board = Board(penalty_minutes=20)
+        for run in runs(
+            ('red', 'A', 'WA', 300),
+            ('red', 'A', 'CE', 400),
+            ('red', 'A', 'AC', 600),
+            ('red', 'A', 'WA', 700),
+            ('blue', 'B', 'AC', 1800),
+        ):
+            board.score(run)
+
+        rows = board.rows()
+        self.assertEqual([row['team'] for row in rows], ['red', 'blue'])
+        self.assertEqual(rows[0]['solved'], 1)
+        self.assertEqual(rows[0]['penalty'], 10 + 20)
+        self.assertEqual(rows[0]['cells']['A'], {'tries': 1, 'time': 600})
+        self.assertEqual(rows[1]['penalty'], 30)
+
+    def test_ties_break_on_last_accepted_run(self):
+        """Test equal penalties rank the earlier last solve first."""
+        board = Board()
+        for run in runs(
+            ('red', 'A', 'AC', 600),
+            ('red', 'B', 'AC', 3000),
+            ('blue', 'A', 'AC', 1200),
+            ('blue', 'B', 'AC', 2400),
+        ):
+            board.score(run)
+
+        self.assertEqual(
+            [(row['team'], row['penalty']) for row in board.rows()],
+            [('blue', 60), ('red', 60)]
+        )
+
+    def test_deltas(self):
+        """Test deltas give the old and new rank of the changed team."""
+        board = Board()
+        first, second, third, fourth = runs(
+            ('red', 'A', 'WA', 60),
+            ('blue', 'A', 'WA', 120),
+            ('blue', 'A', 'AC', 180),
+            ('blue', 'A', 'WA', 240),
+        )
+        self.assertEqual(board.score(first)['from'], None)
+        board.score(second)
+        delta = board.score(third)
+
+        self.assertEqual(delta, {
+            'version': 3,
+            'team': 'blue',
+            'from': 1,
+            'rank': 1,
+            'solved': 1,
+            'penalty': 23,
+            'problem': 'A',
+            'cell': {'tries': 1, 'time': 180},
+        })
+        self.assertEqual(board.rows()[1]['team'], 'red')
+        self.assertIsNone(board.score(fourth))
+        self.assertEqual(board.version, 4)
+        self.assertEqual(
+            [delta['version'] for delta in board.deltas_since(1)],
+            [2, 3]
+        )
+        self.assertEqual(board.deltas_since(4), [])
+
+    def test_overtake_moves_row(self):
+        """Test a team passing others reports both ranks."""
+        board = Board()
+        for run in runs(
+            ('red', 'A', 'AC', 60),
+            ('green', 'A', 'AC', 120),
+            ('blue', 'B', 'WA', 30),
+        ):
+            board.score(run)
+
+        delta = board.score(Run(4, 'blue', 'A', 'AC', 90))
+        self.assertEqual((delta['from'], delta['rank']), (3, 2))
+
+    def test_deltas_since_evicted_version(self):
+        """Test clients too far behind are told to reload."""
+        board = Board(log_size=2)
+        for run in runs(*[(f'team{i}', 'A', 'WA', i) for i in range(5)]):
+            board.score(run)
+
+        self.assertIsNone(board.deltas_since(1))
+        self.assertEqual(len(board.deltas_since(3)), 2)
+        self.assertIsNone(board.deltas_since(9))
+
+    def test_random_contest_matches_full_sort(self):
+        """Test the incremental ranking equals sorting every team."""
+        rng = random.Random(0)
+        board = Board()
+        for i in range(3000):
+            board.score(Run(
+                i + 1,
+                f'team{rng.randrange(80)}',
+                rng.choice('ABCDEF'),
+                rng.choice(['AC', 'WA', 'WA', 'TLE', 'CE']),
+                i * 2
+            ))
+
+        expected = sorted(
+            board.teams.values(),
+            key=lambda row: (-row.solved, row.penalty, row.last_solved_at,
+                             row.name)
+        )
+        self.assertEqual(
+            [row['team'] for row in board.rows()],
+            [row.name for row in expected]
+        )
+        self.assertEqual(
+            [row['team'] for row in board.rows(20, 10)],
+            [row.name for row in expected[20:30]]
+        )
+
+
+class StandingsTests(SimpleTestCase):
+    """
+    Test the frozen public board.
+    """
+
+    def setUp(self):
+        self.runs = runs(
+            ('red', 'A', 'AC', 600),
+            ('blue', 'A', 'WA', 3700),
+            ('blue', 'A', 'AC', 3800),
+            ('blue', 'B', 'AC', 3900),
+        )
+
+    def test_freeze_hides_late_runs(self):
+        """Test runs after the freeze are pending on the public board."""
+        standings = Standings(freeze_after=3600)
+        standings.extend(self.runs)
+
+        public = standings.public.rows()
+        self.assertEqual([row['team'] for row in public], ['red', 'blue'])
+        self.assertEqual(
+            public[1]['cells'],
+            {
+                'A': {'tries': 0, 'time': None, 'pending': 2},
+                'B': {'tries': 0, 'time': None, 'pending': 1},
+            }
+        )
+        judges = standings.judges.rows()
+        self.assertEqual([row['team'] for row in judges], ['blue', 'red'])
+        self.assertEqual(standings.public.version, 4)
+
+    def test_unfrozen_scores_everything(self):
+        """Test an unfrozen scoreboard shows the judges' ranking."""
+        standings = Standings(freeze_after=3600, unfrozen=True)
+        standings.extend(self.runs)
+
+        self.assertFalse(standings.frozen)
+        self.assertEqual(standings.public.rows(), standings.judges.rows())
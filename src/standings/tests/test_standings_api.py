@@ -0,0 +1,234 @@
+"""
+Tests for the standings API.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Contest, ContestRun, Scoreboard
+from standings import store
+
+
+START = datetime(2024, 5, 1, 15, tzinfo=timezone.utc)
+
+
+def standings_url(contest_id):
+    return reverse('standings:standings', args=[contest_id])
+
+
+def runs_url(contest_id):
+    return reverse('standings:runs', args=[contest_id])
+
+
+def unfreeze_url(contest_id):
+    return reverse('standings:unfreeze', args=[contest_id])
+
+
+def create_contest(platform='V', **params):
+    defaults = {
+        'name': 'Club contest',
+        'url': 'https://vjudge.net/contest/1',
+        'platform': platform,
+        'platform_id': '1',
+        'start_time': START,
+        'end_time': START + timedelta(hours=5),
+    }
+    defaults.update(params)
+    return Contest.objects.create(**defaults)
+
+
+class StandingsApiTests(TestCase):
+    """
+    Test reading and feeding the standings of a club contest.
+    """
+
+    def setUp(self):
+        store.clear_cache()
+        self.contest = create_contest()
+        self.staff = get_user_model().objects.create_user(
+            email='staff@example.com',
+            password='testpass123',
+            name='Staff',
+            is_staff=True
+        )
+        self.client = APIClient()
+        self.staff_client = APIClient()
+        self.staff_client.force_authenticate(self.staff)
+
+    def record(self, *runs):
+        return self.staff_client.post(
+            runs_url(self.contest.id),
+            {
+                'runs': [
+                    dict(zip(['team', 'problem', 'verdict', 'time'], run))
+                    for run in runs
+                ]
+            },
+            format='json'
+        )
+
+    def test_default_scoreboard_freezes_last_hour(self):
+        """Test a new scoreboard freezes an hour before the end."""
+        self.client.get(standings_url(self.contest.id))
+
+        scoreboard = Scoreboard.objects.get(contest=self.contest)
+        self.assertEqual(scoreboard.freeze_after, 4 * 3600)
+        self.assertEqual(scoreboard.penalty_minutes, 20)
+
+    def test_record_and_read(self):
+        """Test recorded runs are ranked on the next read."""
+        res = self.record(
+            ('red', 'A', 'WA', 60),
+            ('red', 'A', 'AC', 120),
+            ('blue', 'A', 'AC', 600),
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['recorded'], 3)
+
+        res = self.client.get(standings_url(self.contest.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['teams'], 2)
+        self.assertTrue(res.data['frozen'])
+        self.assertEqual(
+            [(row['team'], row['penalty']) for row in res.data['rows']],
+            [('blue', 10), ('red', 22)]
+        )
+
+    def test_cursor_returns_deltas(self):
+        """Test the cursor of a response yields only later changes."""
+        self.record(('red', 'A', 'AC', 60))
+        cursor = self.client.get(standings_url(self.contest.id)).data['cursor']
+        self.record(('blue', 'A', 'AC', 30), ('red', 'B', 'WA', 90))
+
+        res = self.client.get(standings_url(self.contest.id), {
+            'cursor': cursor
+        })
+
+        self.assertNotIn('rows', res.data)
+        self.assertEqual(
+            [(delta['team'], delta['from'], delta['rank'])
+             for delta in res.data['deltas']],
+            [('blue', None, 1), ('red', 2, 2)]
+        )
+        res = self.client.get(standings_url(self.contest.id), {
+            'cursor': res.data['cursor']
+        })
+        self.assertEqual(res.data['deltas'], [])
+
+    def test_invalid_cursor_returns_rows(self):
+        """Test a cursor that cannot be resumed gets the full board."""
+        self.record(('red', 'A', 'AC', 60))
+
+        res = self.client.get(standings_url(self.contest.id), {
+            'cursor': '1.bad'
+        })
+
+        self.assertEqual(len(res.data['rows']), 1)
+
+    def test_freeze_and_unfreeze(self):
+        """Test late runs stay pending until the scoreboard is unfrozen."""
+        self.record(
+            ('red', 'A', 'AC', 600),
+            ('blue', 'A', 'AC', 4 * 3600 + 60),
+            ('blue', 'B', 'AC', 4 * 3600 + 120),
+        )
+        res = self.client.get(standings_url(self.contest.id))
+        self.assertEqual(res.data['rows'][0]['team'], 'red')
+        self.assertEqual(res.data['rows'][1]['cells']['B']['pending'], 1)
+        cursor = res.data['cursor']
+
+        res = self.staff_client.get(
+            standings_url(self.contest.id),
+            {'view': 'judges'}
+        )
+        self.assertFalse(res.data['frozen'])
+        self.assertEqual(res.data['rows'][0]['team'], 'blue')
+
+        res = self.staff_client.post(unfreeze_url(self.contest.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(standings_url(self.contest.id), {
+            'cursor': cursor
+        })
+        self.assertFalse(res.data['frozen'])
+        self.assertEqual(res.data['rows'][0]['team'], 'blue')
+
+    def test_judges_view_requires_staff(self):
+        """Test only staff can bypass the freeze."""
+        res = self.client.get(
+            standings_url(self.contest.id),
+            {'view': 'judges'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_external_ids_deduplicated(self):
+        """Test runs resent by a mirror are stored once."""
+        runs = [
+            {'team': 'red', 'problem': 'A', 'verdict': 'WA', 'time': 60,
+             'external_id': '100'},
+            {'team': 'red', 'problem': 'A', 'verdict': 'AC', 'time': 90,
+             'external_id': '101'},
+        ]
+        self.staff_client.post(
+            runs_url(self.contest.id),
+            {'runs': runs[:1]},
+            format='json'
+        )
+
+        res = self.staff_client.post(
+            runs_url(self.contest.id),
+            {'runs': runs + runs},
+            format='json'
+        )
+
+        self.assertEqual(res.data['recorded'], 1)
+        self.assertEqual(ContestRun.objects.count(), 2)
+
+    def test_record_requires_staff(self):
+        """Test members cannot record runs."""
+        res = self.client.post(
+            runs_url(self.contest.id),
+            {'runs': [{'team': 'red', 'problem': 'A', 'verdict': 'AC',
+                       'time': 60}]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(ContestRun.objects.exists())
+
+    def test_invalid_verdict_rejected(self):
+        """Test runs with an unknown verdict are rejected."""
+        res = self.record(('red', 'A', 'OK', 60))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_platforms_not_found(self):
+        """Test standings are only kept for Vjudge contests."""
+        contest = create_contest(platform='C', platform_id='2')
+
+        res = self.client.get(standings_url(contest.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_pagination(self):
+        """Test offset and limit select a page of rows."""
+        self.record(*[(f'team{i}', 'A', 'AC', 60 * (i + 1)) for i in range(5)])
+
+        res = self.client.get(standings_url(self.contest.id), {
+            'offset': 2,
+            'limit': 2
+        })
+
+        self.assertEqual(res.data['teams'], 5)
+        self.assertEqual(
+            [(row['rank'], row['team']) for row in res.data['rows']],
+            [(3, 'team2'), (4, 'team3')]
+        )
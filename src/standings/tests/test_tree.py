@@ -0,0 +1,61 @@
+"""
+Tests for the rank tree.
+"""
+
+import random
+
+from django.test import SimpleTestCase
+
+from standings.tree import RankTree
+
+
+class RankTreeTests(SimpleTestCase):
+    """
+    Test the order statistics against a sorted list.
+    """
+
+    def test_matches_sorted_list(self):
+        """Test random inserts and removals keep ranks and order."""
+        rng = random.Random(1)
+        tree = RankTree(seed=2)
+        keys = []
+        for _ in range(2000):
+            if keys and rng.random() < 0.4:
+                key = keys.pop(rng.randrange(len(keys)))
+                tree.remove(key)
+            else:
+                key = (rng.randrange(10), rng.random())
+                keys.append(key)
+                tree.add(key)
+        keys.sort()
+
+        self.assertEqual(len(tree), len(keys))
+        self.assertEqual(list(tree), keys)
+        for index in range(0, len(keys), 37):
+            self.assertEqual(tree.at(index), keys[index])
+            self.assertEqual(tree.rank(keys[index]), index)
+            self.assertEqual(
+                list(tree.items(index, index + 5)),
+                keys[index:index + 5]
+            )
+
+    def test_rank_of_missing_key(self):
+        """Test rank counts the keys below one not in the tree."""
+        tree = RankTree()
+        for key in (10, 20, 30):
+            tree.add(key)
+
+        self.assertEqual(tree.rank(5), 0)
+        self.assertEqual(tree.rank(25), 2)
+        self.assertEqual(tree.rank(35), 3)
+
+    def test_errors(self):
+        """Test removing a missing key and indexing past the end."""
+        tree = RankTree()
+        tree.add(1)
+
+        with self.assertRaises(KeyError):
+            tree.remove(2)
+        with self.assertRaises(IndexError):
+            tree.at(1)
+        self.assertEqual(list(tree.items(1, 5)), [])
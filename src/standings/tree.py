@@ -0,0 +1,181 @@
+"""
+Ordered set with rank queries, backing the standings ranking.
+
+A treap (a binary search tree kept balanced in expectation by random
+heap priorities) whose nodes count their subtree, so inserting, removing
+and ranking a key, and finding the key at a rank, all take O(log n).
+"""
+
+import random
+
+
+class Node:
+    __slots__ = ('key', 'priority', 'left', 'right', 'size')
+
+    def __init__(self, key, priority):
+        self.key = key
+        self.priority = priority
+        self.left = None
+        self.right = None
+        self.size = 1
+
+
+def _size(node):
+    return node.size if node is not None else 0
+
+
+def _update(node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+
+
+def _split(node, key):
+    """
+    Split a subtree into the keys below key and the rest.
+    """
+    if node is None:
+        return None, None
+    if node.key < key:
+        below, rest = _split(node.right, key)
+        node.right = below
+        _update(node)
+        return node, rest
+    below, rest = _split(node.left, key)
+    node.left = rest
+    _update(node)
+    return below, node
+
+
+def _merge(left, right):
+    """
+    Join two subtrees whose keys are all ordered left before right.
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+def _insert(node, new):
+    if node is None:
+        return new
+    if new.priority > node.priority:
+        new.left, new.right = _split(node, new.key)
+        _update(new)
+        return new
+    if new.key < node.key:
+        node.left = _insert(node.left, new)
+    else:
+        node.right = _insert(node.right, new)
+    node.size += 1
+    return node
+
+
+def _remove(node, key):
+    if node is None:
+        raise KeyError(key)
+    if key == node.key:
+        return _merge(node.left, node.right)
+    if key < node.key:
+        node.left = _remove(node.left, key)
+    else:
+        node.right = _remove(node.right, key)
+    node.size -= 1
+    return node
+
+
+class RankTree:
+    """
+    Set of distinct, mutually comparable keys in sorted order.
+    """
+
+    def __init__(self, seed=None):
+        self.root = None
+        self._random = random.Random(seed)
+
+    def __len__(self):
+        return _size(self.root)
+
+    def __iter__(self):
+        return self.items()
+
+    def add(self, key):
+        self.root = _insert(self.root, Node(key, self._random.random()))
+
+    def remove(self, key):
+        """
+        Remove key, raising KeyError if it is not in the set.
+        """
+        self.root = _remove(self.root, key)
+
+    def rank(self, key):
+        """
+        Return the number of keys below key.
+        """
+        node = self.root
+        below = 0
+        while node is not None:
+            if node.key < key:
+                below += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return below
+
+    def at(self, index):
+        """
+        Return the key with index keys below it.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        node = self.root
+        while True:
+            left = _size(node.left)
+            if index < left:
+                node = node.left
+            elif index == left:
+                return node.key
+            else:
+                index -= left + 1
+                node = node.right
+
+    def items(self, start=0, stop=None):
+        """
+        Yield the keys ranked start to stop (exclusive) in order.
+
+        Reaching the first key takes O(log n), each further key O(1)
+        amortized, so a page costs its length plus one descent.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+
+        # Descend to the first key, keeping the ancestors still to come.
+        path = []
+        node = self.root
+        index = start
+        while node is not None:
+            left = _size(node.left)
+            if index < left:
+                path.append(node)
+                node = node.left
+            elif index == left:
+                path.append(node)
+                break
+            else:
+                index -= left + 1
+                node = node.right
+
+        for _ in range(stop - start):
+            node = path.pop()
+            yield node.key
+            node = node.right
+            while node is not None:
+                path.append(node)
+                node = node.left
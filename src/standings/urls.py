@@ -0,0 +1,28 @@
+"""
+URL mappings for the standings app.
+"""
+
+from django.urls import path
+
+from standings import views
+
+
+app_name = 'standings'
+
+urlpatterns = [
+    path(
+        '<int:contest_id>/',
+        views.StandingsView.as_view(),
+        name='standings'
+    ),
+    path(
+        '<int:contest_id>/runs/',
+        views.RunsView.as_view(),
+        name='runs'
+    ),
+    path(
+        '<int:contest_id>/unfreeze/',
+        views.UnfreezeView.as_view(),
+        name='unfreeze'
+    ),
+]
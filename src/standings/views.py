@@ -0,0 +1,182 @@
+"""
+Views for the standings API.
+"""
+
+import zlib
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+
+from drf_spectacular.utils import (
+    extend_schema,
+    OpenApiParameter,
+    OpenApiTypes,
+)
+
+from rest_framework import permissions, status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core import authentication
+from core.models import Contest
+from standings import store
+from standings.serializers import RecordRunsSerializer
+
+
+MAX_PAGE_SIZE = 1000
+
+
+def get_contest(contest_id):
+    """
+    Return a contest standings are kept for: club contests hosted on, or
+    mirrored from, Vjudge.
+    """
+    return get_object_or_404(Contest, pk=contest_id, platform='V')
+
+
+def cursor_of(scoreboard, version):
+    """
+    Return the cursor of a board at version. Cursors taken before a change
+    of the scoreboard's settings no longer match, so clients reload.
+    """
+    checksum = zlib.crc32(repr(store.settings_of(scoreboard)).encode())
+    return f'{version}.{checksum:x}'
+
+
+def version_of(scoreboard, cursor):
+    """
+    Return the version a cursor was taken at, or None if it is invalid or
+    out of date.
+    """
+    version, _, _ = cursor.partition('.')
+    if not version.isdigit() or cursor != cursor_of(scoreboard, version):
+        return None
+    return int(version)
+
+
+def query_int(request, name, default, maximum):
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValidationError({name: 'Expected an integer.'})
+    if not 0 <= value <= maximum:
+        raise ValidationError({name: f'Expected 0 to {maximum}.'})
+    return value
+
+
+class StandingsView(APIView):
+    """
+    Ranking of a club contest.
+
+    Without a cursor, or with one too old to catch up from, the response
+    has a page of rows. With the cursor of the previous response, it has
+    only the changes since. Each change gives a team's rank before
+    (`from`, null for a team new on the board) and after, so the client
+    moves that row and shifts the ones in between.
+    """
+    authentication_classes = [authentication.TokenAuthentication]
+
+    @extend_schema(parameters=[
+        OpenApiParameter(
+            'cursor',
+            OpenApiTypes.STR,
+            description='Cursor of the last response, to receive only the '
+                        'changes since.',
+        ),
+        OpenApiParameter('offset', OpenApiTypes.INT),
+        OpenApiParameter('limit', OpenApiTypes.INT),
+        OpenApiParameter(
+            'view',
+            OpenApiTypes.STR,
+            enum=['public', 'judges'],
+            description='`judges` (staff only) ignores the freeze.',
+        ),
+    ])
+    def get(self, request, contest_id):
+        view = request.query_params.get('view', 'public')
+        if view not in ('public', 'judges'):
+            raise ValidationError({'view': 'Expected public or judges.'})
+        if view == 'judges' and not request.user.is_staff:
+            raise PermissionDenied('Only staff can see the judges\' view.')
+
+        offset = query_int(request, 'offset', 0, 10 ** 6)
+        limit = query_int(
+            request,
+            'limit',
+            getattr(settings, 'STANDINGS_PAGE_SIZE', 200),
+            MAX_PAGE_SIZE
+        )
+
+        scoreboard = store.get_scoreboard(get_contest(contest_id))
+        with store.locked_standings(scoreboard) as standings:
+            board = standings.judges if view == 'judges' else standings.public
+            data = {
+                'cursor': cursor_of(scoreboard, board.version),
+                'frozen': view == 'public' and standings.frozen,
+            }
+
+            since = request.query_params.get('cursor')
+            deltas = None
+            if since is not None:
+                version = version_of(scoreboard, since)
+                if version is not None:
+                    deltas = board.deltas_since(version)
+
+            if deltas is not None:
+                data['deltas'] = deltas
+            else:
+                data['teams'] = len(board)
+                data['rows'] = board.rows(offset, limit)
+
+        return Response(data)
+
+
+class RunsView(APIView):
+    """
+    Record judged runs of a club contest (staff only).
+
+    Runs are stored in one transaction and scored when the standings are
+    next read. Runs with an `external_id` already stored are skipped, so
+    a mirror can resend overlapping batches.
+    """
+    authentication_classes = [authentication.TokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(request=RecordRunsSerializer)
+    def post(self, request, contest_id):
+        serializer = RecordRunsSerializer(
+            data=request.data,
+            context={
+                'max_runs': getattr(settings, 'STANDINGS_MAX_RUNS', 5000),
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+
+        scoreboard = store.get_scoreboard(get_contest(contest_id))
+        recorded = store.record_runs(
+            scoreboard,
+            serializer.validated_data['runs']
+        )
+        return Response(
+            {'recorded': len(recorded)},
+            status=status.HTTP_201_CREATED
+        )
+
+
+class UnfreezeView(APIView):
+    """
+    Reveal the runs hidden by the freeze (staff only).
+    """
+    authentication_classes = [authentication.TokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(request=None)
+    def post(self, request, contest_id):
+        scoreboard = store.get_scoreboard(get_contest(contest_id))
+        scoreboard.unfrozen = True
+        scoreboard.save(update_fields=['unfrozen'])
+        return Response({'frozen': False})
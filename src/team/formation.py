@@ -0,0 +1,562 @@
+"""
+Balanced team formation.
+
+Members are split into teams of `team_size` (a few teams one short when the
+count does not divide evenly) so that the variance of team strength, the
+mean rating of the team, is as small as possible. Must-pair groups end up
+in the same team and must-separate pairs in different teams.
+
+The optimizer starts from a greedy assignment and improves it by swapping
+members between teams. A swap only changes two team means, so its effect
+on the variance is computed in O(1) from running sums of the means and
+their squares, and its effect on the constraints from the two members'
+constraint lists. Thousands of members are balanced in well under a second
+without an array library.
+"""
+
+import bisect
+import heapq
+import itertools
+import math
+import random
+import time
+from dataclasses import dataclass
+
+
+# Improvements smaller than this are treated as rounding noise.
+EPSILON = 1e-9
+
+# Members around each rating target scored by a targeted sweep, and the
+# relative gain under which targeted sweeps stop.
+WINDOW = 4
+CONVERGED = 0.05
+
+# Up to this many teams every pair of teams is searched, and the search
+# continues with random restarts until KICKS in a row fail to improve.
+EXHAUSTIVE_TEAMS = 40
+KICKS = 200
+
+
+class FormationError(ValueError):
+    """
+    The members or constraints cannot form valid teams.
+    """
+
+
+@dataclass
+class Formation:
+    """
+    Result of a team formation: teams of member ids and their strengths.
+    """
+    teams: list
+    strengths: list
+    variance: float
+    violations: int
+    rounds: int = 0
+
+
+def team_sizes(count, team_size):
+    """
+    Return the sizes of the teams for count members, as even as possible.
+    """
+    if count == 0:
+        return []
+    teams = math.ceil(count / team_size)
+    base, extra = divmod(count, teams)
+    return [base + 1] * extra + [base] * (teams - extra)
+
+
+def variance(strengths):
+    if not strengths:
+        return 0.0
+    mean = sum(strengths) / len(strengths)
+    return sum((s - mean) ** 2 for s in strengths) / len(strengths)
+
+
+def _groups(members, must_pair):
+    """
+    Merge overlapping must-pair groups, returning a list of sets.
+    """
+    parent = {member: member for member in members}
+
+    def find(member):
+        while parent[member] != member:
+            parent[member] = parent[parent[member]]
+            member = parent[member]
+        return member
+
+    for group in must_pair:
+        for member in group[1:]:
+            parent[find(member)] = find(group[0])
+
+    groups = {}
+    for member in members:
+        groups.setdefault(find(member), set()).add(member)
+    return list(groups.values())
+
+
+class _State:
+    """
+    Assignment of member indexes to teams with the running sums the swap
+    scoring needs.
+    """
+
+    def __init__(self, ratings, sizes, partners, enemies):
+        self.ratings = ratings
+        self.sizes = sizes
+        self.partners = partners
+        self.enemies = enemies
+        self.count = len(sizes)
+        self.team_of = [None] * len(ratings)
+        self.members = [[] for _ in sizes]
+        self.sums = [0.0] * len(sizes)
+        self.ranked = sorted(range(len(ratings)), key=ratings.__getitem__)
+        self.ranked_ratings = [ratings[member] for member in self.ranked]
+
+    def place(self, member, team):
+        self.team_of[member] = team
+        self.members[team].append(member)
+        self.sums[team] += self.ratings[member]
+
+    def finish(self):
+        means = [s / n for s, n in zip(self.sums, self.sizes)]
+        self.total = sum(means)
+        self.total_squares = sum(m * m for m in means)
+        self.violations = sum(
+            self.team_of[a] != self.team_of[b]
+            for a, others in enumerate(self.partners)
+            for b in others if a < b
+        ) + sum(
+            self.team_of[a] == self.team_of[b]
+            for a, others in enumerate(self.enemies)
+            for b in others if a < b
+        )
+
+    def key(self):
+        """
+        Return (violations, variance), lower is better.
+        """
+        mean = self.total / self.count
+        spread = self.total_squares / self.count - mean * mean
+        return self.violations, max(0.0, spread)
+
+    def snapshot(self):
+        return (
+            self.team_of[:],
+            [members[:] for members in self.members],
+            self.sums[:],
+            self.total,
+            self.total_squares,
+            self.violations,
+        )
+
+    def restore(self, snapshot):
+        team_of, members, sums, *rest = snapshot
+        self.team_of = team_of[:]
+        self.members = [team[:] for team in members]
+        self.sums = sums[:]
+        self.total, self.total_squares, self.violations = rest
+
+    def delta(self, a, b):
+        """
+        Return the change in (violations, variance) of swapping a and b.
+        """
+        i, j = self.team_of[a], self.team_of[b]
+        diff = self.ratings[b] - self.ratings[a]
+        mean_i = self.sums[i] / self.sizes[i]
+        mean_j = self.sums[j] / self.sizes[j]
+        new_i = mean_i + diff / self.sizes[i]
+        new_j = mean_j - diff / self.sizes[j]
+
+        total = self.total + new_i - mean_i + new_j - mean_j
+        squares = (
+            self.total_squares
+            + new_i * new_i - mean_i * mean_i
+            + new_j * new_j - mean_j * mean_j
+        )
+        count = self.count
+        change = (
+            (squares - self.total_squares) / count
+            - (total * total - self.total * self.total) / (count * count)
+        )
+
+        violations = (
+            self._violations(a, b, i, j) + self._violations(b, a, j, i)
+        )
+        return violations, change
+
+    def _violations(self, member, other, old, new):
+        """
+        Change in violations of member's constraints when it moves from
+        team old to team new while other moves the opposite way.
+        """
+        team_of = self.team_of
+        change = 0
+        for partner in self.partners[member]:
+            if partner != other:
+                change += (team_of[partner] != new) - (team_of[partner] != old)
+        for enemy in self.enemies[member]:
+            if enemy != other:
+                change += (team_of[enemy] == new) - (team_of[enemy] == old)
+        return change
+
+    def swap(self, a, b, delta):
+        i, j = self.team_of[a], self.team_of[b]
+        diff = self.ratings[b] - self.ratings[a]
+        mean_i = self.sums[i] / self.sizes[i]
+        mean_j = self.sums[j] / self.sizes[j]
+        self.sums[i] += diff
+        self.sums[j] -= diff
+        new_i = self.sums[i] / self.sizes[i]
+        new_j = self.sums[j] / self.sizes[j]
+        self.total += new_i - mean_i + new_j - mean_j
+        self.total_squares += (
+            new_i * new_i - mean_i * mean_i + new_j * new_j - mean_j * mean_j
+        )
+        self.violations += delta[0]
+
+        self.members[i][self.members[i].index(a)] = b
+        self.members[j][self.members[j].index(b)] = a
+        self.team_of[a], self.team_of[b] = j, i
+
+    def best_swap(self, pairs):
+        """
+        Return the best improving swap among (a, b) pairs, if any.
+        """
+        best, best_delta = None, (0, -EPSILON)
+        team_of = self.team_of
+        for a, b in pairs:
+            if team_of[a] == team_of[b]:
+                continue
+            delta = self.delta(a, b)
+            if delta[0] > 0 or (delta[0] == 0 and delta[1] >= 0):
+                continue
+            if delta < best_delta:
+                best, best_delta = (a, b), delta
+        return best, best_delta
+
+
+def form_teams(ratings, team_size=3, must_pair=(), must_separate=(),
+               seed=None, time_limit=1.0):
+    """
+    Split members into balanced teams.
+
+    `ratings` maps member ids to ratings. `must_pair` is a list of groups of
+    ids to keep together and `must_separate` a list of pairs of ids to keep
+    apart. Raises FormationError when the constraints can never hold.
+    Constraints the search could not satisfy are reported in `violations`.
+    """
+    if team_size < 1:
+        raise FormationError('Team size must be at least 1.')
+
+    ids = list(ratings)
+    index = {member: i for i, member in enumerate(ids)}
+    for constraint in itertools.chain(must_pair, must_separate):
+        unknown = [member for member in constraint if member not in index]
+        if unknown:
+            raise FormationError(f'Unknown members in constraint: {unknown}.')
+    for pair in must_separate:
+        if len(pair) != 2:
+            raise FormationError('Must-separate entries are pairs.')
+
+    sizes = team_sizes(len(ids), team_size)
+    if not sizes:
+        return Formation([], [], 0.0, 0)
+
+    groups = [
+        sorted(index[member] for member in group)
+        for group in _groups(ids, [list(g) for g in must_pair if g])
+    ]
+    group_of = {
+        member: number
+        for number, group in enumerate(groups)
+        for member in group
+    }
+    if max(len(group) for group in groups) > max(sizes):
+        raise FormationError(
+            f'A must-pair group is larger than a team of {max(sizes)}.'
+        )
+
+    partners = [[] for _ in ids]
+    for group in groups:
+        for member in group:
+            partners[member] = [other for other in group if other != member]
+
+    enemies = [set() for _ in ids]
+    for a, b in must_separate:
+        a, b = index[a], index[b]
+        if group_of[a] == group_of[b]:
+            raise FormationError(
+                f'{ids[a]} and {ids[b]} must be both paired and separated.'
+            )
+        enemies[a].add(b)
+        enemies[b].add(a)
+
+    state = _State([float(ratings[member]) for member in ids], sizes,
+                   partners, [sorted(e) for e in enemies])
+    _greedy(state, groups)
+    state.finish()
+
+    rng = random.Random(seed)
+    deadline = time.monotonic() + time_limit
+    rounds = _improve(state, rng, deadline)
+
+    teams = [
+        [ids[member] for member in sorted(
+            members,
+            key=lambda member: -state.ratings[member]
+        )]
+        for members in state.members
+    ]
+    strengths = [s / n for s, n in zip(state.sums, state.sizes)]
+    return Formation(
+        teams,
+        strengths,
+        variance(strengths),
+        state.violations,
+        rounds
+    )
+
+
+def _greedy(state, groups):
+    """
+    Place groups, largest and then strongest first, in the weakest team
+    with room that holds none of their must-separate members.
+    """
+    groups = sorted(groups, key=lambda group: (
+        -len(group),
+        -sum(state.ratings[member] for member in group) / len(group)
+    ))
+    free = list(state.sizes)
+    heap = [(0.0, team) for team in range(state.count)]
+
+    for group in groups:
+        skipped, chosen = [], None
+        while heap:
+            entry = heapq.heappop(heap)
+            team = entry[1]
+            if free[team] < len(group):
+                if free[team]:
+                    skipped.append(entry)
+                continue
+            clash = any(
+                state.team_of[enemy] == team
+                for member in group for enemy in state.enemies[member]
+            )
+            if clash:
+                skipped.append(entry)
+                continue
+            chosen = team
+            break
+
+        if chosen is None:
+            # No team avoids every clash; the search repairs it later.
+            chosen = min(
+                (entry for entry in skipped if free[entry[1]] >= len(group)),
+                default=None
+            )
+            if chosen is None:
+                raise FormationError('Must-pair groups do not fit the teams.')
+            skipped.remove(chosen)
+            chosen = chosen[1]
+
+        for member in group:
+            state.place(member, chosen)
+        free[chosen] -= len(group)
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        if free[chosen]:
+            heapq.heappush(
+                heap,
+                (state.sums[chosen] / state.sizes[chosen], chosen)
+            )
+
+
+def _improve(state, rng, deadline):
+    """
+    Swap members between teams until no swap helps or time runs out.
+
+    Constraint violations are repaired first, then the balance is improved
+    with targeted sweeps. Up to EXHAUSTIVE_TEAMS teams, every pair of teams
+    is then searched for its best swap, followed by iterated local search:
+    a few random members are rotated and the descent repeated, keeping the
+    result only if it is better. Returns the number
+    of descents.
+    """
+    _repair(state, deadline)
+    while time.monotonic() < deadline:
+        if _targeted_sweep(state, deadline) <= CONVERGED:
+            break
+    if state.count > EXHAUSTIVE_TEAMS:
+        return 1
+
+    _descend(state, range(state.count), deadline)
+    if state.count < 2:
+        return 1
+
+    best, best_key = state.snapshot(), state.key()
+    rounds = stale = 0
+    while stale < KICKS and time.monotonic() < deadline:
+        _descend(state, _kick(state, rng), deadline)
+        rounds += 1
+        if state.key() < (best_key[0], best_key[1] - EPSILON):
+            best, best_key, stale = state.snapshot(), state.key(), 0
+        else:
+            state.restore(best)
+            stale += 1
+
+    state.restore(best)
+    return rounds + 1
+
+
+def _descend(state, dirty, deadline):
+    """
+    Apply the best swap between pairs of teams until none helps.
+
+    Only pairs involving a team changed since the last pass are searched,
+    since the others were already searched in their current state.
+    """
+    while dirty and time.monotonic() < deadline:
+        changed = set()
+        for i in dirty:
+            for j in range(state.count):
+                if i == j:
+                    continue
+                swap, delta = state.best_swap(
+                    itertools.product(state.members[i], state.members[j])
+                )
+                if swap:
+                    state.swap(*swap, delta)
+                    changed.update((i, j))
+        dirty = changed
+
+
+def _targeted_sweep(state, deadline):
+    """
+    Try to bring the teams furthest from the mean strength back with one
+    swap each.
+
+    A team `e` above the mean swapping with a team as far below it gains
+    most from trading a member for one rated about `size * e` lower, and
+    with a team at the mean for one about `size * e / 2` lower. Only the
+    members rated closest to those targets are scored, and only for teams
+    at least half a standard deviation away from the mean. Returns the
+    relative decrease in variance.
+    """
+    before = state.key()[1]
+    mean = state.total / state.count
+    cutoff = math.sqrt(before) / 2
+    teams = sorted(
+        (
+            team for team in range(state.count)
+            if abs(state.sums[team] / state.sizes[team] - mean) >= cutoff
+        ),
+        key=lambda team: -abs(state.sums[team] / state.sizes[team] - mean)
+    )
+    ranked = state.ranked
+    keys = state.ranked_ratings
+
+    for n, i in enumerate(teams):
+        if n % 64 == 0 and time.monotonic() > deadline:
+            break
+        excess = state.sums[i] - mean * state.sizes[i]
+        candidates = []
+        for a in state.members[i]:
+            for target in (excess, excess / 2):
+                at = bisect.bisect_left(keys, state.ratings[a] - target)
+                candidates.extend(
+                    (a, b) for b in ranked[max(0, at - WINDOW):at + WINDOW]
+                )
+        swap, delta = state.best_swap(candidates)
+        if swap:
+            state.swap(*swap, delta)
+
+    after = state.key()[1]
+    return (before - after) / before if before > EPSILON else 0.0
+
+
+def _kick(state, rng):
+    """
+    Rotate random members of three different teams (or swap two, when
+    there are only two teams), returning the teams.
+    """
+    teams = rng.sample(range(state.count), min(3, state.count))
+    a, b, *rest = (rng.choice(state.members[team]) for team in teams)
+    state.swap(a, b, state.delta(a, b))
+    for c in rest:
+        state.swap(a, c, state.delta(a, c))
+    return teams
+
+
+def _repair(state, deadline):
+    """
+    Swap members of violated constraints while that lowers the violation
+    count.
+    """
+    everyone = range(len(state.ratings))
+    while state.violations and time.monotonic() < deadline:
+        improved = False
+        for a in everyone:
+            broken = any(
+                state.team_of[p] != state.team_of[a]
+                for p in state.partners[a]
+            ) or any(
+                state.team_of[e] == state.team_of[a]
+                for e in state.enemies[a]
+            )
+            if not broken:
+                continue
+            swap, delta = state.best_swap((a, b) for b in everyone)
+            if swap and delta[0] < 0:
+                state.swap(*swap, delta)
+                improved = True
+        if not improved:
+            return
+
+
+def optimal_teams(ratings, team_size=3, must_pair=(), must_separate=()):
+    """
+    Return the best formation by trying every split, for small counts only.
+    """
+    ids = list(ratings)
+    if len(ids) > 12:
+        raise FormationError('Brute force is limited to 12 members.')
+
+    sizes = team_sizes(len(ids), team_size)
+    pair_sets = [set(group) for group in must_pair]
+    best = None
+
+    for teams in _partitions(ids, sizes):
+        team_of = {m: t for t, team in enumerate(teams) for m in team}
+        violations = sum(
+            len({team_of[m] for m in group}) - 1 for group in pair_sets
+        ) + sum(team_of[a] == team_of[b] for a, b in must_separate)
+        strengths = [
+            sum(ratings[m] for m in team) / len(team) for team in teams
+        ]
+        key = (violations, variance(strengths))
+        if best is None or key < best[0]:
+            best = (key, teams, strengths)
+
+    if best is None:
+        return Formation([], [], 0.0, 0)
+    (violations, spread), teams, strengths = best
+    return Formation(teams, strengths, spread, violations)
+
+
+def _partitions(members, sizes):
+    """
+    Yield every split of members into teams of the given sizes, each once.
+    """
+    if not members:
+        yield []
+        return
+
+    first, rest = members[0], members[1:]
+    for size in set(sizes):
+        remaining = list(sizes)
+        remaining.remove(size)
+        for mates in itertools.combinations(rest, size - 1):
+            others = [m for m in rest if m not in mates]
+            for teams in _partitions(others, remaining):
+                yield [[first, *mates]] + teams
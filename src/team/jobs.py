@@ -0,0 +1,14 @@
+"""
+Periodic refresh of member ratings, see core.scheduler.
+"""
+
+from datetime import timedelta
+
+from django.core.management import call_command
+
+from core.scheduler import scheduler
+
+
+@scheduler.job('refresh-ratings', interval=timedelta(days=1))
+def refresh_ratings():
+    call_command('refresh_ratings')
@@ -0,0 +1,118 @@
+"""
+Platform ratings of members, the strength used to form teams.
+"""
+
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+
+from core.models import MemberRating
+from platforms.client import PlatformError, get_client
+
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_codeforces_ratings(client, handles, chunk_size=300):
+    """
+    Return {handle: rating} for Codeforces handles, None when unrated.
+
+    Handles are looked up `chunk_size` at a time. Codeforces rejects a
+    whole lookup over one unknown handle, so a failed chunk is split in
+    halves until the bad handles are isolated and skipped.
+    """
+    url = client.platform_url('C', 'user.info')
+    ratings = {}
+    pending = [
+        handles[start:start + chunk_size]
+        for start in range(0, len(handles), chunk_size)
+    ]
+
+    while pending:
+        chunk = pending.pop()
+        try:
+            response = client.get(
+                url,
+                params={'handles': ';'.join(chunk)},
+                cache=False
+            )
+            data = response.json()
+            if data.get('status') != 'OK':
+                raise PlatformError(data.get('comment', 'Lookup failed.'))
+        except (PlatformError, ValueError) as error:
+            if len(chunk) == 1:
+                logger.warning('Rating lookup of %s failed: %s', chunk[0],
+                               error)
+                continue
+            middle = len(chunk) // 2
+            pending.extend((chunk[:middle], chunk[middle:]))
+            continue
+
+        # Codeforces handles are case insensitive.
+        wanted = {handle.lower(): handle for handle in chunk}
+        for user in data['result']:
+            handle = wanted.get(user['handle'].lower())
+            if handle is not None:
+                ratings[handle] = user.get('rating')
+
+    return ratings
+
+
+# Platforms with a public bulk rating lookup, mapped to the user field
+# holding the handle and the fetcher.
+FETCHERS = {
+    'C': ('codeforces_handle', fetch_codeforces_ratings),
+}
+
+
+def refresh_ratings(users=None, client=None):
+    """
+    Store the current rating of every member with a handle.
+
+    Returns the number of ratings stored.
+    """
+    if users is None:
+        users = get_user_model().objects.filter(is_active=True)
+    client = client or get_client()
+
+    stored = 0
+    for platform, (field, fetch) in FETCHERS.items():
+        handles = dict(
+            users.exclude(**{f'{field}__isnull': True})
+            .exclude(**{field: ''})
+            .values_list(field, 'id')
+        )
+        ratings = fetch(client, list(handles))
+        MemberRating.objects.bulk_create(
+            [
+                MemberRating(
+                    user_id=handles[handle],
+                    platform=platform,
+                    handle=handle,
+                    rating=rating
+                )
+                for handle, rating in ratings.items()
+            ],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['user', 'platform'],
+            update_fields=['handle', 'rating', 'updated_at']
+        )
+        stored += len(ratings)
+
+    return stored
+
+
+def best_ratings(user_ids):
+    """
+    Return {user id: best rating on any platform} for the rated members
+    among user_ids.
+    """
+    return dict(
+        MemberRating.objects.filter(
+            user_id__in=user_ids,
+            rating__isnull=False
+        ).values('user_id').annotate(best=Max('rating'))
+        .values_list('user_id', 'best')
+    )
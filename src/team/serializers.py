@@ -0,0 +1,73 @@
+"""
+Serializers for the team API View.
+"""
+
+from rest_framework import serializers
+
+
+class TeamFormationSerializer(serializers.Serializer):
+    """
+    Serializer for a team formation request.
+    """
+    members = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        help_text='Member ids to split (default: every active member).'
+    )
+    team_size = serializers.IntegerField(default=3, min_value=1, max_value=10)
+    must_pair = serializers.ListField(
+        child=serializers.ListField(
+            child=serializers.IntegerField(),
+            min_length=2
+        ),
+        default=list,
+        help_text='Groups of member ids to put in the same team.'
+    )
+    must_separate = serializers.ListField(
+        child=serializers.ListField(
+            child=serializers.IntegerField(),
+            min_length=2,
+            max_length=2
+        ),
+        default=list,
+        help_text='Pairs of member ids to put in different teams.'
+    )
+    unrated_rating = serializers.IntegerField(
+        required=False,
+        help_text='Rating of members without one '
+                  '(default: TEAM_UNRATED_RATING).'
+    )
+    seed = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        """
+        Require constraint members to be among the members split.
+        """
+        members = attrs.get('members')
+        if members is None:
+            return attrs
+        if len(set(members)) != len(members):
+            raise serializers.ValidationError(
+                {'members': 'Members must be unique.'}
+            )
+
+        members = set(members)
+        for field in ('must_pair', 'must_separate'):
+            for group in attrs[field]:
+                if not members.issuperset(group):
+                    raise serializers.ValidationError(
+                        {field: f'{group} includes members not being split.'}
+                    )
+        return attrs
+
+
+class TeamMemberSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    rating = serializers.IntegerField()
+    rated = serializers.BooleanField()
+
+
+class TeamSerializer(serializers.Serializer):
+    members = TeamMemberSerializer(many=True)
+    strength = serializers.FloatField()
@@ -0,0 +1,183 @@
+"""
+Tests for the team formation optimizer.
+"""
+
+import random
+
+from django.test import SimpleTestCase
+
+from team.formation import (
+    FormationError,
+    form_teams,
+    optimal_teams,
+    team_sizes,
+)
+
+
+def random_ratings(count, seed):
+    rng = random.Random(seed)
+    return {member: rng.randint(800, 3500) for member in range(count)}
+
+
+def team_of(formation):
+    return {
+        member: number
+        for number, team in enumerate(formation.teams)
+        for member in team
+    }
+
+
+class FormationTests(SimpleTestCase):
+    """
+    Test forming balanced teams.
+    """
+
+    def test_team_sizes(self):
+        """
+        Test teams are as even as possible when members do not divide.
+        """
+        self.assertEqual(team_sizes(9, 3), [3, 3, 3])
+        self.assertEqual(team_sizes(10, 3), [3, 3, 2, 2])
+        self.assertEqual(team_sizes(2, 3), [2])
+        self.assertEqual(team_sizes(0, 3), [])
+
+    def test_every_member_placed_once(self):
+        """
+        Test the teams partition the members.
+        """
+        ratings = random_ratings(100, seed=1)
+
+        formation = form_teams(ratings, seed=1, time_limit=0.2)
+
+        members = [member for team in formation.teams for member in team]
+        self.assertEqual(sorted(members), sorted(ratings))
+        self.assertEqual(
+            sorted(len(team) for team in formation.teams),
+            sorted(team_sizes(100, 3))
+        )
+
+    def test_strengths_are_team_means(self):
+        """
+        Test reported strengths match the members' ratings.
+        """
+        ratings = random_ratings(30, seed=2)
+
+        formation = form_teams(ratings, seed=2, time_limit=0.2)
+
+        for team, strength in zip(formation.teams, formation.strengths):
+            self.assertAlmostEqual(
+                strength,
+                sum(ratings[member] for member in team) / len(team)
+            )
+
+    def test_balances_obvious_split(self):
+        """
+        Test a strong and a weak member are paired to balance two teams.
+        """
+        ratings = {'a': 3000, 'b': 2000, 'c': 1000, 'd': 2000}
+
+        formation = form_teams(ratings, team_size=2)
+
+        self.assertEqual(formation.variance, 0)
+        self.assertIn(['a', 'c'], formation.teams)
+
+    def test_matches_brute_force_on_small_rosters(self):
+        """
+        Test the optimizer finds the optimum for small member counts.
+        """
+        for count in range(4, 10):
+            for seed in range(3):
+                ratings = random_ratings(count, seed)
+                with self.subTest(count=count, seed=seed):
+                    found = form_teams(ratings, seed=seed)
+                    best = optimal_teams(ratings)
+                    self.assertAlmostEqual(
+                        found.variance,
+                        best.variance,
+                        places=6
+                    )
+
+    def test_improves_on_large_rosters(self):
+        """
+        Test thousands of members are balanced to a fraction of a point.
+        """
+        ratings = random_ratings(3000, seed=3)
+
+        formation = form_teams(ratings, seed=3, time_limit=2)
+        start = form_teams(ratings, seed=3, time_limit=0)
+
+        self.assertLess(formation.variance, 1)
+        self.assertLess(formation.variance, start.variance / 100)
+
+    def test_constraints_respected(self):
+        """
+        Test must-pair groups share a team and must-separate pairs do not.
+        """
+        ratings = random_ratings(60, seed=4)
+        must_pair = [[0, 1], [2, 3, 4], [5, 6]]
+        must_separate = [(0, 7), (5, 8), (10, 11), (12, 13)]
+
+        formation = form_teams(
+            ratings,
+            must_pair=must_pair,
+            must_separate=must_separate,
+            seed=4,
+            time_limit=0.2
+        )
+
+        teams = team_of(formation)
+        self.assertEqual(formation.violations, 0)
+        for group in must_pair:
+            self.assertEqual(len({teams[member] for member in group}), 1)
+        for a, b in must_separate:
+            self.assertNotEqual(teams[a], teams[b])
+
+    def test_overlapping_pairs_merged(self):
+        """
+        Test must-pair groups sharing a member end up together.
+        """
+        ratings = random_ratings(9, seed=5)
+
+        formation = form_teams(ratings, must_pair=[[0, 1], [1, 2]])
+
+        teams = team_of(formation)
+        self.assertEqual(teams[0], teams[2])
+
+    def test_constraints_match_brute_force(self):
+        """
+        Test constrained optimum on a small roster.
+        """
+        ratings = random_ratings(9, seed=6)
+        must_pair = [[0, 1]]
+        must_separate = [(2, 3), (4, 5)]
+
+        found = form_teams(ratings, must_pair=must_pair,
+                           must_separate=must_separate, seed=6)
+        best = optimal_teams(ratings, must_pair=must_pair,
+                             must_separate=must_separate)
+
+        self.assertEqual(found.violations, 0)
+        self.assertAlmostEqual(found.variance, best.variance, places=6)
+
+    def test_impossible_constraints(self):
+        """
+        Test constraints that can never hold are rejected.
+        """
+        ratings = random_ratings(9, seed=7)
+        cases = [
+            {'must_pair': [[0, 1, 2, 3]]},
+            {'must_pair': [[0, 1]], 'must_separate': [(0, 1)]},
+            {'must_separate': [(0, 99)]},
+            {'must_pair': [[0, 1], [2, 3], [4, 5], [6, 7]]},
+        ]
+
+        for case in cases:
+            with self.subTest(case=case):
+                with self.assertRaises(FormationError):
+                    form_teams(ratings, **case)
+
+    def test_empty_roster(self):
+        """
+        Test no members form no teams.
+        """
+        self.assertEqual(form_teams({}).teams, [])
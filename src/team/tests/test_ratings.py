@@ -0,0 +1,112 @@
+"""
+Tests for member rating refresh.
+"""
+
+import json
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from core.models import MemberRating
+from platforms.client import PlatformClient
+from platforms.tests.fake_upstream import FakeUpstream
+from team.ratings import best_ratings, refresh_ratings
+
+
+INFO_PATH = '/api/user.info'
+
+
+class RatingRefreshTests(TestCase):
+    """
+    Test fetching and storing Codeforces ratings.
+    """
+
+    def setUp(self):
+        self.ratings = {'tourist': 3800, 'petr': 3000, 'newbie': None}
+        self.upstream = FakeUpstream().start()
+        self.addCleanup(self.upstream.stop)
+        self.upstream.route(INFO_PATH, self.user_info)
+
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.client = PlatformClient(cache_dir=cache_dir.name, retries=0)
+        self.addCleanup(self.client.close)
+
+        settings = override_settings(
+            PLATFORM_API_URLS={'C': self.upstream.url('/api/')}
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def user_info(self, query):
+        handles = query['handles'][0].split(';')
+        unknown = [h for h in handles if h.lower() not in self.ratings]
+        if unknown:
+            return json.dumps({
+                'status': 'FAILED',
+                'comment': f'handles: User with handle {unknown[0]} not found',
+            })
+        result = []
+        for handle in handles:
+            user = {'handle': handle.lower()}
+            if self.ratings[handle.lower()] is not None:
+                user['rating'] = self.ratings[handle.lower()]
+            result.append(user)
+        return json.dumps({'status': 'OK', 'result': result})
+
+    def create_user(self, email, handle):
+        return get_user_model().objects.create_user(
+            email=email,
+            password='testpass123',
+            codeforces_handle=handle
+        )
+
+    def test_refresh_stores_ratings(self):
+        """
+        Test ratings are stored for every member with a handle.
+        """
+        tourist = self.create_user('t@example.com', 'Tourist')
+        newbie = self.create_user('n@example.com', 'newbie')
+        self.create_user('x@example.com', None)
+
+        self.assertEqual(refresh_ratings(client=self.client), 2)
+
+        self.assertEqual(
+            MemberRating.objects.get(user=tourist).rating,
+            3800
+        )
+        self.assertIsNone(MemberRating.objects.get(user=newbie).rating)
+        self.assertEqual(best_ratings([tourist.id, newbie.id]), {
+            tourist.id: 3800
+        })
+
+    def test_refresh_updates_existing(self):
+        """
+        Test a second refresh updates ratings in place.
+        """
+        petr = self.create_user('p@example.com', 'petr')
+        refresh_ratings(client=self.client)
+        self.ratings['petr'] = 3100
+
+        refresh_ratings(client=self.client)
+
+        rating = MemberRating.objects.get()
+        self.assertEqual((rating.user, rating.rating), (petr, 3100))
+
+    def test_unknown_handle_isolated(self):
+        """
+        Test an unknown handle does not stop the others being stored.
+        """
+        self.create_user('t@example.com', 'tourist')
+        self.create_user('p@example.com', 'petr')
+        self.create_user('g@example.com', 'ghost')
+
+        with self.assertLogs('team.ratings', 'WARNING'):
+            stored = refresh_ratings(client=self.client)
+
+        self.assertEqual(stored, 2)
+        self.assertEqual(
+            set(MemberRating.objects.values_list('handle', flat=True)),
+            {'tourist', 'petr'}
+        )
@@ -0,0 +1,148 @@
+"""
+Tests for the team formation API.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import MemberRating
+
+
+FORM_URL = reverse('team:form')
+
+
+def create_user(email, **params):
+    return get_user_model().objects.create_user(
+        email=email,
+        password='testpass123',
+        name=email.split('@')[0],
+        **params
+    )
+
+
+class TeamFormationApiTests(TestCase):
+    """
+    Test the team formation endpoint.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_user('staff@example.com', is_staff=True)
+        cls.members = []
+        for i, rating in enumerate([2400, 1800, 1500, 1200, 1600, 1700]):
+            user = create_user(f'member{i}@example.com')
+            MemberRating.objects.create(
+                user=user,
+                platform='C',
+                handle=f'member{i}',
+                rating=rating
+            )
+            cls.members.append(user)
+        cls.ids = [user.id for user in cls.members]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_requires_staff(self):
+        """
+        Test members cannot form teams.
+        """
+        self.client.force_authenticate(self.members[0])
+
+        res = self.client.post(FORM_URL, {}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_form_teams(self):
+        """
+        Test the chosen members are split into balanced teams.
+        """
+        res = self.client.post(FORM_URL, {'members': self.ids}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['teams']), 2)
+        placed = [
+            member['id']
+            for team in res.data['teams']
+            for member in team['members']
+        ]
+        self.assertEqual(sorted(placed), sorted(self.ids))
+        self.assertEqual(
+            sorted(team['strength'] for team in res.data['teams']),
+            [1700.0, 1700.0]
+        )
+        self.assertEqual(res.data['spread'], 0)
+        self.assertEqual(res.data['violations'], 0)
+
+    def test_defaults_to_active_members(self):
+        """
+        Test every active member is split when none are given, unrated
+        ones at the default rating.
+        """
+        inactive = create_user('gone@example.com', is_active=False)
+
+        res = self.client.post(FORM_URL, {
+            'unrated_rating': 1000
+        }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        members = {
+            member['id']: member
+            for team in res.data['teams']
+            for member in team['members']
+        }
+        self.assertNotIn(inactive.id, members)
+        self.assertEqual(members[self.staff.id]['rating'], 1000)
+        self.assertFalse(members[self.staff.id]['rated'])
+        self.assertTrue(members[self.ids[0]]['rated'])
+
+    def test_constraints(self):
+        """
+        Test must-pair and must-separate are honored.
+        """
+        payload = {
+            'members': self.ids,
+            'must_pair': [[self.ids[0], self.ids[1]]],
+            'must_separate': [[self.ids[2], self.ids[3]]],
+        }
+
+        res = self.client.post(FORM_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        teams = {
+            member['id']: number
+            for number, team in enumerate(res.data['teams'])
+            for member in team['members']
+        }
+        self.assertEqual(teams[self.ids[0]], teams[self.ids[1]])
+        self.assertNotEqual(teams[self.ids[2]], teams[self.ids[3]])
+
+    def test_invalid_requests(self):
+        """
+        Test bad members and impossible constraints are rejected.
+        """
+        payloads = [
+            {'members': self.ids + [999999]},
+            {'members': self.ids[:3], 'must_pair': [self.ids[3:5]]},
+            {'members': [self.ids[0], self.ids[0]]},
+            {'members': self.ids, 'must_pair': [self.ids[:4]]},
+            {'members': self.ids, 'must_separate': [self.ids[:3]]},
+            {
+                'members': self.ids,
+                'must_pair': [self.ids[:2]],
+                'must_separate': [self.ids[:2]],
+            },
+        ]
+
+        for payload in payloads:
+            with self.subTest(payload=payload):
+                res = self.client.post(FORM_URL, payload, format='json')
+                self.assertEqual(
+                    res.status_code,
+                    status.HTTP_400_BAD_REQUEST
+                )
@@ -0,0 +1,14 @@
+"""
+URL mappings for the team app.
+"""
+
+from django.urls import path
+
+from team import views
+
+
+app_name = 'team'
+
+urlpatterns = [
+    path('form/', views.TeamFormationView.as_view(), name='form'),
+]
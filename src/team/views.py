@@ -0,0 +1,91 @@
+"""
+Views for the team API.
+"""
+
+import math
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from drf_spectacular.utils import extend_schema
+
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core import authentication
+from team import ratings
+from team.formation import FormationError, form_teams
+from team.serializers import TeamFormationSerializer, TeamSerializer
+
+
+class TeamFormationView(APIView):
+    """
+    Split members into teams of balanced strength (staff only).
+
+    A member's strength is their best stored platform rating. Nothing is
+    saved; the response is a proposal staff can adjust.
+    """
+    authentication_classes = [authentication.TokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(request=TeamFormationSerializer)
+    def post(self, request):
+        serializer = TeamFormationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        users = get_user_model().objects.filter(is_active=True)
+        if 'members' in data:
+            users = users.filter(id__in=data['members'])
+        names = dict(users.values_list('id', 'name'))
+        if 'members' in data:
+            missing = sorted(set(data['members']) - names.keys())
+            if missing:
+                raise ValidationError(
+                    {'members': f'Unknown or inactive members: {missing}.'}
+                )
+
+        default = data.get(
+            'unrated_rating',
+            getattr(settings, 'TEAM_UNRATED_RATING', 1200)
+        )
+        rated = ratings.best_ratings(list(names))
+        strengths = {
+            user_id: rated.get(user_id, default) for user_id in sorted(names)
+        }
+
+        try:
+            formation = form_teams(
+                strengths,
+                team_size=data['team_size'],
+                must_pair=data['must_pair'],
+                must_separate=[tuple(pair) for pair in data['must_separate']],
+                seed=data.get('seed'),
+                time_limit=getattr(settings, 'TEAM_FORMATION_TIME_LIMIT', 0.5)
+            )
+        except FormationError as error:
+            raise ValidationError({'detail': str(error)})
+
+        teams = [
+            {
+                'members': [
+                    {
+                        'id': user_id,
+                        'name': names[user_id],
+                        'rating': strengths[user_id],
+                        'rated': user_id in rated,
+                    }
+                    for user_id in team
+                ],
+                'strength': round(strength, 2),
+            }
+            for team, strength in zip(formation.teams, formation.strengths)
+        ]
+
+        return Response({
+            'teams': TeamSerializer(teams, many=True).data,
+            'spread': round(math.sqrt(formation.variance), 2),
+            'violations': formation.violations,
+        })
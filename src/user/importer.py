@@ -0,0 +1,220 @@
+"""
+Bulk import of club members.
+"""
+
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import UserImport
+from user import verification
+from user.serializers import UserImportSerializer
+
+
+UNIQUE_FIELDS = [
+    'email',
+    'codeforces_handle',
+    'omegaup_handle',
+    'kattis_handle',
+]
+
+
+def read_csv(file):
+    """
+    Return the rows of a CSV upload as a list of dicts.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, encoding='utf-8-sig', newline='') as handle:
+            return list(csv.DictReader(handle))
+
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        return list(csv.DictReader(text))
+    finally:
+        text.detach()
+
+
+def hash_passwords(passwords, workers=1):
+    """
+    Hash passwords, across a process pool when workers > 1.
+
+    Password hashing is CPU bound and holds the GIL, so threads would not
+    help. Only the import_users command and queued imports use a pool:
+    forking a web worker would copy its database connections into the
+    children.
+    """
+    workers = min(workers or 1, len(passwords))
+
+    if workers <= 1:
+        return [make_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def import_users(rows, workers=1, batch_size=500):
+    """
+    Validate and create users in bulk.
+
+    Rows that fail validation, repeat a unique value within the import or
+    collide with an existing user are skipped and reported. Users are
+    hashed and inserted batch_size at a time. Returns the created users
+    and a list of `{'row': n, 'errors': {...}}`, where `n` is the 1-based
+    position of the row in the import.
+    """
+    model = get_user_model()
+    errors = []
+    valid = []
+
+    for number, row in enumerate(rows, start=1):
+        serializer = UserImportSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+        else:
+            errors.append({
+                'row': number,
+                'errors': {
+                    field: [str(message) for message in messages]
+                    for field, messages in serializer.errors.items()
+                }
+            })
+
+    valid = _check_unique(model, valid, errors)
+
+    created = []
+    for start in range(0, len(valid), batch_size):
+        batch = valid[start:start + batch_size]
+        passwords = hash_passwords(
+            [data['password'] for _, data in batch],
+            workers=workers
+        )
+        users = {}
+        for (number, data), password in zip(batch, passwords):
+            statuses = verification.handle_statuses(data)
+            users[number] = model(**dict(data, password=password, **statuses))
+        created += _create(model, batch, users, errors)
+
+    errors.sort(key=lambda error: error['row'])
+    return created, errors
+
+
+def run_import(import_id, workers=None):
+    """
+    Run a queued UserImport and store its outcome.
+
+    Its rows, passwords included, are emptied whether or not the import
+    succeeds. Passwords are hashed on USER_IMPORT_HASH_WORKERS processes,
+    all cores by default.
+    """
+    user_import = UserImport.objects.filter(
+        id=import_id,
+        finished_at__isnull=True
+    ).first()
+    if user_import is None:
+        return
+
+    if workers is None:
+        workers = (
+            getattr(settings, 'USER_IMPORT_HASH_WORKERS', None)
+            or os.cpu_count()
+        )
+    try:
+        created, errors = import_users(user_import.rows, workers=workers)
+    finally:
+        UserImport.objects.filter(id=import_id).update(rows=[])
+
+    UserImport.objects.filter(id=import_id).update(
+        created=len(created),
+        errors=errors,
+        finished_at=timezone.now()
+    )
+
+
+def _create(model, batch, users, errors):
+    """
+    Insert the users of a batch of rows and queue checks of their handles.
+
+    A row that a concurrent signup or import made collide since it was
+    checked fails the whole insert; the batch is checked again, the row
+    reported, and the rest inserted.
+    """
+    while batch:
+        try:
+            with transaction.atomic():
+                created = model.objects.bulk_create(
+                    [users[number] for number, _ in batch]
+                )
+                verification.queue_pending({
+                    field: model.HANDLE_PENDING
+                    for field in map(
+                        verification.status_field,
+                        verification.HANDLE_FIELDS
+                    )
+                    if any(
+                        getattr(user, field) == model.HANDLE_PENDING
+                        for user in created
+                    )
+                })
+            return created
+        except IntegrityError:
+            accepted = _check_unique(model, batch, errors)
+            if len(accepted) == len(batch):
+                raise
+            batch = accepted
+    return []
+
+
+def _check_unique(model, valid, errors):
+    """
+    Drop rows whose unique fields repeat within the import or already exist.
+
+    Existing values are fetched with a single query against the unique
+    indexes.
+    """
+    for _, data in valid:
+        data['email'] = model.objects.normalize_email(data['email'])
+
+    lookup = Q(pk__in=[])
+    for field in UNIQUE_FIELDS:
+        values = [data[field] for _, data in valid if data.get(field)]
+        if values:
+            lookup |= Q(**{f'{field}__in': values})
+
+    taken = {field: set() for field in UNIQUE_FIELDS}
+    for existing in model.objects.filter(lookup).values_list(*UNIQUE_FIELDS):
+        for field, value in zip(UNIQUE_FIELDS, existing):
+            if value:
+                taken[field].add(value)
+
+    seen = {field: set() for field in UNIQUE_FIELDS}
+    accepted = []
+    for number, data in valid:
+        row_errors = {}
+        for field in UNIQUE_FIELDS:
+            value = data.get(field)
+            if not value:
+                continue
+            if value in taken[field]:
+                row_errors[field] = [f'A user with this {field} exists.']
+            elif value in seen[field]:
+                row_errors[field] = [f'Duplicate {field} in import.']
+
+        if row_errors:
+            errors.append({'row': number, 'errors': row_errors})
+            continue
+
+        for field in UNIQUE_FIELDS:
+            if data.get(field):
+                seen[field].add(data[field])
+        accepted.append((number, data))
+
+    return accepted
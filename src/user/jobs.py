@@ -0,0 +1,13 @@
+"""
+Periodic checks of member handles, see core.scheduler.
+"""
+
+from datetime import timedelta
+
+from core.scheduler import scheduler
+from user import verification
+
+
+@scheduler.job('verify-handles', interval=timedelta(hours=1))
+def verify_handles():
+    verification.queue_all_pending()
@@ -6,9 +6,13 @@ from django.contrib.auth import (
     get_user_model,
     authenticate
 )
+from django.db import transaction
 
 from rest_framework import serializers
 
+from core.models import Task, UserImport
+from user import verification
+
 
 class UserSerializer(serializers.ModelSerializer):
     """
@@ -23,30 +27,95 @@ class UserSerializer(serializers.ModelSerializer):
             'name',
             'codeforces_handle',
             'omegaup_handle',
-            'kattis_handle'
+            'kattis_handle',
+            'codeforces_handle_status',
+            'omegaup_handle_status',
+            'kattis_handle_status',
+            'participation_count'
+        )
+        read_only_fields = (
+            'codeforces_handle_status',
+            'omegaup_handle_status',
+            'kattis_handle_status',
+            'participation_count',
         )
         extra_kwargs = {'password': {'write_only': True, 'min_length': 5}}
 
     def create(self, validated_data):
         """
         Create a new user with encrypted password and return it.
+
+        Handles are checked in the background, see user.verification.
         """
-        return get_user_model().objects.create_user(**validated_data)
+        statuses = verification.handle_statuses(validated_data)
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                **validated_data,
+                **statuses
+            )
+            verification.queue_pending(statuses)
+        return user
 
     def update(self, instance, validated_data):
         """
         Update a user, setting the password correctly and return it.
         """
         password = validated_data.pop('password', None)
-        user = super().update(instance, validated_data)
+        statuses = verification.handle_statuses({
+            field: handle for field, handle in validated_data.items()
+            if field in verification.HANDLE_FIELDS.values()
+            and handle != getattr(instance, field)
+        })
+        with transaction.atomic():
+            user = super().update(instance, {**validated_data, **statuses})
+            verification.queue_pending(statuses)
 
-        if password:
-            user.set_password(password)
-            user.save()
+            if password:
+                user.set_password(password)
+                user.save()
 
         return user
 
 
+class UserImportSerializer(serializers.Serializer):
+    """
+    Serializer for one row of a bulk user import.
+
+    Uniqueness is checked for the whole import at once by user.importer.
+    """
+    HANDLE_FIELDS = ('codeforces_handle', 'omegaup_handle', 'kattis_handle')
+
+    email = serializers.EmailField(max_length=255)
+    name = serializers.CharField(max_length=255)
+    password = serializers.CharField(min_length=5, trim_whitespace=False)
+    codeforces_handle = serializers.CharField(
+        max_length=255,
+        required=False,
+        allow_blank=True,
+        allow_null=True
+    )
+    omegaup_handle = serializers.CharField(
+        max_length=255,
+        required=False,
+        allow_blank=True,
+        allow_null=True
+    )
+    kattis_handle = serializers.CharField(
+        max_length=255,
+        required=False,
+        allow_blank=True,
+        allow_null=True
+    )
+
+    def validate(self, attrs):
+        """
+        Store blank handles as NULL so they do not collide.
+        """
+        for field in self.HANDLE_FIELDS:
+            attrs[field] = attrs.get(field) or None
+        return attrs
+
+
 class AuthTokenSerializer(serializers.Serializer):
     """
     Serializer for the user authentication token.
@@ -75,3 +144,29 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs['user'] = user
         return attrs
+
+
+class ImportStatusSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the progress and outcome of a bulk user import.
+    """
+    status = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UserImport
+        fields = (
+            'id',
+            'task',
+            'status',
+            'created',
+            'errors',
+            'created_at',
+            'finished_at',
+        )
+
+    def get_status(self, user_import):
+        if user_import.finished_at:
+            return 'done'
+        if user_import.task is None or user_import.task.status == Task.DEAD:
+            return 'failed'
+        return 'pending'
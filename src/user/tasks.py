@@ -0,0 +1,24 @@
+"""
+Background tasks of the user app, see core.tasks.
+"""
+
+from core.tasks import task
+from user import importer, verification
+
+
+@task(priority=3)
+def verify_handles(platform):
+    """
+    Check the pending handles of members on a platform.
+    """
+    verification.verify_pending(platform)
+
+
+# Not retried: a second run would report the rows created by the first as
+# taken, and the rows are gone by then anyway.
+@task(priority=4, max_attempts=1)
+def import_members(import_id):
+    """
+    Run a bulk user import uploaded through the API.
+    """
+    importer.run_import(import_id)
@@ -2,13 +2,24 @@
 Tests for the user API.
 """
 
-from django.test import TestCase
+import base64
+
+from django.contrib.auth.hashers import check_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from core import tasks
+from core.models import Task, UserImport
+from core.throttling import get_store
+from problem.tasks import ingest_member_submissions
+from user.importer import hash_passwords
 from user.serializers import UserSerializer
 
 
@@ -16,6 +27,7 @@ CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
 ME_URL = reverse('user:me')
 LIST_URL = reverse('user:list')
+IMPORT_URL = reverse('user:import')
 
 
 def create_user(**params):
@@ -32,6 +44,7 @@ class PublicUserApiTests(TestCase):
 
     def setUp(self):
         self.client = APIClient()
+        get_store().clear()
 
     def test_create_valid_user_success(self):
         """
@@ -51,6 +64,25 @@ class PublicUserApiTests(TestCase):
 
         self.assertTrue(user.check_password(payload['password']))
         self.assertNotIn('password', res.data)
+        self.assertFalse(Task.objects.exists())
+
+    def test_create_user_with_handle_queues_sync(self):
+        """
+        Test signing up with a handle queues a submission sync.
+        """
+        payload = {
+            'email': 'test@example.com',
+            'password': 'testpass1234',
+            'name': 'Test Name',
+            'codeforces_handle': 'tourist'
+        }
+
+        res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        user = get_user_model().objects.get(email=payload['email'])
+        queued = Task.objects.get(name=ingest_member_submissions.name)
+        self.assertEqual(queued.kwargs, {'user_id': user.id})
 
     def test_create_user_with_email_exists_error(self):
         """
@@ -96,7 +128,7 @@ class PublicUserApiTests(TestCase):
             'name': 'Test Name'
         }
 
-        create_user(**payload)
+        user = create_user(**payload)
 
         payload = {
             'email': 'test@example.com',
@@ -107,6 +139,8 @@ class PublicUserApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn('token', res.data)
+        user.refresh_from_db()
+        self.assertIsNotNone(user.last_login)
 
     def test_create_token_invalid_credentials(self):
         """
@@ -144,6 +178,117 @@ class PublicUserApiTests(TestCase):
         self.assertNotIn('token', res.data)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    @override_settings(REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'login_ip': '100/min',
+            'login_email': '2/min',
+        }
+    })
+    @patch('user.serializers.authenticate', return_value=None)
+    def test_token_throttled_per_email(self, patched_authenticate):
+        """
+        Test that repeated attempts for one email are rejected before
+        authenticating.
+        """
+        payload = {'email': 'test@example.com', 'password': 'badpass'}
+
+        codes = [
+            self.client.post(TOKEN_URL, payload).status_code
+            for _ in range(3)
+        ]
+        other = self.client.post(
+            TOKEN_URL,
+            {'email': 'other@example.com', 'password': 'badpass'}
+        )
+
+        self.assertEqual(codes, [400, 400, 429])
+        self.assertEqual(other.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(patched_authenticate.call_count, 3)
+
+    @override_settings(REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'login_ip': '2/min',
+            'login_email': '100/min',
+        }
+    })
+    def test_token_throttled_despite_basic_auth(self):
+        """
+        Test that Basic credentials are not checked ahead of the throttles.
+        """
+        create_user(email='test@example.com', password='testpass1234')
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Basic ' + base64.b64encode(
+                b'test@example.com:guess'
+            ).decode()
+        )
+
+        codes = [
+            self.client.post(TOKEN_URL, {}).status_code
+            for _ in range(3)
+        ]
+
+        self.assertEqual(codes, [400, 400, 429])
+
+    def test_basic_auth_checks_no_password(self):
+        """
+        Test that Basic credentials are ignored rather than checked.
+        """
+        create_user(email='test@example.com', password='testpass1234')
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Basic ' + base64.b64encode(
+                b'test@example.com:testpass1234'
+            ).decode()
+        )
+
+        with patch.object(
+            get_user_model(),
+            'check_password',
+            autospec=True
+        ) as checked:
+            listed = self.client.get(LIST_URL)
+            me = self.client.get(ME_URL)
+
+        self.assertEqual(listed.status_code, status.HTTP_200_OK)
+        self.assertEqual(me.status_code, status.HTTP_401_UNAUTHORIZED)
+        checked.assert_not_called()
+
+    @override_settings(REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {'signup_ip': '1/hour'},
+        'NUM_PROXIES': 0,
+    })
+    def test_signup_throttle_ignores_forwarded_for(self):
+        """
+        Test that a made up X-Forwarded-For does not get a fresh bucket.
+        """
+        payload = {'email': 'x', 'password': 'testpass1234', 'name': 'N'}
+
+        codes = [
+            self.client.post(
+                CREATE_USER_URL,
+                payload,
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{i}'
+            ).status_code
+            for i in range(2)
+        ]
+
+        self.assertEqual(codes, [400, 429])
+
+    @override_settings(REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {'signup_ip': '1/hour'}
+    })
+    def test_signup_throttled_per_ip(self):
+        """
+        Test that sign ups from one address are limited.
+        """
+        payload = {'email': 'x', 'password': 'testpass1234', 'name': 'N'}
+
+        first = self.client.post(CREATE_USER_URL, payload)
+        second = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', second)
+
     def test_retrieve_profile_unauthorized(self):
         """
         Test that authentication is required for users.
@@ -212,6 +357,10 @@ class PrivateUserApiTests(TestCase):
             'codeforces_handle': self.user.codeforces_handle,
             'omegaup_handle': self.user.omegaup_handle,
             'kattis_handle': self.user.kattis_handle,
+            'codeforces_handle_status': '',
+            'omegaup_handle_status': '',
+            'kattis_handle_status': '',
+            'participation_count': 0,
         })
 
     def test_post_me_not_allowed(self):
@@ -241,3 +390,222 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(self.user.name, payload['name'])
         self.assertTrue(self.user.check_password(payload['password']))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+@override_settings(USER_IMPORT_HASH_WORKERS=1)
+class ImportUsersApiTests(TestCase):
+    """
+    Test the bulk user import API.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = get_user_model().objects.create_superuser(
+            'staff@example.com',
+            'testpass1234'
+        )
+        self.client.force_authenticate(user=self.staff)
+
+    def run_import(self, payload, **kwargs):
+        """
+        Upload an import, let a worker run it and return its status.
+        """
+        res = self.client.post(IMPORT_URL, payload, **kwargs)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        tasks.Worker().run_once()
+        return self.client.get(res.data['url'])
+
+    def test_import_requires_staff(self):
+        """
+        Test that basic users cannot import users.
+        """
+        user = create_user(email='user@example.com', password='testpass1234')
+        self.client.force_authenticate(user=user)
+
+        res = self.client.post(IMPORT_URL, [], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_json(self):
+        """
+        Test importing users from JSON, reporting rejected rows.
+        """
+        create_user(
+            email='taken@example.com',
+            password='testpass1234',
+            codeforces_handle='taken_cf'
+        )
+        payload = [
+            {
+                'email': 'one@example.com',
+                'password': 'testpass1234',
+                'name': 'One',
+                'codeforces_handle': 'one_cf',
+                'kattis_handle': '',
+            },
+            {
+                'email': 'two@example.com',
+                'password': 'testpass1234',
+                'name': 'Two',
+                'codeforces_handle': 'taken_cf',
+            },
+            {'email': 'not-an-email', 'password': 'testpass1234'},
+            {
+                'email': 'three@EXAMPLE.com',
+                'password': 'testpass1234',
+                'name': 'Three',
+                'codeforces_handle': 'one_cf',
+            },
+        ]
+
+        res = self.run_import(payload, format='json')
+
+        self.assertEqual(res.data['status'], 'done')
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(
+            [(e['row'], sorted(e['errors'])) for e in res.data['errors']],
+            [
+                (2, ['codeforces_handle']),
+                (3, ['email', 'name']),
+                (4, ['codeforces_handle']),
+            ]
+        )
+
+        user = get_user_model().objects.get(email='one@example.com')
+        self.assertTrue(user.check_password('testpass1234'))
+        self.assertIsNone(user.kattis_handle)
+        self.assertEqual(UserImport.objects.get().rows, [])
+
+    def test_import_is_queued(self):
+        """
+        Test that the upload only queues the import for a worker.
+        """
+        payload = [{
+            'email': 'one@example.com',
+            'password': 'testpass1234',
+            'name': 'One',
+        }]
+
+        res = self.client.post(IMPORT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(
+            Task.objects.get(id=res.data['task']).kwargs,
+            {'import_id': res.data['id']}
+        )
+        self.assertFalse(
+            get_user_model().objects.filter(email='one@example.com').exists()
+        )
+        self.assertEqual(
+            self.client.get(res.data['url']).data['status'],
+            'pending'
+        )
+
+    def test_failed_import_forgets_rows(self):
+        """
+        Test a crashed import reports failure and keeps no passwords.
+        """
+        payload = [{
+            'email': 'one@example.com',
+            'password': 'testpass1234',
+            'name': 'One',
+        }]
+
+        with patch(
+            'user.importer.import_users',
+            side_effect=RuntimeError('boom')
+        ), self.assertLogs('core.tasks', 'ERROR'):
+            res = self.run_import(payload, format='json')
+
+        self.assertEqual(res.data['status'], 'failed')
+        self.assertEqual(UserImport.objects.get().rows, [])
+
+    def test_hash_passwords_in_pool(self):
+        """
+        Test hashing passwords across worker processes.
+        """
+        passwords = ['first1234', 'second1234', 'third1234']
+
+        hashes = hash_passwords(passwords, workers=2)
+
+        for password, encoded in zip(passwords, hashes):
+            self.assertTrue(check_password(password, encoded))
+
+    def test_import_reports_rows_taken_meanwhile(self):
+        """
+        Test a row colliding with a signup made during the import is
+        reported rather than failing the import.
+        """
+        payload = [
+            {
+                'email': 'one@example.com',
+                'password': 'testpass1234',
+                'name': 'One',
+            },
+            {
+                'email': 'two@example.com',
+                'password': 'testpass1234',
+                'name': 'Two',
+            },
+        ]
+
+        def hash_during_signup(passwords, workers):
+            create_user(email='two@example.com', password='testpass1234')
+            return hash_passwords(passwords, workers)
+
+        with patch(
+            'user.importer.hash_passwords',
+            side_effect=hash_during_signup
+        ):
+            res = self.run_import(payload, format='json')
+
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(
+            res.data['errors'],
+            [{'row': 2, 'errors': {
+                'email': ['A user with this email exists.']
+            }}]
+        )
+        self.assertTrue(
+            get_user_model().objects.filter(email='one@example.com').exists()
+        )
+
+    def test_import_csv(self):
+        """
+        Test importing users from a CSV upload.
+        """
+        upload = SimpleUploadedFile(
+            'members.csv',
+            b'email,name,password,codeforces_handle\n'
+            b'a@example.com,A,testpass1234,a_cf\n'
+            b'b@example.com,B,testpass1234,\n',
+            content_type='text/csv'
+        )
+
+        res = self.run_import({'file': upload})
+
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(res.data['errors'], [])
+        self.assertTrue(
+            get_user_model().objects.filter(email='b@example.com').exists()
+        )
+
+    def test_import_all_rows_rejected(self):
+        """
+        Test that an import without valid rows reports every row.
+        """
+        payload = {'users': [{'email': 'staff@example.com'}]}
+
+        res = self.run_import(payload, format='json')
+
+        self.assertEqual(res.data['created'], 0)
+        self.assertEqual([e['row'] for e in res.data['errors']], [1])
+
+    def test_malformed_import_is_bad_request(self):
+        """
+        Test that uploads other than a list of users are refused.
+        """
+        res = self.client.post(IMPORT_URL, {'users': 'x'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(UserImport.objects.exists())
@@ -0,0 +1,268 @@
+"""
+Tests for platform handle verification.
+"""
+
+import json
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task
+from core.throttling import get_store
+from platforms.client import PlatformClient, PlatformError
+from platforms.tests.fake_upstream import FakeUpstream
+from user import verification
+from user.importer import import_users
+from user.tasks import verify_handles
+
+
+CREATE_USER_URL = reverse('user:create')
+INFO_PATH = '/cf/user.info'
+
+
+class HandleVerificationTests(TestCase):
+    """
+    Test checking members' handles against the platforms.
+    """
+
+    def setUp(self):
+        self.known = {'tourist', 'petr', 'alice'}
+        self.upstream = FakeUpstream().start()
+        self.addCleanup(self.upstream.stop)
+        self.upstream.route(INFO_PATH, self.user_info)
+        self.upstream.route('/kattis/users/alice', '<html></html>')
+
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.platforms = PlatformClient(cache_dir=cache_dir.name, retries=0)
+        self.addCleanup(self.platforms.close)
+
+        settings = override_settings(
+            PLATFORM_API_URLS={
+                'C': self.upstream.url('/cf/'),
+                'K': self.upstream.url('/kattis/'),
+            },
+            HANDLE_CHECK_BATCH_SIZE=2
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        verification.get_cache().clear()
+        get_store().clear()
+
+    def user_info(self, query):
+        handles = query['handles'][0].split(';')
+        unknown = [h for h in handles if h.lower() not in self.known]
+        if unknown:
+            return json.dumps({
+                'status': 'FAILED',
+                'comment': f'handles: User with handle {unknown[0]} not found',
+            })
+        return json.dumps({
+            'status': 'OK',
+            'result': [{'handle': handle} for handle in handles],
+        })
+
+    def create_user(self, email, **handles):
+        statuses = verification.handle_statuses(handles)
+        return get_user_model().objects.create_user(
+            email=email,
+            password='testpass123',
+            **handles,
+            **statuses
+        )
+
+    def test_signup_queues_one_check_per_platform(self):
+        """
+        Test signups mark handles pending and share one delayed check.
+        """
+        client = APIClient()
+        for number in range(3):
+            res = client.post(CREATE_USER_URL, {
+                'email': f'user{number}@example.com',
+                'password': 'testpass1234',
+                'name': 'Test Name',
+                'codeforces_handle': f'handle{number}',
+            })
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(
+                res.data['codeforces_handle_status'],
+                get_user_model().HANDLE_PENDING
+            )
+
+        queued = Task.objects.get(name=verify_handles.name)
+        self.assertEqual(queued.kwargs, {'platform': 'C'})
+        self.assertGreater(queued.run_at, timezone.now())
+        self.assertEqual(self.upstream.hits(INFO_PATH), 0)
+
+    def test_signup_rolls_back_when_queueing_fails(self):
+        """
+        Test a member is not created with pending handles nobody checks.
+        """
+        with patch.object(
+            verification,
+            'queue_pending',
+            side_effect=DatabaseError
+        ), self.assertRaises(DatabaseError):
+            APIClient().post(CREATE_USER_URL, {
+                'email': 'user@example.com',
+                'password': 'testpass1234',
+                'name': 'Test Name',
+                'codeforces_handle': 'tourist',
+            })
+
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_handle_change_rolls_back_when_queueing_fails(self):
+        """
+        Test a handle change is not saved without its check.
+        """
+        user = self.create_user('one@example.com', codeforces_handle='petr')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with patch.object(
+            verification,
+            'queue_pending',
+            side_effect=DatabaseError
+        ), self.assertRaises(DatabaseError):
+            client.patch(reverse('user:me'), {'codeforces_handle': 'ghost'})
+
+        user.refresh_from_db()
+        self.assertEqual(user.codeforces_handle, 'petr')
+
+    def test_verify_isolates_unknown_handles(self):
+        """
+        Test handles are checked in batches and unknown ones are found.
+        """
+        User = get_user_model()
+        users = [
+            self.create_user(f'{handle}@example.com', codeforces_handle=handle)
+            for handle in ('tourist', 'ghost', 'petr', 'alice')
+        ]
+
+        self.assertEqual(verification.verify_pending('C', self.platforms), 4)
+
+        self.assertEqual(
+            [
+                User.objects.get(id=user.id).codeforces_handle_status
+                for user in users
+            ],
+            [
+                User.HANDLE_VERIFIED,
+                User.HANDLE_NOT_FOUND,
+                User.HANDLE_VERIFIED,
+                User.HANDLE_VERIFIED,
+            ]
+        )
+        # Two batches of two, the first split to isolate "ghost".
+        self.assertEqual(self.upstream.hits(INFO_PATH), 4)
+
+    def test_results_are_cached(self):
+        """
+        Test a handle checked recently is not asked for again.
+        """
+        User = get_user_model()
+        user = self.create_user('one@example.com', codeforces_handle='tourist')
+        verification.verify_pending('C', self.platforms)
+        hits = self.upstream.hits(INFO_PATH)
+        user.delete()
+        Task.objects.all().delete()
+
+        self.assertEqual(
+            verification.check_handles('C', ['tourist'], self.platforms),
+            {'tourist': True}
+        )
+        self.assertEqual(self.upstream.hits(INFO_PATH), hits)
+
+        res = APIClient().post(CREATE_USER_URL, {
+            'email': 'three@example.com',
+            'password': 'testpass1234',
+            'name': 'Test Name',
+            'codeforces_handle': 'tourist',
+        })
+        self.assertEqual(
+            res.data['codeforces_handle_status'],
+            User.HANDLE_VERIFIED
+        )
+        self.assertFalse(
+            Task.objects.filter(name=verify_handles.name).exists()
+        )
+
+    def test_handle_changed_during_check_stays_pending(self):
+        """
+        Test a result is not stored for a handle changed meanwhile.
+        """
+        User = get_user_model()
+        user = self.create_user('one@example.com', codeforces_handle='ghost')
+
+        def check(client, handles):
+            User.objects.filter(id=user.id).update(codeforces_handle='petr')
+            return {handle: False for handle in handles}
+
+        with patch.dict(verification.CHECKERS, {'C': check}):
+            self.assertEqual(
+                verification.verify_pending('C', self.platforms),
+                0
+            )
+
+        user.refresh_from_db()
+        self.assertEqual(user.codeforces_handle_status, User.HANDLE_PENDING)
+
+    def test_profile_checker_treats_404_as_missing(self):
+        """
+        Test a missing profile page means the handle does not exist.
+        """
+        User = get_user_model()
+        alice = self.create_user('alice@example.com', kattis_handle='alice')
+        ghost = self.create_user('ghost@example.com', kattis_handle='ghost')
+
+        self.assertEqual(verification.verify_pending('K', self.platforms), 2)
+
+        alice.refresh_from_db()
+        ghost.refresh_from_db()
+        self.assertEqual(alice.kattis_handle_status, User.HANDLE_VERIFIED)
+        self.assertEqual(ghost.kattis_handle_status, User.HANDLE_NOT_FOUND)
+
+    def test_upstream_errors_leave_handles_pending(self):
+        """
+        Test an unavailable platform fails the check instead of settling it.
+        """
+        User = get_user_model()
+        self.upstream.route('/kattis/users/alice', status=503)
+        user = self.create_user('alice@example.com', kattis_handle='alice')
+
+        with self.assertRaises(PlatformError):
+            verification.verify_pending('K', self.platforms)
+
+        user.refresh_from_db()
+        self.assertEqual(user.kattis_handle_status, User.HANDLE_PENDING)
+
+    def test_import_marks_handles_pending(self):
+        """
+        Test imported handles are queued for a check.
+        """
+        created, errors = import_users([{
+            'email': 'one@example.com',
+            'password': 'testpass1234',
+            'name': 'One',
+            'kattis_handle': 'alice',
+        }], workers=1)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            created[0].kattis_handle_status,
+            get_user_model().HANDLE_PENDING
+        )
+        self.assertEqual(
+            Task.objects.get(name=verify_handles.name).kwargs,
+            {'platform': 'K'}
+        )
@@ -0,0 +1,26 @@
+"""
+Throttles for the user API.
+"""
+
+from core.throttling import IPTokenBucketThrottle, EmailTokenBucketThrottle
+
+
+class LoginIPThrottle(IPTokenBucketThrottle):
+    """
+    Limit token requests per client address.
+    """
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(EmailTokenBucketThrottle):
+    """
+    Limit token requests per account email.
+    """
+    scope = 'login_email'
+
+
+class SignupIPThrottle(IPTokenBucketThrottle):
+    """
+    Limit sign ups per client address.
+    """
+    scope = 'signup_ip'
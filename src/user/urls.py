@@ -13,5 +13,16 @@ urlpatterns = [
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('token/', views.CreateTokenView.as_view(), name='token'),
     path('me/', views.ManageUserView.as_view(), name='me'),
-    path('list/', views.ListUsersView.as_view(), name='list')
+    path(
+        'me/calendar/',
+        views.CalendarTokenView.as_view(),
+        name='calendar'
+    ),
+    path('list/', views.ListUsersView.as_view(), name='list'),
+    path('import/', views.ImportUsersView.as_view(), name='import'),
+    path(
+        'import/<int:pk>/',
+        views.ImportStatusView.as_view(),
+        name='import-status'
+    ),
 ]
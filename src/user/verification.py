@@ -0,0 +1,269 @@
+"""
+Checks that members' platform handles exist, off the request path.
+
+Saving a handle sets its status from the result cache when the handle
+was checked recently, and otherwise marks it pending and queues a
+`verify_handles` task for its platform. Tasks are queued at most once per
+platform and run HANDLE_CHECK_DELAY seconds later, so a burst of signups
+is checked together: Codeforces takes HANDLE_CHECK_BATCH_SIZE handles per
+call, the other platforms are asked one handle at a time in parallel.
+
+Results are cached by platform and handle, for HANDLE_VERIFIED_TTL
+seconds when the handle exists and HANDLE_NOT_FOUND_TTL seconds when it
+does not, since a missing handle may be registered any moment. Handles
+left pending, say by a failed check, are picked up again by the
+verify-handles job.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db.models import Q
+
+from core.models import Task
+from platforms.client import PlatformError, get_client
+
+
+logger = logging.getLogger(__name__)
+
+# Platforms mapped to the user field holding the handle.
+HANDLE_FIELDS = {
+    'C': 'codeforces_handle',
+    'O': 'omegaup_handle',
+    'K': 'kattis_handle',
+}
+
+
+def status_field(platform):
+    return f'{HANDLE_FIELDS[platform]}_status'
+
+
+def get_cache():
+    return caches[getattr(settings, 'HANDLE_CACHE_ALIAS', 'default')]
+
+
+def cache_key(platform, handle):
+    return f'handle-check:{platform}:{handle}'
+
+
+def handle_statuses(handles):
+    """
+    Return the status fields to store with {handle field: handle}: the
+    cached result of each handle, pending when there is none, and blank
+    for removed handles.
+    """
+    platforms = {
+        platform: handles[field]
+        for platform, field in HANDLE_FIELDS.items()
+        if field in handles
+    }
+    cached = get_cache().get_many([
+        cache_key(platform, handle)
+        for platform, handle in platforms.items() if handle
+    ])
+
+    User = get_user_model()
+    statuses = {}
+    for platform, handle in platforms.items():
+        if not handle:
+            status = ''
+        else:
+            exists = cached.get(cache_key(platform, handle))
+            if exists is None:
+                status = User.HANDLE_PENDING
+            elif exists:
+                status = User.HANDLE_VERIFIED
+            else:
+                status = User.HANDLE_NOT_FOUND
+        statuses[status_field(platform)] = status
+    return statuses
+
+
+def queue_pending(statuses):
+    """
+    Queue a check of each platform with a handle pending in statuses,
+    unless one is already queued.
+    """
+    from user.tasks import verify_handles
+
+    pending = get_user_model().HANDLE_PENDING
+    for platform in HANDLE_FIELDS:
+        if statuses.get(status_field(platform)) != pending:
+            continue
+        queued = Task.objects.filter(
+            name=verify_handles.name,
+            status=Task.QUEUED,
+            kwargs__platform=platform
+        )
+        if not queued.exists():
+            verify_handles.enqueue(
+                platform=platform,
+                delay=timedelta(
+                    seconds=getattr(settings, 'HANDLE_CHECK_DELAY', 10)
+                )
+            )
+
+
+def queue_all_pending():
+    """
+    Queue a check of each platform that still has pending handles.
+    """
+    User = get_user_model()
+    queue_pending({
+        status_field(platform): User.HANDLE_PENDING
+        for platform in HANDLE_FIELDS
+        if User.objects.filter(
+            **{status_field(platform): User.HANDLE_PENDING}
+        ).exists()
+    })
+
+
+def check_codeforces(client, handles):
+    """
+    Return {handle: whether it exists} for Codeforces handles.
+
+    Codeforces rejects a whole `user.info` lookup over one unknown handle,
+    so a rejected batch is split in halves until the unknown handles are
+    isolated.
+    """
+    url = client.platform_url('C', 'user.info')
+    results = {}
+    pending = [list(handles)]
+
+    while pending:
+        batch = pending.pop()
+        try:
+            response = client.get(
+                url,
+                params={'handles': ';'.join(batch)},
+                cache=False
+            )
+            found = response.json().get('status') == 'OK'
+        except PlatformError as error:
+            if error.status_code != 400:
+                raise
+            found = False
+
+        if found:
+            results.update((handle, True) for handle in batch)
+        elif len(batch) == 1:
+            results[batch[0]] = False
+        else:
+            middle = len(batch) // 2
+            pending.extend((batch[:middle], batch[middle:]))
+
+    return results
+
+
+def profile_checker(platform, path):
+    """
+    Return a checker asking for each handle's profile page, which is
+    missing for unknown handles.
+    """
+    def check(client, handles):
+        def exists(handle):
+            url = client.platform_url(platform, path.format(quote(handle)))
+            try:
+                client.get(url, cache=False)
+            except PlatformError as error:
+                if error.status_code != 404:
+                    raise
+                return False
+            return True
+
+        workers = getattr(settings, 'PLATFORM_HTTP_MAX_PER_HOST', 4)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(handles, pool.map(exists, handles)))
+
+    return check
+
+
+CHECKERS = {
+    'C': check_codeforces,
+    'O': profile_checker('O', 'user/profile/?username={}'),
+    'K': profile_checker('K', 'users/{}'),
+}
+
+
+def check_handles(platform, handles, client=None):
+    """
+    Return {handle: whether it exists}, from the cache where possible.
+    """
+    cache = get_cache()
+    cached = cache.get_many([cache_key(platform, h) for h in handles])
+    results = {
+        handle: cached[cache_key(platform, handle)]
+        for handle in handles if cache_key(platform, handle) in cached
+    }
+
+    missed = [handle for handle in handles if handle not in results]
+    if missed:
+        checked = CHECKERS[platform](client or get_client(), missed)
+        for exists, ttl in (
+            (True, getattr(settings, 'HANDLE_VERIFIED_TTL', 7 * 86400)),
+            (False, getattr(settings, 'HANDLE_NOT_FOUND_TTL', 3600)),
+        ):
+            cache.set_many(
+                {
+                    cache_key(platform, handle): exists
+                    for handle, result in checked.items() if result is exists
+                },
+                ttl
+            )
+        results.update(checked)
+
+    return results
+
+
+def verify_pending(platform, client=None):
+    """
+    Check every pending handle on a platform, a batch at a time.
+
+    A handle changed during its check stays pending for the next run.
+    Returns the number of handles settled.
+    """
+    User = get_user_model()
+    field = HANDLE_FIELDS[platform]
+    status = status_field(platform)
+    size = getattr(settings, 'HANDLE_CHECK_BATCH_SIZE', 100)
+    pending = User.objects.filter(**{status: User.HANDLE_PENDING})
+
+    settled = 0
+    last = 0
+    while True:
+        batch = list(
+            pending.filter(id__gt=last).order_by('id')
+            .values_list('id', field)[:size]
+        )
+        if not batch:
+            return settled
+        last = batch[-1][0]
+
+        handles = [handle for _, handle in batch if handle]
+        results = check_handles(platform, handles, client)
+        for exists, value in (
+            (True, User.HANDLE_VERIFIED),
+            (False, User.HANDLE_NOT_FOUND),
+        ):
+            settled += pending.filter(**{f'{field}__in': [
+                handle for handle, result in results.items()
+                if result is exists
+            ]}).update(**{status: value})
+
+        # Handles removed without going through handle_statuses.
+        pending.filter(
+            Q(**{f'{field}__isnull': True}) | Q(**{field: ''}),
+            id__in=[user_id for user_id, handle in batch if not handle]
+        ).update(**{status: ''})
+
+        logger.info(
+            'Checked %d %s handles, %d not found.',
+            len(handles),
+            platform,
+            sum(1 for exists in results.values() if not exists)
+        )
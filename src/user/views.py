@@ -2,12 +2,34 @@
 Views for the user API.
 """
 
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions, status
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
-from django.contrib.auth import get_user_model
+from rest_framework.views import APIView
+from django.conf import settings
+from django.contrib.auth import get_user_model, user_logged_in
+from django.db import transaction
+from django.urls import reverse
 
-from user.serializers import UserSerializer, AuthTokenSerializer
+from core import authentication, db_routers
+from core.models import CalendarToken, Contest, UserImport
+
+from problem.tasks import ingest_member_submissions
+from user.importer import read_csv
+from user.serializers import (
+    AuthTokenSerializer,
+    ImportStatusSerializer,
+    UserSerializer,
+)
+from user.tasks import import_members
+from user.throttles import (
+    LoginIPThrottle,
+    LoginEmailThrottle,
+    SignupIPThrottle,
+)
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -15,6 +37,19 @@ class CreateUserView(generics.CreateAPIView):
     Create a new user in the system.
     """
     serializer_class = UserSerializer
+    # Authenticators would run, and hash passwords, before the throttles.
+    authentication_classes = []
+    throttle_classes = [SignupIPThrottle]
+
+    def perform_create(self, serializer):
+        """
+        Create the user and queue the first sync of their submissions.
+        """
+        with transaction.atomic():
+            user = serializer.save()
+            if user.codeforces_handle:
+                ingest_member_submissions.enqueue(user_id=user.id)
+        db_routers.pin_primary(db_routers.user_identity(user.pk))
 
 
 class CreateTokenView(ObtainAuthToken):
@@ -23,6 +58,25 @@ class CreateTokenView(ObtainAuthToken):
     """
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    # Basic authentication would check a password before the throttles.
+    authentication_classes = []
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Issue the token, counting it as a login so `last_login` is set.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        token, _ = Token.objects.get_or_create(user=user)
+        # The client's next requests carry a token replicas may not have.
+        db_routers.pin_primary(
+            db_routers.user_identity(user.pk),
+            db_routers.token_identity(token.key)
+        )
+        user_logged_in.send(sender=type(user), request=request, user=user)
+        return Response({'token': token.key})
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
@@ -39,6 +93,59 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
         """
         return self.request.user
 
+    def perform_update(self, serializer):
+        """
+        Save the changes together with the handle checks they queue.
+        """
+        with transaction.atomic():
+            serializer.save()
+
+
+class CalendarTokenView(APIView):
+    """
+    Manage the token of the authenticated user's contest calendar feeds.
+    """
+    authentication_classes = [authentication.TokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """
+        Return the feed URLs, creating the token on first use.
+        """
+        token, _ = CalendarToken.objects.get_or_create(user=request.user)
+        return Response(self.feeds(request, token))
+
+    def post(self, request):
+        """
+        Replace the token, so the previous feed URLs stop working.
+        """
+        token, _ = CalendarToken.objects.update_or_create(
+            user=request.user,
+            defaults={'key': CalendarToken.generate_key()}
+        )
+        return Response(self.feeds(request, token))
+
+    def delete(self, request):
+        """
+        Revoke the token.
+        """
+        CalendarToken.objects.filter(user=request.user).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def feeds(self, request, token):
+        def url(name, **kwargs):
+            path = reverse(f'contest:{name}', kwargs=kwargs)
+            return request.build_absolute_uri(f'{path}?token={token.key}')
+
+        return {
+            'token': token.key,
+            'url': url('contest-calendar'),
+            'platforms': {
+                platform: url('contest-calendar-platform', platform=platform)
+                for platform in Contest.PLATFORMS
+            },
+        }
+
 
 class ListUsersView(generics.ListAPIView):
     """
@@ -46,3 +153,74 @@ class ListUsersView(generics.ListAPIView):
     """
     serializer_class = UserSerializer
     queryset = get_user_model().objects.all()
+    authentication_classes = [authentication.TokenAuthentication]
+    replica_reads = True
+
+
+class ImportUsersView(APIView):
+    """
+    Create users in bulk from a CSV upload or a JSON list (staff only).
+
+    Hashing thousands of passwords takes minutes, so the rows are queued
+    for a worker. The response points at the import's status, which lists
+    the rejected rows once it is done.
+    """
+    authentication_classes = [authentication.TokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+    parser_classes = [JSONParser, MultiPartParser]
+
+    def post(self, request):
+        """
+        Queue the import of the users.
+        """
+        if 'file' in request.FILES:
+            rows = read_csv(request.FILES['file'])
+        else:
+            rows = request.data
+            if isinstance(rows, dict):
+                rows = rows.get('users')
+
+        if not isinstance(rows, list) or \
+                not all(isinstance(row, dict) for row in rows):
+            return Response(
+                {'detail': 'Expected a CSV file or a list of users.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_rows = getattr(settings, 'USER_IMPORT_MAX_ROWS', 5000)
+        if len(rows) > max_rows:
+            return Response(
+                {'detail': f'Imports are limited to {max_rows} rows.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            user_import = UserImport.objects.create(
+                created_by=request.user,
+                rows=rows
+            )
+            user_import.task = import_members.enqueue(
+                import_id=user_import.id
+            )
+            user_import.save(update_fields=['task'])
+
+        return Response(
+            {
+                'id': user_import.id,
+                'task': user_import.task_id,
+                'url': request.build_absolute_uri(
+                    reverse('user:import-status', args=[user_import.id])
+                ),
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class ImportStatusView(generics.RetrieveAPIView):
+    """
+    Show the progress and outcome of a bulk user import (staff only).
+    """
+    serializer_class = ImportStatusSerializer
+    queryset = UserImport.objects.select_related('task')
+    authentication_classes = [authentication.TokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]